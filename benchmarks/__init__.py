@@ -0,0 +1,3 @@
+"""
+Offline microbenchmarks for the Trade Simulator
+"""
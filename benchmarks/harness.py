@@ -0,0 +1,218 @@
+"""
+Benchmark harness for the Trade Simulator
+Times operations, measures their allocations and compares results with a baseline.
+"""
+import gc
+import json
+import platform
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+CALIBRATION = "calibration"
+NOISE_SPREADS = 2.0  # Spreads of run-to-run noise allowed on top of the timing before a slowdown counts
+
+
+@dataclass
+class BenchmarkResult:
+    """Timing and allocation figures for one benchmark"""
+    name: str
+    ops: int
+    ns_per_op: float  # Median of the timed repeats
+    ops_per_sec: float
+    alloc_bytes_per_op: float  # Mean of each op's traced peak above the memory in use when it started
+    retained_bytes_per_op: float  # Bytes still held after the run; growth hints at a leak
+    best_ns_per_op: float = 0.0  # Fastest repeat
+    spread: float = 0.0  # Interquartile range of the repeats relative to their median
+
+
+    def format(self) -> str:
+        """One aligned report line."""
+        return (
+            f"{self.name:<32} {self.ns_per_op:>12,.0f} ns/op {self.ops_per_sec:>14,.0f} ops/s "
+            f"{self.alloc_bytes_per_op:>10,.0f} B/op alloc {self.retained_bytes_per_op:>9,.1f} B/op retained "
+            f"±{self.spread:>4.0%}"
+        )
+
+
+@dataclass
+class Benchmark:
+    """One operation to time"""
+    name: str
+    op: Callable[[int], None]  # Called as op(i) for i in range(ops)
+    ops: int  # Calls per repeat
+    setup: Optional[Callable[[], None]] = None  # Called before every repeat and before the traced run to reset state
+
+
+def run_suite(benchmarks: List[Benchmark], repeat: int = 5) -> List[BenchmarkResult]:
+    """
+    Time every benchmark and measure its allocations.
+
+    Repeats run in rounds, one repeat of every benchmark per round, so a
+    stretch of host noise is shared by all benchmarks, the calibration
+    included, rather than landing on the repeats of one of them.
+
+    Args:
+        benchmarks: Benchmarks to run, in order within each round.
+        repeat: Timed repeats; their median is reported, which one slow or
+            fast repeat cannot move, with their spread as a noise estimate.
+
+    Returns:
+        List[BenchmarkResult]: One per benchmark. Timing comes from the
+        untraced repeats, allocations from one extra traced run
+        (tracemalloc slows the code it traces).
+    """
+    times: Dict[str, List[int]] = {benchmark.name: [] for benchmark in benchmarks}
+    for _ in range(repeat):
+        for benchmark in benchmarks:
+            times[benchmark.name].append(_time(benchmark))
+    return [_result(benchmark, times[benchmark.name]) for benchmark in benchmarks]
+
+
+def run_benchmark(
+    name: str,
+    op: Callable[[int], None],
+    ops: int,
+    repeat: int = 5,
+    setup: Optional[Callable[[], None]] = None,
+) -> BenchmarkResult:
+    """Time one operation over `ops` calls and measure its allocations; see run_suite()."""
+    return run_suite([Benchmark(name, op, ops, setup)], repeat)[0]
+
+
+def _time(benchmark: Benchmark) -> int:
+    """One timed repeat in ns, with the garbage collector paused."""
+    if benchmark.setup:
+        benchmark.setup()
+    op = benchmark.op
+    gc_enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter_ns()
+        for i in range(benchmark.ops):
+            op(i)
+        return time.perf_counter_ns() - start
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def _result(benchmark: Benchmark, times: List[int]) -> BenchmarkResult:
+    """Summarize the timed repeats and add one traced run for allocations."""
+    ops = benchmark.ops
+    if benchmark.setup:
+        benchmark.setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        allocated = 0
+        for i in range(ops):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            benchmark.op(i)
+            allocated += tracemalloc.get_traced_memory()[1] - current
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    median = float(np.median(times))
+    q1, q3 = np.percentile(times, [25, 75])
+    ns_per_op = median / ops
+    return BenchmarkResult(
+        name=benchmark.name,
+        ops=ops,
+        ns_per_op=ns_per_op,
+        ops_per_sec=1e9 / ns_per_op if ns_per_op > 0 else 0.0,
+        alloc_bytes_per_op=allocated / ops,
+        retained_bytes_per_op=(after - before) / ops,
+        best_ns_per_op=min(times) / ops,
+        spread=float(q3 - q1) / median if median > 0 else 0.0,
+    )
+
+
+def calibration() -> Benchmark:
+    """
+    A fixed mix of interpreter work, as a yardstick for this machine's current speed.
+
+    compare() divides every ratio by the calibration ratio, so a slower
+    host or a throttled CPU does not read as a regression.
+    """
+    values = [float(i) for i in range(256)]
+
+    def op(i: int) -> None:
+        total = 0.0
+        for value in values:
+            total += value * 1.0001
+        {"sum": total, "index": i}
+
+    return Benchmark(CALIBRATION, op, 2000)
+
+
+def calibrate(repeat: int = 5) -> BenchmarkResult:
+    """Time the calibration benchmark on its own."""
+    return run_suite([calibration()], repeat)[0]
+
+
+def environment() -> Dict[str, Any]:
+    """Interpreter and host description stored with a baseline."""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "system": platform.system(),
+    }
+
+
+def save_baseline(results: List[BenchmarkResult], path: str) -> None:
+    """Write results, including the calibration result, as a baseline JSON file."""
+    with open(path, "w") as f:
+        json.dump({"environment": environment(), "results": [asdict(result) for result in results]}, f, indent=2)
+
+
+def load_baseline(path: str) -> Dict[str, Dict[str, float]]:
+    """Baseline results by benchmark name."""
+    with open(path) as f:
+        return {entry["name"]: entry for entry in json.load(f)["results"]}
+
+
+def compare(results: List[BenchmarkResult], baseline: Dict[str, Dict[str, float]], tolerance: float) -> List[str]:
+    """
+    Describe every benchmark whose median is slower than its baseline by more than its threshold.
+
+    When both sides have a calibration result, each ratio is divided by
+    the calibration ratio to factor out overall machine speed. Each
+    benchmark's threshold is the larger of `tolerance` and NOISE_SPREADS
+    times its spread, the noisier of the baseline and this run, so a
+    benchmark that varies a lot on this host needs a larger slowdown to
+    be reported.
+
+    Args:
+        tolerance: Smallest relative slowdown reported, e.g. 0.2 for 20%.
+
+    Returns:
+        List[str]: One message per regression; empty when none.
+    """
+    by_name = {result.name: result for result in results}
+    scale = 1.0
+    if CALIBRATION in by_name and CALIBRATION in baseline:
+        scale = by_name[CALIBRATION].ns_per_op / baseline[CALIBRATION]["ns_per_op"]
+
+    regressions = []
+    for result in results:
+        reference = baseline.get(result.name)
+        if result.name == CALIBRATION or reference is None or reference["ns_per_op"] <= 0:
+            continue
+        ratio = result.ns_per_op / reference["ns_per_op"] / scale
+        threshold = max(tolerance, NOISE_SPREADS * max(reference.get("spread", 0.0), result.spread))
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{result.name}: {result.ns_per_op:,.0f} ns/op vs baseline {reference['ns_per_op']:,.0f} "
+                f"({ratio:.2f}x after machine-speed scaling of {scale:.2f}; threshold {1 + threshold:.2f}x)"
+            )
+    return regressions
@@ -0,0 +1,85 @@
+"""
+Benchmark inputs for the Trade Simulator
+Deterministic OKX-style book messages and loaders for recorded feeds.
+"""
+import json
+import random
+from typing import List, Optional
+
+from src.data.recorder import read_recording
+
+
+def synthetic_messages(
+    count: int,
+    depth: int = 50,
+    mid: float = 60000.0,
+    tick: float = 0.1,
+    changes: int = 4,
+    seed: int = 7,
+) -> List[str]:
+    """
+    One books snapshot followed by count - 1 incremental updates.
+
+    Updates resize a few random levels per side and occasionally pull a
+    level and add one behind the last, with an unbroken seqId chain, so
+    every message applies cleanly in incremental mode.
+
+    Args:
+        count: Messages to produce.
+        depth: Levels per side.
+        mid: Starting mid price.
+        tick: Price increment between levels.
+        changes: Levels changed per side per update.
+        seed: Random seed; the same arguments always give the same messages.
+    """
+    rng = random.Random(seed)
+    bids = {round(mid - tick * (i + 1), 8): rng.uniform(0.01, 5.0) for i in range(depth)}
+    asks = {round(mid + tick * (i + 1), 8): rng.uniform(0.01, 5.0) for i in range(depth)}
+
+    def rows(levels, prices):
+        return [[f"{price:.1f}", f"{levels.get(price, 0.0):.4f}", "0", "1"] for price in prices]
+
+    ts = 1_700_000_000_000
+    messages = [json.dumps({
+        "action": "snapshot",
+        "arg": {"channel": "books", "instId": "BTC-USDT"},
+        "data": [{
+            "bids": rows(bids, sorted(bids, reverse=True)),
+            "asks": rows(asks, sorted(asks)),
+            "ts": str(ts),
+            "seqId": 1,
+            "prevSeqId": -1,
+        }],
+    })]
+
+    for seq in range(2, count + 1):
+        ts += 10
+        entry = {"ts": str(ts), "seqId": seq, "prevSeqId": seq - 1}
+        for side, levels, step in (("bids", bids, -tick), ("asks", asks, tick)):
+            touched = rng.sample(sorted(levels), min(changes, len(levels)))
+            for price in touched:
+                levels[price] = rng.uniform(0.01, 5.0)
+            best = max(levels) if step < 0 else min(levels)
+            if rng.random() < 0.2 and touched[-1] != best:
+                # Pull one level behind the touch and quote a new one behind the last
+                removed = touched.pop()
+                del levels[removed]
+                added = round((min(levels) if step < 0 else max(levels)) + step, 8)
+                levels[added] = rng.uniform(0.01, 5.0)
+                entry[side] = rows(levels, touched + [added]) + [[f"{removed:.1f}", "0", "0", "0"]]
+            else:
+                entry[side] = rows(levels, touched)
+        messages.append(json.dumps({"action": "update", "arg": {"channel": "books", "instId": "BTC-USDT"}, "data": [entry]}))
+    return messages
+
+
+def recorded_messages(path: str, symbol: Optional[str] = None, limit: Optional[int] = None) -> List[str]:
+    """Raw messages from a feed recording (src.data.recorder), without pongs."""
+    messages = []
+    for _, _, message in read_recording(path, symbol):
+        if message == "pong":
+            continue
+        messages.append(message)
+        if limit is not None and len(messages) >= limit:
+            break
+    return messages
@@ -0,0 +1,245 @@
+"""
+Microbenchmark suite for the Trade Simulator
+Replays L2 messages through the feed path, the book, the feature stage and every cost model.
+
+Usage:
+    python -m benchmarks.run                       # synthetic messages, compare with the baseline
+    python -m benchmarks.run --recording feed.bin --symbol BTC-USDT-SWAP
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+"""
+import argparse
+import logging
+import os
+import sys
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from benchmarks.harness import Benchmark, calibration, compare, load_baseline, run_suite, save_baseline
+from benchmarks.messages import recorded_messages, synthetic_messages
+from src.config import UI_ORDERBOOK_LEVELS
+from src.data.book_builder import BookBuilder
+from src.data.conflation import ConflatingDispatcher
+from src.data.orderbook import OrderBook
+from src.data.ws_backend import MessageDecoder, WebSocketManager
+from src.models.features import FeatureStage, empty_features
+from src.models.pipeline import CostPipeline
+from src.models.scenarios import build_scenarios
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# A factory returns (op, setup) for run_benchmark()
+OpFactory = Callable[[], Tuple[Callable[[int], None], Optional[Callable[[], None]]]]
+
+
+def drive(coroutine) -> None:
+    """Run a coroutine that never suspends, without an event loop."""
+    try:
+        coroutine.send(None)
+    except StopIteration:
+        return
+    coroutine.close()
+    raise RuntimeError("Benchmarked coroutine suspended")
+
+
+def replay_books(messages: List[str], symbol: str, every: int = 10) -> List[OrderBook]:
+    """Snapshots of the book after every `every`-th applied message."""
+    decoder = MessageDecoder()
+    builder = BookBuilder(OrderBook(symbol=symbol))
+    books = []
+    for i, message in enumerate(messages):
+        if builder.apply(decoder.decode(message)) and builder.book.is_valid and i % every == 0:
+            books.append(builder.book.snapshot())
+    if not books:
+        raise ValueError("No valid book states in the messages")
+    return books
+
+
+def trained_pipeline(books: List[OrderBook]) -> CostPipeline:
+    """A pipeline whose models have trained on the books, then frozen."""
+    pipeline = CostPipeline(background_training=False)
+    for i in range(max(len(books), 400)):
+        book = books[i % len(books)]
+        for order_type in ("market", "limit"):
+            pipeline.compute(book, {"quantity": 100.0 + i % 1000, "volatility": 0.02, "order_type": order_type}, now=i * 0.1)
+    pipeline.slippage_model.learning = False
+    pipeline.maker_taker_model.learning = False
+    return pipeline
+
+
+def build_suite(messages: List[str], symbol: str) -> Dict[str, Tuple[OpFactory, float]]:
+    """
+    Every benchmark by name.
+
+    Returns:
+        Dict of name -> (op factory, calls per run as a fraction of the message count).
+    """
+    books = replay_books(messages, symbol)
+    pipeline = trained_pipeline(books)
+    params = {"quantity": 1000.0, "volatility": 0.02, "order_type": "limit"}
+    n_books = len(books)
+
+    def feed_decode():
+        decoder = MessageDecoder()
+        return (lambda i: decoder.decode(messages[i])), None
+
+    def feed_process():
+        state = {}
+
+        def setup():
+            # Fresh connection state per repeat, so the replay starts from its snapshot
+            dispatcher = ConflatingDispatcher()
+            dispatcher.reader("benchmark", levels=UI_ORDERBOOK_LEVELS)
+            state["manager"] = WebSocketManager("ws://benchmark", symbol=symbol, book=OrderBook(symbol=symbol), on_book=dispatcher.publish)
+
+        return (lambda i: drive(state["manager"].process(messages[i]))), setup
+
+    def book_apply():
+        state = {}
+
+        def setup():
+            decoder = MessageDecoder()
+            state["decoded"] = [decoder.decode(message) for message in messages]
+            state["builder"] = BookBuilder(OrderBook(symbol=symbol))
+
+        return (lambda i: state["builder"].apply(state["decoded"][i])), setup
+
+    def book_snapshot():
+        return (lambda i: books[i % n_books].snapshot()), None
+
+    def book_sweep():
+        return (lambda i: books[i % n_books].sweep(1000.0, "buy")), None
+
+    def book_sweep_curve():
+        sizes = np.geomspace(10.0, 1e6, 64)
+        return (lambda i: books[i % n_books].sweep(sizes, "buy")), None
+
+    def features():
+        stage = FeatureStage()
+        return (lambda i: stage.update(books[i % n_books], 1000.0, 0.02, "limit")), None
+
+    vectors = []
+    for book in books:
+        stage = FeatureStage()
+        vectors.append(np.array(stage.update(book, 1000.0, 0.02, "limit")))
+
+    def model_slippage():
+        model = pipeline.slippage_model
+        return (lambda i: model.calculate(vectors[i % n_books])), None
+
+    def model_maker_taker():
+        model = pipeline.maker_taker_model
+        return (lambda i: model.predict(vectors[i % n_books])), None
+
+    def model_fees():
+        model = pipeline.fee_model
+        return (lambda i: model.calculate(1000.0, 60000.0, 0.5)), None
+
+    def model_impact():
+        model = pipeline.impact_model
+        return (lambda i: model.calculate(vectors[i % n_books])), None
+
+    def pipeline_compute():
+        return (lambda i: pipeline.compute(books[i % n_books], params, now=1e6 + i * 0.01)), None
+
+    def pipeline_compute_learning():
+        state = {}
+
+        def setup():
+            state["pipeline"] = CostPipeline(background_training=False)
+
+        def op(i):
+            order_type = "limit" if i % 2 else "market"
+            state["pipeline"].compute(
+                books[i % n_books], {"quantity": 100.0 + i % 1000, "volatility": 0.02, "order_type": order_type}, now=i * 0.01
+            )
+
+        return op, setup
+
+    def pipeline_batch():
+        batch = empty_features(1024)
+        batch.view(np.float64).reshape(len(batch), -1)[:] = np.array(vectors)[np.arange(len(batch)) % n_books]
+        return (lambda i: pipeline.compute_batch(batch)), None
+
+    def pipeline_scenarios():
+        matrix = pipeline.scenario_matrix(build_scenarios(
+            [10.0, 100.0, 1000.0, 10000.0, 100000.0, 1000000.0], [0.02], ["TEIR 0", "TEIR 5"],
+            ["market", "limit"], sides=["buy", "sell"],
+        ))
+        return (lambda i: pipeline.compute_scenarios(books[i % n_books], matrix, now=1e6 + i * 0.01)), None
+
+    return {
+        "feed.decode": (feed_decode, 1.0),
+        "feed.process": (feed_process, 1.0),
+        "book.apply": (book_apply, 1.0),
+        "book.snapshot": (book_snapshot, 1.0),
+        "book.sweep": (book_sweep, 1.0),
+        "book.sweep.64": (book_sweep_curve, 1.0),
+        "features.update": (features, 1.0),
+        "model.slippage": (model_slippage, 1.0),
+        "model.maker_taker": (model_maker_taker, 1.0),
+        "model.fees": (model_fees, 1.0),
+        "model.impact": (model_impact, 1.0),
+        "pipeline.compute": (pipeline_compute, 1.0),
+        "pipeline.compute.learning": (pipeline_compute_learning, 1.0),
+        "pipeline.compute_batch.1024": (pipeline_batch, 0.01),
+        "pipeline.scenarios.48": (pipeline_scenarios, 0.2),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the Trade Simulator microbenchmarks")
+    parser.add_argument("--recording", help="Feed recording (src.data.recorder) to replay instead of synthetic messages")
+    parser.add_argument("--symbol", default="BTC-USDT", help="Symbol to replay from the recording")
+    parser.add_argument("--messages", type=int, default=2000, help="Messages to replay per repeat")
+    parser.add_argument(
+        "--repeat", type=int, default=7,
+        help="Timed rounds over the suite; each benchmark's median over the rounds is reported and compared",
+    )
+    parser.add_argument("--filter", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare against, if it exists")
+    parser.add_argument("--save-baseline", help="Write the results to this baseline JSON")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.5,
+        help=(
+            "Smallest relative slowdown reported as a regression; noisy benchmarks get a wider threshold "
+            "from their measured spread. On shared or virtualized hosts medians move by up to ~40%% between "
+            "runs, so keep 0.5 there; 0.1-0.2 suits a quiet, dedicated host"
+        ),
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    if args.recording:
+        messages = recorded_messages(args.recording, args.symbol, args.messages)
+        source = f"{len(messages)} recorded messages from {args.recording}"
+    else:
+        messages = synthetic_messages(args.messages)
+        source = f"{len(messages)} synthetic messages"
+    print(f"Replaying {source}")
+
+    benchmarks = [calibration()]
+    for name, (factory, scale) in build_suite(messages, args.symbol).items():
+        if args.filter and args.filter not in name:
+            continue
+        op, setup = factory()
+        benchmarks.append(Benchmark(name, op, max(1, int(len(messages) * scale)), setup))
+    results = run_suite(benchmarks, args.repeat)
+    for result in results:
+        print(result.format())
+
+    if args.save_baseline:
+        save_baseline(results, args.save_baseline)
+        print(f"Saved baseline to {args.save_baseline}")
+    elif args.baseline and os.path.exists(args.baseline):
+        regressions = compare(results, load_baseline(args.baseline), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
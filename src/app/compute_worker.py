@@ -0,0 +1,150 @@
+"""
+Background compute stage for the Trade Simulator
+Consumes book updates from a bounded queue and runs the cost pipeline off the Tk thread.
+"""
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from src.config import BENCHMARK_INTERVAL_SEC, COMPUTE_QUEUE_SIZE, VOLATILITY_SOURCE
+from src.metrics import latency
+from src.data.orderbook import OrderBook
+from src.models.pipeline import CostPipeline, PipelineResult
+from src.models.scenarios import Scenario, ScenarioMatrix
+
+logger = logging.getLogger(__name__)
+
+
+class ComputeWorker:
+    """
+    Runs the cost pipeline on a dedicated thread.
+
+    The feed submits book snapshots without blocking; when the queue is full
+    the oldest pending book is dropped so the worker always catches up to the
+    newest state. The UI never waits on the models: it polls `latest()` at
+    its own refresh rate. The learning models' training state is logged
+    every BENCHMARK_INTERVAL_SEC, alongside the latency reports.
+    """
+
+    def __init__(self, pipeline: Optional[CostPipeline] = None, maxsize: int = COMPUTE_QUEUE_SIZE) -> None:
+        """Initialize the worker; call start() to begin consuming."""
+        self.pipeline = pipeline or CostPipeline()
+        self.queue: "queue.Queue[Optional[OrderBook]]" = queue.Queue(maxsize=maxsize)
+        self.thread: Optional[threading.Thread] = None
+
+        self._lock = threading.Lock()
+        self._params: Optional[Dict[str, Any]] = None
+        self._matrix: Optional[ScenarioMatrix] = None
+        self._latest: Optional[PipelineResult] = None
+        self._running = False
+
+        self.processed_count = 0
+        self.dropped_count = 0
+        self._stats_logged_at = time.monotonic()
+
+    def start(self) -> None:
+        """Start the worker thread."""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        with self._lock:
+            self._latest = None
+        self._stats_logged_at = time.monotonic()
+        self._running = True
+        self.thread = threading.Thread(target=self._run, name="compute-worker", daemon=True)
+        self.thread.start()
+        logger.info("Compute worker started")
+
+    def stop(self, timeout: float = 1.0) -> None:
+        """Stop the worker thread after the current computation finishes."""
+        self._running = False
+        self._put(None)
+        if self.thread:
+            self.thread.join(timeout)
+            self.thread = None
+        logger.info(f"Compute worker stopped: processed={self.processed_count}, dropped={self.dropped_count}")
+        self._log_model_stats()
+
+    def submit(self, book: OrderBook) -> None:
+        """Queue a book update without blocking the caller."""
+        if self._put(book):
+            self.dropped_count += 1
+
+    def set_params(self, params: Dict[str, Any]) -> None:
+        """Replace the order parameters used for the next computation."""
+        with self._lock:
+            self._params = params
+
+    def set_scenarios(self, scenarios: Optional[List[Scenario]]) -> None:
+        """
+        Register order configurations to reprice on every update, or None to stop.
+
+        Their costs are published as the `surface` of each result, alongside
+        the outputs for the panel's own parameters.
+        """
+        matrix = self.pipeline.scenario_matrix(scenarios) if scenarios else None
+        with self._lock:
+            self._matrix = matrix
+
+    def latest(self) -> Optional[PipelineResult]:
+        """Most recent pipeline result, or None before the first one."""
+        with self._lock:
+            return self._latest
+
+    def _log_model_stats(self) -> None:
+        """Log the learning models' training status and background fit metrics."""
+        self._stats_logged_at = time.monotonic()
+        for name, stats in self.pipeline.model_stats().items():
+            logger.info(f"Model {name}: " + " ".join(f"{key}={value}" for key, value in stats.items()))
+
+    def _put(self, item: Optional[OrderBook]) -> bool:
+        """Enqueue an item, evicting the oldest entry when full. Returns True if one was evicted."""
+        evicted = False
+        while True:
+            try:
+                self.queue.put_nowait(item)
+                return evicted
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    evicted = True
+                except queue.Empty:
+                    pass
+
+    def _run(self) -> None:
+        """Consume book updates until stopped."""
+        while self._running:
+            book = self.queue.get()
+            if book is None:
+                break
+
+            with self._lock:
+                params = self._params
+                matrix = self._matrix
+            if params is None or not book.is_valid:
+                continue
+
+            try:
+                outputs = self.pipeline.run(book, params)
+                surface = None
+                if matrix is not None:
+                    # Same update time as run(), so the live estimators see this book once
+                    surface = self.pipeline.compute_scenarios(
+                        book, matrix, now=self.pipeline.last_received_time,
+                        volatility_source=params.get("volatility_source", VOLATILITY_SOURCE),
+                    )
+            except Exception as e:
+                logger.error(f"Error in compute worker: {e}")
+                continue
+
+            computed_ns = time.perf_counter_ns()
+            if book.received_ns is not None:
+                latency.record("e2e.receive_to_compute", computed_ns - book.received_ns)
+            self.processed_count += 1
+            with self._lock:
+                self._latest = PipelineResult(
+                    book=book, outputs=outputs, sequence=self.processed_count, surface=surface, computed_ns=computed_ns
+                )
+            if time.monotonic() - self._stats_logged_at >= BENCHMARK_INTERVAL_SEC:
+                self._log_model_stats()
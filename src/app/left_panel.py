@@ -1,16 +1,13 @@
 # src/ui/left_panel.py
 
+import os
 import tkinter as tk
-import asyncio
-from src.data.ws_backend import WebSocketManager
-from src.models.spillage import SlippageModel
-import time
-from datetime import datetime,timezone
+from src.data.feed_manager import FeedManager
+from src.data.conflation import ConflatingDispatcher
+from src.app.compute_worker import ComputeWorker
+from src.models.persistence import load_models, save_models
+from src.metrics import latency
 from tkinter import ttk
-from src.models.fee_model import FeeModel
-from src.models.maker_taker_model import MakerTakerModel
-from src.models.market_impact import MarketImpactModel
-import threading
 from src.config import (
     EXCHANGES,
     DEFAULT_EXCHANGE,
@@ -19,6 +16,11 @@ from src.config import (
     DEFAULT_QUANTITY,
     DEFAULT_VOLATILITY,
     DEFAULT_FEE_TIER,
+    UI_REFRESH_RATE_MS,
+    UI_ORDERBOOK_LEVELS,
+    MODEL_STATE_PATH,
+    MODEL_WARM_START,
+    MODEL_SAVE_ON_STOP,
 )
 
 class LeftPanel:
@@ -26,13 +28,20 @@ class LeftPanel:
         self.frame = ttk.LabelFrame(parent, text="Input Parameters", padding=10)
         self.orderbook_panel = orderbook_panel
         self.output_panel=output_panel
-        self.slippage_model= SlippageModel()
         self.simulation_running = False  # New flag to track simulation state
-        self.ws_manager = None
-        self.last_received_time = time.time()
-        self.fee_model = FeeModel()
-        self.maker_taker_model = MakerTakerModel()
-        self.impact_model = MarketImpactModel()
+        self.active_pair = DEFAULT_PAIR
+        self.compute_worker = ComputeWorker()  # Runs the cost models off the Tk thread
+        self.last_result_sequence = 0
+        if MODEL_WARM_START and os.path.exists(MODEL_STATE_PATH):
+            try:
+                load_models(self.compute_worker.pipeline, MODEL_STATE_PATH)
+            except Exception as e:
+                print(f"Could not load saved models: {e}")
+
+        # The pricing pipeline sees every update; the book view only the newest one
+        self.dispatcher = ConflatingDispatcher()
+        self.book_reader = self.dispatcher.reader("orderbook_panel", levels=UI_ORDERBOOK_LEVELS)
+        self.feed_manager = FeedManager(self.dispatcher)  # One event loop for every subscribed symbol
 
 
         # Exchange dropdown
@@ -109,9 +118,16 @@ class LeftPanel:
             self.start_simulation()
 
     def stop_simulation(self):
-        if self.ws_manager:
-            self.ws_manager.close()
-            self.ws_manager = None
+        self.feed_manager.stop()
+        self.feed_manager.remove_symbol(self.active_pair)
+        self.dispatcher.unsubscribe(self.compute_worker.submit, symbol=self.active_pair)
+        self.compute_worker.stop()
+        latency.stop()
+        if MODEL_SAVE_ON_STOP:
+            try:
+                save_models(self.compute_worker.pipeline, MODEL_STATE_PATH)
+            except Exception as e:
+                print(f"Could not save models: {e}")
 
         self.simulation_running = False
         self.submit_button.config(text="Start Simulation")
@@ -130,108 +146,42 @@ class LeftPanel:
         inputs = self.get_inputs()
         exchange = inputs["exchange"]
         pair = inputs["pair"]
-        ws_url = f"{EXCHANGES[exchange].websocket_url}{pair}"
-
-        def handle_ws_message(message):
-            self.frame.after(0, lambda: self.handle_orderbook_update(message))
-
+        self.active_pair = pair
 
-        def run_ws():
-            self.ws_manager = WebSocketManager(ws_url, symbol=pair, on_message=handle_ws_message)
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(self.ws_manager.run())
-
-        threading.Thread(target=run_ws, daemon=True).start()
+        self.dispatcher.subscribe(self.compute_worker.submit, symbol=pair)
+        self.feed_manager.add_symbol(pair, exchange=exchange)
+        self.compute_worker.set_params(inputs)
+        self.compute_worker.start()
+        self.feed_manager.start()
+        latency.start()
 
         self.simulation_running = True
         self.submit_button.config(text="Stop Simulation")
+        self.frame.after(UI_REFRESH_RATE_MS, self.poll_results)
 
 
 
     def on_close(self):
-        if(self.ws_manager):
+        if(self.simulation_running):
             self.stop_simulation()
 
-    def handle_orderbook_update(self, data):
-        def update_ui():
-            try:
-
-                now = time.time()
-                latency_ms = round((now - self.last_received_time) * 1000,2)
-                self.last_received_time = now
-
-                # Directly using "asks" and "bids" from data
-                if "asks" in data and "bids" in data:
-                    bids = [(float(p), float(q)) for p, q in data["bids"][:10]]
-                    asks = [(float(p), float(q)) for p, q in data["asks"][:10]]
-                    self.orderbook_panel.update_orderbook(bids, asks)
-
-                # --- Prepare features for slippage model ---
-                top_bid = bids[0][0]
-                top_ask = asks[0][0]
-                mid_price = (top_bid + top_ask) / 2
-                spread_pct = (top_ask - top_bid) / mid_price * 100
-                # Calculate depths
-                bid_depth = sum(q for _, q in bids)
-                ask_depth = sum(q for _, q in asks)
-
-                # These are also used for imbalance and depth ratio
-                total_bid_qty = bid_depth
-                total_ask_qty = ask_depth
-                imbalance = total_bid_qty / (total_bid_qty + total_ask_qty)
-                depth_ratio = min(total_bid_qty, total_ask_qty) / max(total_bid_qty, total_ask_qty)
-                volatility = self.volatility_var.get() / 100
-                quantity = self.quantity_var.get()
-
-                model_input = {
-                    "quantity": quantity,
-                    "mid_price": mid_price,
-                    "spread_pct": spread_pct,
-                    "imbalance": imbalance,
-                    "depth_ratio": depth_ratio,
-                    "volatility": volatility,
-                    "bid_depth": bid_depth,
-                    "ask_depth": ask_depth,
-                    "order_type": self.order_type_var.get()
-                }
-
-                # --- Use slippage model ---
-                slippage = round(self.slippage_model.calculate(model_input), 4)
-                # --- Use maker/taker model ---
-                order_type = self.order_type_var.get()  # Assuming you have a dropdown for "limit"/"market"
-                model_input["order_type"] = order_type
-                maker_proportion = self.maker_taker_model.predict(model_input)
-                # --- Use fee model ---
-                fees = round(self.fee_model.calculate(quantity, mid_price, maker_proportion), 4)
-                # --- Use market impact model ---
-                impact = round(
-                    self.impact_model.calculate(
-                        quantity=quantity,
-                        price=mid_price,
-                        volatility=model_input["volatility"],
-                        orderbook_data=model_input
-                    ),
-                    4
-                )
-                # --- Final net cost ---
-                net_cost = round(slippage + fees + impact, 4)
-
-                output_data = {
-                    "Expected Slippage(%)": slippage,
-                    "Expected Fees(USD)": fees,
-                    "Market Impact(%)": impact,
-                    "Net Cost(USD)": net_cost,
-                    "Maker/Taker Proportion(out of 100%)": f"{int(maker_proportion * 100)}/{int((1 - maker_proportion) * 100)}",
-                    "Internal Latency(ms)": latency_ms
-                }
-
-                self.output_panel.update(output_data)
-            except Exception as e:
-                print(f"Error in update_ui: {e}")
-            
-
-        
-
-        self.frame.after(0, update_ui)
-
+    def poll_results(self):
+        if not self.simulation_running:
+            return
+        try:
+            # Tk variables may only be read on this thread, so push them to the worker here
+            self.compute_worker.set_params(self.get_inputs())
+
+            # The panels time their own redraws, which they coalesce to UI_REFRESH_RATE_MS
+            book = self.book_reader.poll(self.active_pair)
+            if book is not None and book.is_valid:
+                self.orderbook_panel.update_orderbook(book)
+
+            result = self.compute_worker.latest()
+            if result is not None and result.sequence != self.last_result_sequence:
+                self.last_result_sequence = result.sequence
+                self.output_panel.update(result.outputs, result.computed_ns)
+        except Exception as e:
+            print(f"Error in poll_results: {e}")
+
+        self.frame.after(UI_REFRESH_RATE_MS, self.poll_results)
@@ -1,22 +1,48 @@
+import time
 import tkinter as tk
 from tkinter import ttk
 
+from src.app.redraw import RedrawThrottle
+from src.config import UI_ORDERBOOK_LEVELS
+from src.metrics import latency
+
+EMPTY_ROW = ("", "", "")
+
 
 class OrderBookPanel:
-    def __init__(self, parent):
-        self.frame = ttk.LabelFrame(parent, text="Order Book (Top 10 Levels)")
+    def __init__(self, parent, levels=UI_ORDERBOOK_LEVELS):
+        self.levels = levels
+        self.frame = ttk.LabelFrame(parent, text=f"Order Book (Top {levels} Levels)")
 
         self.tree = ttk.Treeview(self.frame, columns=("Price", "Amount", "Type"), show="headings", height=10)
         self.tree.heading("Price", text="Price")
         self.tree.heading("Amount", text="Amount")
         self.tree.heading("Type", text="Side")
+        scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
         self.tree.pack(fill="both", expand=True)
 
-    def update_orderbook(self, bids, asks):
-        self.tree.delete(*self.tree.get_children())
+        # One persistent row per displayed level: asks from the deepest down to the touch, then bids
+        self.items = [self.tree.insert("", "end", values=EMPTY_ROW) for _ in range(2 * levels)]
+        self.row_values = [EMPTY_ROW] * (2 * levels)
+        self.throttle = RedrawThrottle(self.frame, self._redraw)
+
+    def update_orderbook(self, book):
+        # Coalesced to UI_REFRESH_RATE_MS; only the newest book is drawn
+        self.throttle.request(book)
 
-        for price, amount in asks[:10][::-1]:
-            self.tree.insert("", "end", values=(price, amount, "Ask"))
+    def _redraw(self, book):
+        start = time.perf_counter_ns()
+        bid_prices, bid_sizes, ask_prices, ask_sizes = book.top_levels(self.levels)
+        asks = [(price, amount, "Ask") for price, amount in zip(ask_prices.tolist(), ask_sizes.tolist())]
+        bids = [(price, amount, "Bid") for price, amount in zip(bid_prices.tolist(), bid_sizes.tolist())]
+        # Missing levels are blanked at the outer ends, so the touch rows never move
+        rows = [EMPTY_ROW] * (self.levels - len(asks)) + asks[::-1] + bids + [EMPTY_ROW] * (self.levels - len(bids))
 
-        for price, amount in bids[:10]:
-            self.tree.insert("", "end", values=(price, amount, "Bid"))
+        # Only cells whose values changed are sent to Tk
+        for i, (item, values, previous) in enumerate(zip(self.items, rows, self.row_values)):
+            if values != previous:
+                self.tree.item(item, values=values)
+                self.row_values[i] = values
+        latency.record("ui.orderbook", time.perf_counter_ns() - start)
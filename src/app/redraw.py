@@ -0,0 +1,67 @@
+"""
+Redraw throttling for the Trade Simulator UI
+Coalesces panel updates so widgets are reconfigured at most once per refresh interval.
+"""
+import time
+from typing import Any, Callable, Optional
+
+from src.config import UI_REFRESH_RATE_MS
+
+
+class RedrawThrottle:
+    """
+    Runs a redraw at most once per interval, always with the newest data.
+
+    request() only stores its arguments. If the last redraw is at least
+    interval_ms old it redraws at once; otherwise a single redraw is
+    scheduled with Tk's after() for when the interval is up, and any
+    requests arriving before then replace its arguments. A burst of
+    updates therefore costs one redraw and never queues work behind Tk.
+    Must be used from the Tk thread.
+    """
+
+    def __init__(self, widget: Any, redraw: Callable[..., None], interval_ms: int = UI_REFRESH_RATE_MS) -> None:
+        """
+        Args:
+            widget: Any Tk widget, used to schedule deferred redraws.
+            redraw: Called with the arguments of the latest request().
+            interval_ms: Minimum time between redraws.
+        """
+        self.widget = widget
+        self.redraw = redraw
+        self.interval_ms = interval_ms
+        self.redraw_count = 0
+        self.coalesced_count = 0  # Requests replaced by a newer one before they were drawn
+        self._pending: Optional[tuple] = None
+        self._scheduled: Optional[str] = None
+        self._last_redraw = float("-inf")
+
+    def request(self, *args: Any) -> None:
+        """Ask for a redraw with these arguments."""
+        if self._pending is not None:
+            self.coalesced_count += 1
+        self._pending = args
+        if self._scheduled is not None:
+            return
+        wait_ms = self.interval_ms - (time.monotonic() - self._last_redraw) * 1000
+        if wait_ms <= 0:
+            self._run()
+        else:
+            self._scheduled = self.widget.after(int(wait_ms) + 1, self._run)
+
+    def cancel(self) -> None:
+        """Drop any pending redraw."""
+        if self._scheduled is not None:
+            self.widget.after_cancel(self._scheduled)
+            self._scheduled = None
+        self._pending = None
+
+    def _run(self) -> None:
+        """Redraw with the pending arguments."""
+        self._scheduled = None
+        args, self._pending = self._pending, None
+        if args is None:
+            return
+        self._last_redraw = time.monotonic()
+        self.redraw_count += 1
+        self.redraw(*args)
@@ -1,26 +1,43 @@
 # src/ui/output_panel.py
 
+import time
 import tkinter as tk
 from tkinter import ttk
 
+from src.app.redraw import RedrawThrottle
+from src.metrics import latency
+
 
 class RightPanel:
     def __init__(self, parent):
         self.frame = ttk.LabelFrame(parent, text="Output Parameters")
 
         self.labels = {}
+        self.texts = {}  # Text each label currently shows
         for key in [
             "Expected Slippage(%)", "Expected Fees(USD)", "Market Impact(%)", 
-            "Net Cost(USD)", "Maker/Taker Proportion(out of 100%)", "Internal Latency(ms)"
+            "Net Cost(USD)", "Maker/Taker Proportion(out of 100%)", "Volatility(%)", "Daily Volume(USD)",
+            "Internal Latency(ms)"
         ]:
             label = ttk.Label(self.frame, text=f"{key}: --", anchor="w")
             label.pack(fill="x", padx=5, pady=2)
             self.labels[key] = label
-        
+            self.texts[key] = f"{key}: --"
+
+        self.throttle = RedrawThrottle(self.frame, self._redraw)
 
-            
+    def update(self, data, computed_ns=None):
+        # Coalesced to UI_REFRESH_RATE_MS; computed_ns, when given, times compute-to-display latency
+        self.throttle.request(data, computed_ns)
 
-    def update(self, data):
+    def _redraw(self, data, computed_ns):
+        start = time.perf_counter_ns()
         for key, value in data.items():
-            if key in self.labels:
-                self.labels[key].config(text=f"{key}: {value}")
+            text = f"{key}: {value}"
+            if key in self.labels and self.texts[key] != text:
+                self.labels[key].config(text=text)
+                self.texts[key] = text
+        displayed = time.perf_counter_ns()
+        latency.record("ui.outputs", displayed - start)
+        if computed_ns is not None:
+            latency.record("e2e.compute_to_display", displayed - computed_ns)
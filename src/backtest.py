@@ -0,0 +1,293 @@
+# src/backtest.py
+"""
+Headless backtest engine for the Trade Simulator
+Runs the full cost pipeline over a recorded feed for a grid of order scenarios.
+"""
+import argparse
+import csv
+import logging
+import os
+import time
+from dataclasses import asdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+
+from src.config import (
+    EXCHANGES, DEFAULT_EXCHANGE, DEFAULT_PAIR, DEFAULT_QUANTITY, DEFAULT_VOLATILITY, LOG_FORMAT, VOLATILITY_SOURCE,
+)
+from src.data.orderbook import OrderBook
+from src.data.recorder import replay_books
+from src.data.tick_store import TickStore
+from src.models.features import FeatureStage, empty_features
+from src.models.market_state import MarketStateEstimator, select_volatility
+from src.models.persistence import load_models
+from src.models.pipeline import CostPipeline
+from src.models.scenarios import SIDES, Scenario, build_scenarios
+
+logger = logging.getLogger(__name__)
+
+BATCH_TICKS = 1024  # Ticks priced per vectorized model call
+
+RESULT_COLUMNS = [
+    "ts", "symbol", "scenario", "quantity", "volatility", "fee_tier", "order_type", "side",
+    "mid_price", "spread_pct", "slippage_pct", "book_slippage_pct", "maker_proportion", "fees_usd", "impact_pct", "net_cost",
+]
+
+
+def load_books(path: str, symbol: str, start_ns: Optional[int] = None, end_ns: Optional[int] = None) -> Iterator[Tuple[int, OrderBook]]:
+    """
+    Iterate over book states from a feed recording or a tick store.
+
+    Yields:
+        Tuple of (timestamp ns, book) per tick.
+    """
+    if os.path.isfile(path):
+        with open(path, "rb") as f:
+            is_tick_file = not f.read(2) == b"\x1f\x8b"  # Recordings are gzip streams
+    else:
+        is_tick_file = True
+
+    if is_tick_file:
+        for book in TickStore(path).iter_books(start_ns, end_ns):
+            yield book.timestamp, book
+    else:
+        for ts, book in replay_books(path, symbol):
+            if start_ns is not None and ts < start_ns:
+                continue
+            if end_ns is not None and ts >= end_ns:
+                break
+            yield ts, book
+
+
+class ResultWriter:
+    """Streams result rows to CSV, or to Parquet when pyarrow is installed"""
+
+    def __init__(self, path: str, batch_size: int = 65536) -> None:
+        """Open the output file; the format follows the file extension."""
+        self.path = path
+        self.row_count = 0
+        self._parquet = path.endswith(".parquet")
+        if self._parquet:
+            try:
+                import pyarrow
+                import pyarrow.parquet
+            except ImportError:
+                raise RuntimeError("Parquet output requires pyarrow; install it or write to a .csv file")
+            self._pa = pyarrow
+            self._writer = None
+            self._batch: Dict[str, List[Any]] = {column: [] for column in RESULT_COLUMNS}
+            self._batch_size = batch_size
+        else:
+            self._file = open(path, "w", newline="")
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(RESULT_COLUMNS)
+
+    def write(self, row: List[Any]) -> None:
+        """Append one row in RESULT_COLUMNS order."""
+        self.row_count += 1
+        if not self._parquet:
+            self._csv.writerow(row)
+            return
+        for column, value in zip(RESULT_COLUMNS, row):
+            self._batch[column].append(value)
+        if len(self._batch["ts"]) >= self._batch_size:
+            self._flush_parquet()
+
+    def write_columns(self, columns: List[Any]) -> None:
+        """Append a block of rows given as one sequence per column, in RESULT_COLUMNS order."""
+        count = len(columns[0])
+        self.row_count += count
+        if not self._parquet:
+            self._csv.writerows(zip(*[np.asarray(column).tolist() for column in columns]))
+            return
+        for column, values in zip(RESULT_COLUMNS, columns):
+            self._batch[column].extend(np.asarray(values).tolist())
+        if len(self._batch["ts"]) >= self._batch_size:
+            self._flush_parquet()
+
+    def close(self) -> None:
+        """Flush remaining rows and close the file."""
+        if self._parquet:
+            self._flush_parquet()
+            if self._writer is not None:
+                self._writer.close()
+        else:
+            self._file.close()
+        logger.info(f"Wrote {self.row_count} rows to {self.path}")
+
+    def _flush_parquet(self) -> None:
+        """Write buffered rows as one Parquet row group."""
+        if not self._batch["ts"]:
+            return
+        table = self._pa.table(self._batch)
+        if self._writer is None:
+            self._writer = self._pa.parquet.ParquetWriter(self.path, table.schema)
+        self._writer.write_table(table)
+        self._batch = {column: [] for column in RESULT_COLUMNS}
+
+
+class BacktestEngine:
+    """
+    Evaluates every scenario on every tick without a display.
+
+    By default ticks are buffered into BATCH_TICKS x scenarios feature rows
+    and priced with one call per model through CostPipeline.compute_batch,
+    using fixed model state. With `learn=True` each scenario owns its own
+    CostPipeline instead, so learned model state evolves exactly as it would
+    in a UI session running that configuration, at per-call speed.
+
+    Daily volume always comes from the live estimator replayed over the
+    feed; volatility does too when `live_volatility` is set, replacing the
+    scenario volatilities.
+    """
+
+    def __init__(self, scenarios: List[Scenario], learn: bool = False, live_volatility: bool = False) -> None:
+        """Initialize the shared pipeline, or one pipeline per scenario when learning."""
+        self.scenarios = scenarios
+        self.learn = learn
+        self.live_volatility = live_volatility
+        self.params = [asdict(scenario) for scenario in scenarios]
+        for params in self.params:
+            params["volatility_source"] = VOLATILITY_SOURCE if live_volatility else "input"
+        self.pipelines = [CostPipeline(background_training=False) for _ in scenarios] if learn else [CostPipeline()]
+
+        # Per-scenario columns, tiled across every tick of a batch
+        self.matrix = self.pipelines[0].scenario_matrix(scenarios)
+
+    def run(self, books: Iterable[Tuple[int, OrderBook]], writer: ResultWriter) -> int:
+        """
+        Price every scenario on every tick and stream the rows to `writer`.
+
+        Returns:
+            int: Number of ticks processed.
+        """
+        started = time.perf_counter()
+        ticks = self._run_learning(books, writer) if self.learn else self._run_batched(books, writer)
+        elapsed = time.perf_counter() - started
+        rate = ticks * len(self.scenarios) / elapsed if elapsed > 0 else 0.0
+        logger.info(f"Backtested {ticks} ticks x {len(self.scenarios)} scenarios in {elapsed:.2f}s ({rate:.0f} evaluations/s)")
+        return ticks
+
+    def _run_batched(self, books: Iterable[Tuple[int, OrderBook]], writer: ResultWriter) -> int:
+        """Vectorized path: one model call per BATCH_TICKS ticks."""
+        book_features = empty_features(BATCH_TICKS)
+        stage = FeatureStage()
+        book_slippage = np.zeros((BATCH_TICKS, len(self.scenarios)))
+        timestamps = np.zeros(BATCH_TICKS, dtype=np.int64)
+        market_state = MarketStateEstimator()
+        volatility_source = VOLATILITY_SOURCE if self.live_volatility else "input"
+        symbol = ""
+        ticks = 0
+        pending = 0
+
+        for ts, book in books:
+            # Book-derived features are shared by every scenario on the tick
+            market_state.update(book, ts / 1e9)
+            market = market_state.state()
+            # A zero volatility leaves the scenario volatilities in place
+            stage.update(
+                book, 0.0, select_volatility(market, volatility_source, 0.0), "market",
+                market["daily_volume"] if market["warm"] else 0.0,
+            )
+            book_features[pending] = stage.batch[0]
+            # One book walk per side and tick prices every scenario size
+            book_slippage[pending] = self.matrix.book_slippage(book)
+            timestamps[pending] = ts
+            symbol = book.symbol
+            pending += 1
+            ticks += 1
+            if pending == BATCH_TICKS:
+                self._price_batch(book_features, book_slippage, timestamps, symbol, writer)
+                pending = 0
+
+        if pending:
+            self._price_batch(book_features[:pending], book_slippage[:pending], timestamps[:pending], symbol, writer)
+        return ticks
+
+    def _price_batch(
+        self, book_features: np.ndarray, book_slippage: np.ndarray, timestamps: np.ndarray, symbol: str, writer: ResultWriter
+    ) -> None:
+        """Expand ticks x scenarios into feature rows, price them and write the results."""
+        n_ticks, n_scenarios = len(book_features), len(self.scenarios)
+        # Scenario volatilities fill in until the live estimate is warm
+        features = self.matrix.expand(book_features)
+        result = self.pipelines[0].compute_batch(features, *self.matrix.tile_rates(n_ticks))
+        scenario_numbers = np.arange(n_scenarios)
+        writer.write_columns([
+            np.repeat(timestamps, n_scenarios),
+            [symbol] * len(features),
+            np.tile(scenario_numbers, n_ticks),
+            features["quantity"],
+            features["volatility"],
+            [self.scenarios[i].fee_tier for i in scenario_numbers] * n_ticks,
+            [self.scenarios[i].order_type for i in scenario_numbers] * n_ticks,
+            [self.scenarios[i].side for i in scenario_numbers] * n_ticks,
+            result["mid_price"], result["spread_pct"], result["slippage_pct"], book_slippage.ravel(),
+            result["maker_proportion"], result["fees_usd"], result["impact_pct"], result["net_cost"],
+        ])
+
+    def _run_learning(self, books: Iterable[Tuple[int, OrderBook]], writer: ResultWriter) -> int:
+        """Scalar path: each scenario's pipeline learns from every tick."""
+        ticks = 0
+        for ts, book in books:
+            ticks += 1
+            for number, (scenario, params, pipeline) in enumerate(zip(self.scenarios, self.params, self.pipelines)):
+                result = pipeline.compute(book, params, now=ts / 1e9)
+                book_slippage = float(book.sweep(scenario.quantity, scenario.side).slippage_pct[0])
+                net_cost = result["slippage_pct"] + result["fees_usd"] + result["impact_pct"]
+                writer.write([
+                    ts, book.symbol, number, scenario.quantity, scenario.volatility, scenario.fee_tier, scenario.order_type,
+                    scenario.side,
+                    result["mid_price"], result["spread_pct"], result["slippage_pct"], book_slippage,
+                    result["maker_proportion"], result["fees_usd"], result["impact_pct"], net_cost,
+                ])
+        return ticks
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run the cost pipeline over recorded order book data")
+    parser.add_argument("feed", help="Feed recording (src.data.recorder) or tick store file/directory")
+    parser.add_argument("--symbol", default=DEFAULT_PAIR, help="Symbol to replay from a recording")
+    parser.add_argument("--exchange", default=DEFAULT_EXCHANGE)
+    parser.add_argument("--quantities", type=float, nargs="+", default=[DEFAULT_QUANTITY], help="Order sizes in USD")
+    parser.add_argument("--volatilities", type=float, nargs="+", default=[DEFAULT_VOLATILITY], help="Volatilities as decimals")
+    parser.add_argument("--fee-tiers", nargs="+", default=["all"], help="Fee tier names, or 'all'")
+    parser.add_argument("--order-types", nargs="+", default=["market"])
+    parser.add_argument("--sides", nargs="+", default=["buy"], choices=SIDES)
+    parser.add_argument("--start-ns", type=int, help="First timestamp to include")
+    parser.add_argument("--end-ns", type=int, help="Timestamp to stop before")
+    parser.add_argument("--output", default="backtest_results.csv", help="Output .csv or .parquet file")
+    parser.add_argument(
+        "--live-volatility", action="store_true",
+        help="Use the realized volatility estimated from the feed instead of --volatilities",
+    )
+    parser.add_argument("--models", help="Model file (src.models.persistence) to warm-start every pipeline from")
+    parser.add_argument("--freeze", action="store_true", help="Keep the loaded models fixed instead of learning online")
+    parser.add_argument(
+        "--learn", action="store_true",
+        help="Give each scenario its own online-learning pipeline instead of batch pricing (much slower)",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    # Per-tick model logging would dominate a batch run
+    logging.getLogger("src.models").setLevel(logging.WARNING)
+    logging.getLogger("src.models.maker_taker_model").setLevel(logging.WARNING)
+
+    fee_tiers = list(EXCHANGES[args.exchange].fee_tiers) if args.fee_tiers == ["all"] else args.fee_tiers
+    scenarios = build_scenarios(args.quantities, args.volatilities, fee_tiers, args.order_types, args.exchange, args.sides)
+    logger.info(f"Backtesting {len(scenarios)} scenarios over {args.feed}")
+
+    engine = BacktestEngine(scenarios, learn=args.learn, live_volatility=args.live_volatility)
+    if args.models:
+        for pipeline in engine.pipelines:
+            load_models(pipeline, args.models, freeze=args.freeze)
+    writer = ResultWriter(args.output)
+    try:
+        engine.run(load_books(args.feed, args.symbol, args.start_ns, args.end_ns), writer)
+    finally:
+        writer.close()
+
+
+if __name__ == "__main__":
+    main()
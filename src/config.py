@@ -32,6 +32,15 @@ EXCHANGES = {
     )
 }
 
+# Local stand-in for the OKX feed, served by `python -m src.data.synthetic`
+EXCHANGES["SYNTHETIC"] = ExchangeConfig(
+    name="SYNTHETIC",
+    websocket_url="ws://127.0.0.1:8765/ws/l2-orderbook/okx/",
+    available_pairs=EXCHANGES["OKX"].available_pairs,
+    order_types=EXCHANGES["OKX"].order_types,
+    fee_tiers=EXCHANGES["OKX"].fee_tiers,
+)
+
 # Default values for simulation parameters
 DEFAULT_EXCHANGE = "OKX"
 DEFAULT_PAIR = "BTC-USDT-SWAP"
@@ -40,8 +49,58 @@ DEFAULT_QUANTITY = 100.0  # USD equivalent
 DEFAULT_VOLATILITY = 0.02  # 2% daily volatility
 DEFAULT_FEE_TIER = "TIER 0"
 
+# Order book configuration
+ORDERBOOK_MAX_LEVELS = 400  # Price levels held per side
+ORDERBOOK_DEPTH_LEVELS = 10  # Levels used for depth, imbalance and depth ratio
+ORDERBOOK_INCREMENTAL = True  # Seed from a snapshot, then apply incremental updates in place
+ORDERBOOK_VALIDATE_CHECKSUM = True  # Resnapshot when the exchange checksum does not match
+
+# Feed connection configuration
+WS_RECONNECT_BASE_DELAY_SEC = 0.5  # First reconnect delay, doubled on every failed attempt
+WS_RECONNECT_MAX_DELAY_SEC = 30.0  # Upper bound for the reconnect delay
+WS_PING_INTERVAL_SEC = 20.0  # WebSocket ping interval
+WS_PING_TIMEOUT_SEC = 10.0  # Missing pong after this long closes the socket
+WS_IDLE_TIMEOUT_SEC = 30.0  # No message for this long is treated as a dead feed
+WS_CLOSE_TIMEOUT_SEC = 1.0  # Closing handshake wait before the socket is dropped; a lagging feed may never answer
+
+# Feed latency configuration
+CLOCK_OFFSET_WINDOW_SEC = 300.0  # Window of the minimum-delay filter estimating the exchange clock offset
+LOG_MESSAGE_LATENCY = False  # Log every message's wire latency at DEBUG level
+
+# Synthetic feed configuration
+SYNTHETIC_RATE = 1000.0  # Messages per second per subscription outside bursts
+SYNTHETIC_DEPTH = 400  # Levels per side, as in the OKX books channel
+SYNTHETIC_SEND_INTERVAL_SEC = 0.001  # Pacing step; messages due within a step are sent together
+
+# Feed recording configuration
+RECORDING_COMPRESS_LEVEL = 3  # gzip level for recorded feeds; low levels keep up with live rates
+
+# Historical tick store configuration
+TICKSTORE_LEVELS = 25  # Price/size levels stored per side in each tick record
+
+# Compute worker configuration
+COMPUTE_QUEUE_SIZE = 64  # Pending book updates before the oldest is dropped
+
+# Online model learning configuration
+MODEL_BUFFER_CAPACITY = 5000  # Training samples kept per model; the oldest is overwritten when full
+MODEL_MIN_SAMPLES = 100  # Samples collected before a model starts predicting
+MODEL_DECAY = 1.0  # Per-sample weight decay for the slippage regression; 1.0 weights the window evenly
+MODEL_TRAIN_INTERVAL = 100  # New samples per maker/taker partial_fit step
+MODEL_SGD_LEARNING_RATE = 0.01  # Constant SGD step size; higher forgets old samples faster
+MODEL_STATE_PATH = "model_state.npz"  # Saved model coefficients and training windows
+MODEL_WARM_START = False  # Load MODEL_STATE_PATH at startup when it exists
+MODEL_SAVE_ON_STOP = False  # Save the models to MODEL_STATE_PATH when a simulation stops
+
+# Live market estimator configuration
+VOLATILITY_SOURCE = "ewma"  # Volatility fed to the models: "ewma", "realized" or "input" (the typed value)
+VOLATILITY_EWMA_HALFLIFE_SEC = 60.0  # Half-life of the EWMA realized volatility
+VOLATILITY_WINDOW_SEC = 300.0  # Window of the rolling realized volatility
+VOLUME_WINDOW_SEC = 300.0  # Window of the rolling traded volume
+MARKET_STATE_MIN_SEC = 10.0  # Stream history needed before live estimates replace the inputs
+
 # UI Configuration
-UI_REFRESH_RATE_MS = 100  # UI refresh rate in milliseconds
+UI_REFRESH_RATE_MS = 100  # UI refresh rate in milliseconds; each panel redraws at most this often
+UI_ORDERBOOK_LEVELS = 10  # Levels per side shown in the order book panel
 UI_WINDOW_TITLE = "High-Performance Trade Simulator USING OKX Data"
 UI_WINDOW_SIZE = (1200, 800)
 
@@ -51,5 +110,5 @@ LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 LOG_FILE = "high_frequency_trade_simulator.log"
 
 # Performance benchmarking
-ENABLE_BENCHMARKING = True
+ENABLE_BENCHMARKING = True  # Time each hot-path stage (src.metrics) and log percentiles
 BENCHMARK_INTERVAL_SEC = 10  # Benchmark reporting interval in seconds
\ No newline at end of file
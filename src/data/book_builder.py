@@ -0,0 +1,131 @@
+"""
+Order book builder for the Trade Simulator
+Applies feed messages to an OrderBook from full snapshots or incremental updates.
+"""
+import logging
+from typing import Any, Dict, Optional
+
+from src.data.orderbook import OrderBook
+
+logger = logging.getLogger(__name__)
+
+
+class BookBuilder:
+    """
+    Keeps an OrderBook in sync with a books channel.
+
+    Two message shapes are understood:
+      * flat snapshots carrying "bids"/"asks" at the top level, which always
+        replace the book;
+      * OKX-style {"action": "snapshot"|"update", "data": [...]} messages.
+
+    In incremental mode the book is seeded once from a snapshot and then
+    updated in place from changed levels only. A break in the seqId/prevSeqId
+    chain or a checksum mismatch marks the book as out of sync and raises
+    `needs_resnapshot`, which the feed uses to request a fresh snapshot.
+    Updates received while out of sync are discarded.
+    """
+
+    def __init__(self, book: OrderBook, incremental: bool = True, validate_checksum: bool = True) -> None:
+        """Initialize builder state for the given book."""
+        self.book = book
+        self.incremental = incremental
+        self.validate_checksum = validate_checksum
+
+        self.synced = False
+        self.needs_resnapshot = False
+        self.last_seq_id: Optional[int] = None
+
+        self.snapshot_count = 0
+        self.update_count = 0
+        self.gap_count = 0
+        self.checksum_failures = 0
+        self.discarded_count = 0
+
+    def apply(self, message: Dict[str, Any]) -> bool:
+        """
+        Apply one decoded feed message to the book.
+
+        Args:
+            message (Dict[str, Any]): Decoded feed message.
+
+        Returns:
+            bool: True if the book changed and is in sync.
+        """
+        if "bids" in message and "asks" in message:
+            self._apply_snapshot(message["bids"], message["asks"], message.get("timestamp"), None)
+            return True
+
+        entries = message.get("data")
+        if not entries:
+            return False
+
+        action = message.get("action", "snapshot")
+        changed = False
+        for entry in entries:
+            if action == "snapshot" or not self.incremental:
+                self._apply_snapshot(entry.get("bids", []), entry.get("asks", []), entry.get("ts"), entry.get("seqId"))
+                changed = True
+            elif self._apply_update(entry):
+                changed = True
+            else:
+                return False
+
+            if not self._checksum_ok(entry):
+                return False
+        return changed
+
+    def reset(self) -> None:
+        """Invalidate the book and wait for the next snapshot."""
+        self.book.clear()
+        self.synced = False
+        self.needs_resnapshot = False
+        self.last_seq_id = None
+
+    def _apply_snapshot(self, bids, asks, timestamp: Optional[str], seq_id: Optional[int]) -> None:
+        """Seed the book from a full snapshot."""
+        self.book.update(bids, asks, timestamp)
+        self.last_seq_id = seq_id
+        self.synced = True
+        self.needs_resnapshot = False
+        self.snapshot_count += 1
+
+    def _apply_update(self, entry: Dict[str, Any]) -> bool:
+        """Apply an incremental update after validating the sequence chain."""
+        if not self.synced:
+            self.discarded_count += 1
+            return False
+
+        prev_seq_id = entry.get("prevSeqId")
+        if self.last_seq_id is not None and prev_seq_id is not None and prev_seq_id != self.last_seq_id:
+            self.gap_count += 1
+            logger.warning(
+                f"Sequence gap on {self.book.symbol}: expected prevSeqId {self.last_seq_id}, got {prev_seq_id}"
+            )
+            self._mark_out_of_sync()
+            return False
+
+        self.book.apply_delta(entry.get("bids", []), entry.get("asks", []), entry.get("ts"))
+        self.last_seq_id = entry.get("seqId", self.last_seq_id)
+        self.update_count += 1
+        return True
+
+    def _checksum_ok(self, entry: Dict[str, Any]) -> bool:
+        """Compare the exchange checksum against the local book, if both are available."""
+        expected = entry.get("checksum")
+        if not self.validate_checksum or expected is None:
+            return True
+
+        actual = self.book.checksum()
+        if actual != int(expected):
+            self.checksum_failures += 1
+            logger.warning(f"Checksum mismatch on {self.book.symbol}: expected {expected}, got {actual}")
+            self._mark_out_of_sync()
+            return False
+        return True
+
+    def _mark_out_of_sync(self) -> None:
+        """Drop the book and ask the feed for a fresh snapshot."""
+        self.book.clear()
+        self.synced = False
+        self.needs_resnapshot = True
@@ -0,0 +1,113 @@
+"""
+Exchange clock tracking for the Trade Simulator
+Parses exchange timestamps and estimates the offset between the exchange clock and ours.
+"""
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from src.config import CLOCK_OFFSET_WINDOW_SEC
+
+NS_PER_SEC = 1_000_000_000
+
+
+def parse_exchange_timestamp(value: Any) -> Optional[int]:
+    """
+    Convert an exchange timestamp to ns since the epoch.
+
+    Accepts epoch numbers or numeric strings in seconds, ms, us or ns
+    (told apart by magnitude, as OKX sends ms strings) and ISO 8601
+    strings such as "2025-05-04T10:39:13Z".
+
+    Returns:
+        Optional[int]: ns since the epoch, or None if the value is missing or unparseable.
+    """
+    if value is None or value == "":
+        return None
+    number = value if isinstance(value, (int, float)) else None
+    if number is None:
+        # Integer strings first, so ms/ns epoch strings keep their exact value
+        for parse in (int, float):
+            try:
+                number = parse(value)
+                break
+            except (TypeError, ValueError):
+                pass
+    if number is None:
+        try:
+            parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return int(parsed.timestamp()) * NS_PER_SEC + parsed.microsecond * 1000
+
+    # Present-day epoch values are ~1.7e9 s, 1.7e12 ms, 1.7e15 us, 1.7e18 ns
+    if number >= 1e17:
+        return int(number)
+    if number >= 1e14:
+        return int(number * 1_000)
+    if number >= 1e11:
+        return int(number * 1_000_000)
+    return int(number * NS_PER_SEC)
+
+
+class ClockOffsetEstimator:
+    """
+    Estimates how far our wall clock runs ahead of the exchange's.
+
+    Every message gives receive time minus exchange time = offset + one-way
+    delay. The delay is never negative, so the smallest observation over a
+    sliding window approaches offset + minimum delay; half the measured
+    ping round trip is taken as that minimum delay. The corrected
+    wire latency of a message is then its observation minus the offset,
+    comparable across hosts whatever their clock error.
+    """
+
+    def __init__(self, window_sec: float = CLOCK_OFFSET_WINDOW_SEC) -> None:
+        """Start with no observations."""
+        self.window_ns = int(window_sec * NS_PER_SEC)
+        self._window: Deque[Tuple[int, int]] = deque()  # (receive ns, observed ns), observed increasing
+        self.rtt_ns = 0
+        self.samples = 0
+        self.last_observed_ns: Optional[int] = None
+
+    def observe(self, exchange_ns: int, received_ns: int) -> int:
+        """
+        Fold in one message.
+
+        Returns:
+            int: Its wire latency in ns, corrected for the clock offset.
+        """
+        observed = received_ns - exchange_ns
+        # Monotonic deque: the front is always the window minimum
+        window = self._window
+        while window and window[-1][1] >= observed:
+            window.pop()
+        window.append((received_ns, observed))
+        while window[0][0] <= received_ns - self.window_ns:
+            window.popleft()
+        self.samples += 1
+        self.last_observed_ns = observed
+        return observed - self.offset_ns
+
+    def set_rtt(self, rtt_ns: int) -> None:
+        """Record the latest measured round trip to the exchange."""
+        self.rtt_ns = max(int(rtt_ns), 0)
+
+    @property
+    def offset_ns(self) -> int:
+        """Our clock minus the exchange clock, in ns; 0 before the first message."""
+        if not self._window:
+            return 0
+        return self._window[0][1] - self.rtt_ns // 2
+
+    def stats(self) -> Dict[str, Any]:
+        """Offset, round trip and latest wire latency in ms."""
+        last = None if self.last_observed_ns is None else round((self.last_observed_ns - self.offset_ns) / 1e6, 3)
+        return {
+            "offset_ms": round(self.offset_ns / 1e6, 3),
+            "rtt_ms": round(self.rtt_ns / 1e6, 3),
+            "last_wire_ms": last,
+            "samples": self.samples,
+        }
@@ -0,0 +1,162 @@
+"""
+Conflating dispatch for the Trade Simulator
+Keeps only the newest book state per symbol between the feed and its consumers.
+"""
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from src.data.orderbook import OrderBook
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ConflationStats:
+    """Per-symbol dispatch counters"""
+    published: int = 0
+    conflated: int = 0  # Updates overwritten before every reader had seen them
+
+
+class ConflatedReader:
+    """
+    Slow-consumer handle that only ever sees the newest book per symbol.
+
+    Each reader tracks the last version it saw, so updates published between
+    two polls are skipped and counted rather than queued.
+    """
+
+    def __init__(self, dispatcher: "ConflatingDispatcher", name: str, levels: Optional[int] = None) -> None:
+        """Initialize reader state; use ConflatingDispatcher.reader() instead."""
+        self.dispatcher = dispatcher
+        self.name = name
+        self.levels = levels  # Book levels per side this reader looks at; None for the whole book
+        self.seen: Dict[str, int] = {}
+        self.delivered = 0
+        self.dropped = 0
+
+    def poll(self, symbol: str) -> Optional[OrderBook]:
+        """
+        Return the newest book for `symbol` if it changed since the last poll.
+
+        Returns:
+            Optional[OrderBook]: Latest book snapshot, holding at least the
+            reader's `levels` per side, or None if nothing new.
+        """
+        book, version = self.dispatcher.latest(symbol)
+        last = self.seen.get(symbol, 0)
+        if book is None or version == last:
+            return None
+
+        self.dropped += version - last - 1
+        self.delivered += 1
+        self.seen[symbol] = version
+        return book
+
+
+class ConflatingDispatcher:
+    """
+    Latest-value-wins fan-out between the feed and its consumers.
+
+    Fast consumers subscribe a callback and are invoked inline for every
+    update; slow consumers (UI, logging) hold a ConflatedReader and poll at
+    their own rate. Only one book snapshot per symbol is ever retained, so
+    memory and staleness stay bounded however far a reader falls behind.
+    Without fast consumers, readers get a copy of only the levels they
+    declared, and nothing is copied when there are no consumers at all.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty per-symbol state."""
+        self._lock = threading.Lock()
+        self._latest: Dict[str, OrderBook] = {}
+        self._versions: Dict[str, int] = {}
+        self._subscribers: Dict[Optional[str], List[Callable[[OrderBook], None]]] = {}
+        self._readers: List[ConflatedReader] = []
+        self._reader_levels: Optional[int] = 0  # Deepest level any reader looks at; None for the whole book
+        self.stats: Dict[str, ConflationStats] = {}
+
+    def subscribe(self, callback: Callable[[OrderBook], None], symbol: Optional[str] = None) -> None:
+        """
+        Register a fast consumer that receives every published update.
+
+        Args:
+            callback: Called with each book snapshot.
+            symbol: Only route updates for this symbol; None receives all symbols.
+        """
+        with self._lock:
+            self._subscribers.setdefault(symbol, []).append(callback)
+
+    def unsubscribe(self, callback: Callable[[OrderBook], None], symbol: Optional[str] = None) -> None:
+        """Remove a fast consumer registered with subscribe()."""
+        with self._lock:
+            callbacks = self._subscribers.get(symbol, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    def reader(self, name: str, levels: Optional[int] = None) -> ConflatedReader:
+        """
+        Create a conflated reader for a slow consumer.
+
+        Args:
+            name: Reader name, for logs.
+            levels: Book levels per side the consumer looks at, e.g. the rows
+                of a book display; None when it needs the whole book.
+        """
+        reader = ConflatedReader(self, name, levels)
+        with self._lock:
+            self._readers.append(reader)
+            if levels is None or self._reader_levels is None:
+                self._reader_levels = None
+            else:
+                self._reader_levels = max(self._reader_levels, levels)
+        return reader
+
+    def publish(self, book: OrderBook) -> None:
+        """
+        Publish the current state of a live book.
+
+        A snapshot is taken once here and shared read-only with every
+        consumer, so the feed may keep mutating its book afterwards. It
+        covers the whole book when a fast consumer receives it, and only the
+        levels the readers declared otherwise.
+        """
+        symbol = book.symbol
+        with self._lock:
+            callbacks = self._subscribers.get(symbol, []) + self._subscribers.get(None, [])
+            reader_levels = self._reader_levels
+
+        if callbacks or reader_levels is None:
+            snapshot = book.snapshot()
+        elif reader_levels:
+            snapshot = book.snapshot(reader_levels)
+        else:
+            snapshot = None  # Nobody would read it
+
+        with self._lock:
+            stats = self.stats.get(symbol)
+            if stats is None:
+                stats = self.stats[symbol] = ConflationStats()
+            version = self._versions.get(symbol, 0)
+            if any(reader.seen.get(symbol, 0) < version for reader in self._readers):
+                stats.conflated += 1
+            stats.published += 1
+            self._versions[symbol] = version + 1
+            self._latest[symbol] = snapshot
+
+        for callback in callbacks:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                logger.error(f"Subscriber failed for {symbol}: {e}")
+
+    def latest(self, symbol: str):
+        """
+        Newest book for `symbol` and its version number.
+
+        Returns:
+            Tuple of (book or None, version).
+        """
+        with self._lock:
+            return self._latest.get(symbol), self._versions.get(symbol, 0)
@@ -0,0 +1,161 @@
+"""
+Multi-symbol feed manager for the Trade Simulator
+Runs every symbol subscription on a single asyncio loop in one background thread.
+"""
+import asyncio
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from src.config import EXCHANGES
+from src.data.conflation import ConflatingDispatcher
+from src.data.orderbook import OrderBook
+from src.data.recorder import FeedRecorder
+from src.data.ws_backend import WebSocketManager
+
+logger = logging.getLogger(__name__)
+
+
+class FeedManager:
+    """
+    Owns one event loop thread and any number of WebSocketManager connections.
+
+    Each symbol gets its own OrderBook, kept by its connection, and every
+    applied update is published through a shared ConflatingDispatcher, which
+    routes it to the pipelines subscribed for that symbol. Symbols can be
+    added and removed from any thread while the loop is running.
+    """
+
+    def __init__(self, dispatcher: Optional[ConflatingDispatcher] = None, recorder: Optional[FeedRecorder] = None) -> None:
+        """Initialize the manager; call start() to run the loop."""
+        self.dispatcher = dispatcher or ConflatingDispatcher()
+        self.recorder = recorder  # Shared by every connection when set
+        self.connections: Dict[str, WebSocketManager] = {}
+        self.books: Dict[str, OrderBook] = {}
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread: Optional[threading.Thread] = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._ready = threading.Event()
+
+    def add_symbol(
+        self,
+        symbol: str,
+        exchange: str = "OKX",
+        url: Optional[str] = None,
+        on_book: Optional[Callable[[OrderBook], None]] = None,
+    ) -> OrderBook:
+        """
+        Subscribe to a symbol's order book.
+
+        Args:
+            symbol: Instrument id, e.g. "BTC-USDT-SWAP".
+            exchange: Key into EXCHANGES used to build the endpoint URL.
+            url: Explicit endpoint, overriding the exchange URL.
+            on_book: Optional fast consumer for this symbol only.
+
+        Returns:
+            OrderBook: The live book maintained for the symbol.
+        """
+        if symbol in self.connections:
+            return self.books[symbol]
+
+        ws_url = url or f"{EXCHANGES[exchange].websocket_url}{symbol}"
+        book = OrderBook(symbol=symbol)
+        manager = WebSocketManager(
+            ws_url, symbol=symbol, book=book, on_book=self.dispatcher.publish, recorder=self.recorder
+        )
+        self.books[symbol] = book
+        self.connections[symbol] = manager
+        if on_book:
+            self.dispatcher.subscribe(on_book, symbol=symbol)
+
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._start_connection, symbol)
+        logger.info(f"Added {symbol} feed")
+        return book
+
+    def remove_symbol(self, symbol: str) -> None:
+        """Close and forget a symbol's connection."""
+        manager = self.connections.pop(symbol, None)
+        self.books.pop(symbol, None)
+        if manager is not None and self.loop is not None:
+            asyncio.run_coroutine_threadsafe(self._stop_connection(symbol, manager), self.loop)
+        logger.info(f"Removed {symbol} feed")
+
+    def start(self) -> None:
+        """Start the loop thread and connect every added symbol."""
+        if self.thread is not None:
+            return
+        self._ready.clear()
+        self.thread = threading.Thread(target=self._run_loop, name="feed-manager", daemon=True)
+        self.thread.start()
+        self._ready.wait()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Close every connection, stop the loop and join its thread."""
+        if self.loop is None:
+            return
+        future = asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop)
+        try:
+            future.result(timeout)
+        except Exception as e:
+            logger.error(f"Feed shutdown did not complete cleanly: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        if self.thread:
+            self.thread.join(timeout)
+        self.thread = None
+        if self.recorder:
+            self.recorder.flush()
+        logger.info("Feed manager stopped")
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-connection stats, including conflation counters."""
+        stats = []
+        for symbol, manager in list(self.connections.items()):
+            entry = manager.stats()
+            dispatch = self.dispatcher.stats.get(symbol)
+            if dispatch is not None:
+                entry["published"] = dispatch.published
+                entry["conflated"] = dispatch.conflated
+            stats.append(entry)
+        return stats
+
+    def _run_loop(self) -> None:
+        """Thread body: run the shared event loop until stop()."""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self.loop = loop
+        for symbol in list(self.connections):
+            self._start_connection(symbol)
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+            self.loop = None
+
+    def _start_connection(self, symbol: str) -> None:
+        """Create the connection task for a symbol; runs on the loop thread."""
+        manager = self.connections.get(symbol)
+        if manager is None or symbol in self._tasks:
+            return
+        self._tasks[symbol] = self.loop.create_task(manager.run(), name=f"feed-{symbol}")
+
+    async def _stop_connection(self, symbol: str, manager: WebSocketManager) -> None:
+        """Close one connection and wait for its task to end."""
+        await manager.aclose()
+        task = self._tasks.pop(symbol, None)
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _shutdown(self) -> None:
+        """Close every connection on the loop thread."""
+        for symbol, manager in list(self.connections.items()):
+            await self._stop_connection(symbol, manager)
+        for task in list(self._tasks.values()):
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
@@ -0,0 +1,461 @@
+"""
+Array-backed L2 order book for the Trade Simulator
+"""
+import logging
+import zlib
+from dataclasses import dataclass
+import numpy as np
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from src.config import ORDERBOOK_MAX_LEVELS, ORDERBOOK_DEPTH_LEVELS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ExecutionEstimate:
+    """Result of sweeping one side of the book, one entry per requested notional"""
+    notional: np.ndarray  # Requested USD notional
+    vwap: np.ndarray  # Average fill price, NaN when nothing could be filled
+    levels: np.ndarray  # Price levels touched, including a partially filled last level
+    filled_size: np.ndarray  # Base quantity filled
+    unfilled_notional: np.ndarray  # USD notional left when the visible book runs out
+    slippage_pct: np.ndarray  # VWAP distance from mid price, in percent, adverse positive
+
+
+class OrderBook:
+    """
+    L2 order book holding both sides in preallocated NumPy price/size arrays.
+
+    Bids are kept in descending price order and asks in ascending price order,
+    so index 0 is always the top of book. Cumulative sizes and notionals are
+    maintained on every update, which makes best price, spread, depth and
+    imbalance O(1) and sweeping the book for a notional O(log levels).
+    """
+
+    def __init__(
+        self,
+        symbol: str = "",
+        max_levels: int = ORDERBOOK_MAX_LEVELS,
+        depth_levels: int = ORDERBOOK_DEPTH_LEVELS,
+    ) -> None:
+        """Initialize empty book sides."""
+        self.symbol = symbol
+        self.max_levels = max_levels
+        self.depth_levels = depth_levels
+
+        self.bid_prices = np.zeros(max_levels, dtype=np.float64)
+        self.bid_sizes = np.zeros(max_levels, dtype=np.float64)
+        self.bid_cum = np.zeros(max_levels, dtype=np.float64)
+        self.bid_notional = np.zeros(max_levels, dtype=np.float64)  # Cumulative price * size
+        self.ask_prices = np.zeros(max_levels, dtype=np.float64)
+        self.ask_sizes = np.zeros(max_levels, dtype=np.float64)
+        self.ask_cum = np.zeros(max_levels, dtype=np.float64)
+        self.ask_notional = np.zeros(max_levels, dtype=np.float64)
+        # Exchange price/size strings by price, for the checksum; empty for books not loaded from the wire
+        self.bid_texts: Dict[float, Tuple[Any, Any]] = {}
+        self.ask_texts: Dict[float, Tuple[Any, Any]] = {}
+
+        self.n_bids = 0
+        self.n_asks = 0
+        self.timestamp: Optional[str] = None
+        self.received_ns: Optional[int] = None  # perf_counter_ns() when the feed received the update
+        self.update_count = 0
+
+    def update(self, bids: Sequence[Sequence[Any]], asks: Sequence[Sequence[Any]], timestamp: Optional[str] = None) -> None:
+        """
+        Replace both sides from snapshot level lists.
+
+        Args:
+            bids: Bid levels as [price, size, ...] rows, best first.
+            asks: Ask levels as [price, size, ...] rows, best first.
+            timestamp: Exchange timestamp of the snapshot, if any.
+        """
+        self.n_bids = self._load_side(bids, self.bid_prices, self.bid_sizes, self.bid_cum, self.bid_notional, self.bid_texts)
+        self.n_asks = self._load_side(asks, self.ask_prices, self.ask_sizes, self.ask_cum, self.ask_notional, self.ask_texts)
+        self.timestamp = timestamp
+        self.update_count += 1
+
+    def apply_delta(self, bids: Sequence[Sequence[Any]], asks: Sequence[Sequence[Any]], timestamp: Optional[str] = None) -> None:
+        """
+        Apply incremental level changes in place.
+
+        A level with size 0 is removed, an existing price has its size
+        replaced and a new price is inserted at its sorted position. Levels
+        that would fall beyond max_levels are dropped.
+
+        Args:
+            bids: Changed bid levels as [price, size, ...] rows.
+            asks: Changed ask levels as [price, size, ...] rows.
+            timestamp: Exchange timestamp of the update, if any.
+        """
+        self.n_bids = self._apply_side_delta(
+            bids, self.bid_prices, self.bid_sizes, self.bid_cum, self.bid_notional, self.bid_texts, self.n_bids, True
+        )
+        self.n_asks = self._apply_side_delta(
+            asks, self.ask_prices, self.ask_sizes, self.ask_cum, self.ask_notional, self.ask_texts, self.n_asks, False
+        )
+        self.timestamp = timestamp
+        self.update_count += 1
+
+    def load_arrays(
+        self,
+        bid_prices: np.ndarray,
+        bid_sizes: np.ndarray,
+        ask_prices: np.ndarray,
+        ask_sizes: np.ndarray,
+        timestamp: Optional[Any] = None,
+    ) -> None:
+        """
+        Replace both sides from numeric level arrays, e.g. stored tick records.
+
+        Levels with a non-positive size mark the end of a side.
+        """
+        self.n_bids = self._load_side_arrays(
+            bid_prices, bid_sizes, self.bid_prices, self.bid_sizes, self.bid_cum, self.bid_notional
+        )
+        self.n_asks = self._load_side_arrays(
+            ask_prices, ask_sizes, self.ask_prices, self.ask_sizes, self.ask_cum, self.ask_notional
+        )
+        self.bid_texts.clear()
+        self.ask_texts.clear()
+        self.timestamp = timestamp
+        self.update_count += 1
+
+    def clear(self) -> None:
+        """Drop all levels, e.g. before reseeding from a new snapshot."""
+        self.n_bids = 0
+        self.n_asks = 0
+        self.bid_texts.clear()
+        self.ask_texts.clear()
+        self.timestamp = None
+
+    def snapshot(self, levels: Optional[int] = None) -> "OrderBook":
+        """
+        Copy the populated levels into a new book.
+
+        The copy is independent of further updates, so it can be handed to
+        another thread while this book keeps being written by the feed. The
+        exchange strings are not copied; see checksum().
+
+        Args:
+            levels: Copy only the top `levels` of each side, e.g. for a
+                display; None copies the whole book.
+        """
+        nb = self.n_bids if levels is None else min(levels, self.n_bids)
+        na = self.n_asks if levels is None else min(levels, self.n_asks)
+        copy = OrderBook(self.symbol, max(nb, na, 1), self.depth_levels)
+        copy.bid_prices[:nb] = self.bid_prices[:nb]
+        copy.bid_sizes[:nb] = self.bid_sizes[:nb]
+        copy.bid_cum[:nb] = self.bid_cum[:nb]
+        copy.bid_notional[:nb] = self.bid_notional[:nb]
+        copy.ask_prices[:na] = self.ask_prices[:na]
+        copy.ask_sizes[:na] = self.ask_sizes[:na]
+        copy.ask_cum[:na] = self.ask_cum[:na]
+        copy.ask_notional[:na] = self.ask_notional[:na]
+        copy.n_bids = nb
+        copy.n_asks = na
+        copy.timestamp = self.timestamp
+        copy.received_ns = self.received_ns
+        copy.update_count = self.update_count
+        return copy
+
+    def checksum(self, levels: int = 25) -> int:
+        """
+        OKX-style CRC32 over the top `levels` of each side.
+
+        Levels are interleaved as bidPx:bidSz:askPx:askSz and the CRC is
+        returned as a signed 32-bit integer. Levels use the exact strings
+        the exchange sent, as it hashes its own text (e.g. "0.10"); levels
+        without them, such as those loaded from arrays or copied by
+        snapshot(), are rendered back from floats.
+        """
+        bid_prices, bid_sizes, ask_prices, ask_sizes = self.top_levels(levels)
+        bids = _level_texts(bid_prices, bid_sizes, self.bid_texts)
+        asks = _level_texts(ask_prices, ask_sizes, self.ask_texts)
+        parts = []
+        for i in range(max(len(bids), len(asks))):
+            if i < len(bids):
+                parts.extend(bids[i])
+            if i < len(asks):
+                parts.extend(asks[i])
+        crc = zlib.crc32(":".join(parts).encode())
+        return crc - (1 << 32) if crc >= (1 << 31) else crc
+
+    def _apply_side_delta(
+        self,
+        levels: Sequence[Sequence[Any]],
+        prices: np.ndarray,
+        sizes: np.ndarray,
+        cum: np.ndarray,
+        notional: np.ndarray,
+        texts: Dict[float, Tuple[Any, Any]],
+        n: int,
+        descending: bool,
+    ) -> int:
+        """Apply changed levels to one side and return its new level count."""
+        if not len(levels):
+            return n
+
+        rows = _level_array(levels, len(levels)).tolist()
+        first_changed = n
+        # Removals first: on a full side an insert ahead of a removal would push out a level the exchange still holds
+        order = [k for k, row in enumerate(rows) if row[1] == 0] + [k for k, row in enumerate(rows) if row[1] != 0]
+        for k in order:
+            price, size = rows[k]
+            if descending:
+                i = n - int(np.searchsorted(prices[:n][::-1], price, side="right"))
+            else:
+                i = int(np.searchsorted(prices[:n], price, side="left"))
+
+            if i < n and prices[i] == price:
+                if size == 0:
+                    prices[i:n - 1] = prices[i + 1:n]
+                    sizes[i:n - 1] = sizes[i + 1:n]
+                    n -= 1
+                    texts.pop(price, None)
+                    first_changed = min(first_changed, i)
+                    continue
+                sizes[i] = size
+            elif size > 0 and i < self.max_levels:
+                if n == self.max_levels:
+                    texts.pop(prices[n - 1].item(), None)
+                end = min(n, self.max_levels - 1)
+                prices[i + 1:end + 1] = prices[i:end]
+                sizes[i + 1:end + 1] = sizes[i:end]
+                prices[i] = price
+                sizes[i] = size
+                n = end + 1
+            else:
+                continue
+            level = levels[k]
+            texts[price] = (level[0], level[1])
+            first_changed = min(first_changed, i)
+
+        # Only the cumulative values at or below the highest changed level move
+        if first_changed < n:
+            _accumulate(prices, sizes, cum, notional, first_changed, n)
+        return n
+
+    def _load_side(
+        self,
+        levels: Sequence[Sequence[Any]],
+        prices: np.ndarray,
+        sizes: np.ndarray,
+        cum: np.ndarray,
+        notional: np.ndarray,
+        texts: Dict[float, Tuple[Any, Any]],
+    ) -> int:
+        """Convert level rows straight into the preallocated side arrays."""
+        n = min(len(levels), self.max_levels)
+        texts.clear()
+        if n:
+            rows = _level_array(levels, n)
+            prices[:n] = rows[:, 0]
+            sizes[:n] = rows[:, 1]
+            _accumulate(prices, sizes, cum, notional, 0, n)
+            texts.update(zip(prices[:n].tolist(), [(level[0], level[1]) for level in levels[:n]]))
+        return n
+
+    def _load_side_arrays(
+        self,
+        src_prices: np.ndarray,
+        src_sizes: np.ndarray,
+        prices: np.ndarray,
+        sizes: np.ndarray,
+        cum: np.ndarray,
+        notional: np.ndarray,
+    ) -> int:
+        """Copy numeric levels into the side arrays, stopping at the first empty level."""
+        n = min(len(src_sizes), self.max_levels)
+        empty = np.flatnonzero(src_sizes[:n] <= 0)
+        if len(empty):
+            n = int(empty[0])
+        if n:
+            prices[:n] = src_prices[:n]
+            sizes[:n] = src_sizes[:n]
+            _accumulate(prices, sizes, cum, notional, 0, n)
+        return n
+
+    @property
+    def is_valid(self) -> bool:
+        """True when both sides hold at least one level."""
+        return self.n_bids > 0 and self.n_asks > 0
+
+    @property
+    def best_bid(self) -> float:
+        """Highest bid price, NaN when the side is empty."""
+        return float(self.bid_prices[0]) if self.n_bids else float("nan")
+
+    @property
+    def best_ask(self) -> float:
+        """Lowest ask price, NaN when the side is empty."""
+        return float(self.ask_prices[0]) if self.n_asks else float("nan")
+
+    @property
+    def mid_price(self) -> float:
+        """Mid price between best bid and best ask."""
+        return (self.best_bid + self.best_ask) / 2
+
+    @property
+    def spread(self) -> float:
+        """Absolute bid/ask spread."""
+        return self.best_ask - self.best_bid
+
+    @property
+    def spread_pct(self) -> float:
+        """Spread as a percentage of mid price."""
+        return self.spread / self.mid_price * 100
+
+    def bid_depth(self, levels: Optional[int] = None) -> float:
+        """Cumulative bid size over the top `levels` levels (default depth_levels)."""
+        n = min(self.depth_levels if levels is None else levels, self.n_bids)
+        return float(self.bid_cum[n - 1]) if n > 0 else 0.0
+
+    def ask_depth(self, levels: Optional[int] = None) -> float:
+        """Cumulative ask size over the top `levels` levels (default depth_levels)."""
+        n = min(self.depth_levels if levels is None else levels, self.n_asks)
+        return float(self.ask_cum[n - 1]) if n > 0 else 0.0
+
+    @property
+    def imbalance(self) -> float:
+        """Share of bid size in total visible depth."""
+        bid_depth = self.bid_depth()
+        ask_depth = self.ask_depth()
+        return bid_depth / (bid_depth + ask_depth)
+
+    @property
+    def depth_ratio(self) -> float:
+        """Ratio of the thinner side's depth to the thicker side's depth."""
+        bid_depth = self.bid_depth()
+        ask_depth = self.ask_depth()
+        return min(bid_depth, ask_depth) / max(bid_depth, ask_depth)
+
+    def top_levels(self, levels: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Return views over the top `levels` levels of each side.
+
+        Returns:
+            Tuple of (bid_prices, bid_sizes, ask_prices, ask_sizes) views.
+        """
+        nb = min(levels, self.n_bids)
+        na = min(levels, self.n_asks)
+        return self.bid_prices[:nb], self.bid_sizes[:nb], self.ask_prices[:na], self.ask_sizes[:na]
+
+    def sweep(self, notional: Union[float, Sequence[float], np.ndarray], side: str = "buy") -> ExecutionEstimate:
+        """
+        Estimate market order fills by walking the visible book.
+
+        Every requested USD notional is located on the side's cumulative
+        notional with one binary search, so a whole slippage curve costs
+        O(m log levels) against the same book state.
+
+        Args:
+            notional: USD notional to execute, scalar or array.
+            side: "buy" walks the asks, "sell" walks the bids.
+
+        Returns:
+            ExecutionEstimate: One entry per requested notional.
+        """
+        if side == "buy":
+            n, prices, cum, cum_notional = self.n_asks, self.ask_prices, self.ask_cum, self.ask_notional
+        elif side == "sell":
+            n, prices, cum, cum_notional = self.n_bids, self.bid_prices, self.bid_cum, self.bid_notional
+        else:
+            raise ValueError(f"side must be 'buy' or 'sell', got {side!r}")
+
+        requested = np.atleast_1d(np.asarray(notional, dtype=np.float64))
+        if n == 0:
+            nan = np.full(requested.shape, np.nan)
+            return ExecutionEstimate(requested, nan, np.zeros(requested.shape, dtype=np.int64),
+                                     np.zeros(requested.shape), requested.copy(), nan.copy())
+
+        prices, cum, cum_notional = prices[:n], cum[:n], cum_notional[:n]
+        # Index of the level that completes each order; n when the book runs out
+        last = np.searchsorted(cum_notional, requested, side="left")
+        exhausted = last >= n
+        level = np.minimum(last, n - 1)
+
+        # Everything before the last level fills in full, the rest at its price
+        before = level - 1
+        size_before = np.where(before >= 0, cum[before], 0.0)
+        notional_before = np.where(before >= 0, cum_notional[before], 0.0)
+        filled_notional = np.where(exhausted, cum_notional[-1], requested)
+        filled_size = np.where(exhausted, cum[-1], size_before + (requested - notional_before) / prices[level])
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            vwap = np.where(filled_size > 0, filled_notional / filled_size, np.nan)
+        mid = self.mid_price
+        slippage_pct = (vwap - mid) / mid * 100 if side == "buy" else (mid - vwap) / mid * 100
+
+        return ExecutionEstimate(
+            notional=requested,
+            vwap=vwap,
+            levels=np.where(requested > 0, level + 1, 0),
+            filled_size=filled_size,
+            unfilled_notional=requested - filled_notional,
+            slippage_pct=slippage_pct,
+        )
+
+    def model_input(self, quantity: float, volatility: float, order_type: str) -> Dict[str, Any]:
+        """
+        Build the model input consumed by the models in src/models/.
+
+        Args:
+            quantity: Order size in USD.
+            volatility: Volatility as a decimal.
+            order_type: "market" or "limit".
+
+        Returns:
+            Dict[str, Any]: Book-derived features plus the order parameters.
+        """
+        bid_depth = self.bid_depth()
+        ask_depth = self.ask_depth()
+        return {
+            "quantity": quantity,
+            "mid_price": self.mid_price,
+            "spread_pct": self.spread_pct,
+            "imbalance": bid_depth / (bid_depth + ask_depth),
+            "depth_ratio": min(bid_depth, ask_depth) / max(bid_depth, ask_depth),
+            "volatility": volatility,
+            "bid_depth": bid_depth,
+            "ask_depth": ask_depth,
+            "order_type": order_type,
+        }
+
+
+def _accumulate(prices: np.ndarray, sizes: np.ndarray, cum: np.ndarray, notional: np.ndarray, start: int, n: int) -> None:
+    """Recompute cumulative size and notional for levels start..n-1."""
+    np.cumsum(sizes[start:n], out=cum[start:n])
+    np.multiply(prices[start:n], sizes[start:n], out=notional[start:n])
+    np.cumsum(notional[start:n], out=notional[start:n])
+    if start:
+        cum[start:n] += cum[start - 1]
+        notional[start:n] += notional[start - 1]
+
+
+def _level_array(levels: Sequence[Sequence[Any]], n: int) -> np.ndarray:
+    """Parse the first n [price, size, ...] rows into an (n, 2) float64 array."""
+    to_array = getattr(levels, "to_array", None)
+    if to_array is not None:
+        # Lazily decoded levels parse straight into a NumPy buffer
+        return to_array(n)
+    return np.array([level[:2] for level in levels[:n]], dtype=np.float64)
+
+
+def _format_level_value(value: float) -> str:
+    """Render a price or size the way the exchange prints it."""
+    return np.format_float_positional(value, trim="-")
+
+
+def _level_texts(
+    prices: np.ndarray, sizes: np.ndarray, texts: Dict[float, Tuple[Any, Any]]
+) -> List[Tuple[Any, Any]]:
+    """Exchange price/size strings of the given levels, rendering any the exchange did not send as text."""
+    result = []
+    for price, size in zip(prices.tolist(), sizes.tolist()):
+        text = texts.get(price)
+        if text is None or not (isinstance(text[0], str) and isinstance(text[1], str)):
+            text = (_format_level_value(price), _format_level_value(size))
+        result.append(text)
+    return result
@@ -0,0 +1,226 @@
+"""
+Feed recording and replay for the Trade Simulator
+Captures raw feed messages to a compact binary file and plays them back offline.
+"""
+import asyncio
+import gzip
+import logging
+import os
+import struct
+import threading
+import time
+from typing import Iterator, Optional, Tuple
+
+from src.config import RECORDING_COMPRESS_LEVEL
+from src.data.book_builder import BookBuilder
+from src.data.orderbook import OrderBook
+from src.data.ws_backend import MessageDecoder, WebSocketManager
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"TSFEED01"
+# Record header: receive timestamp (ns since epoch), symbol length, payload length
+RECORD_HEADER = struct.Struct("<qHI")
+
+
+class FeedRecorder:
+    """
+    Append-only recorder of raw feed messages.
+
+    The file is a gzip stream of length-prefixed records, each holding the
+    receive timestamp, the symbol and the message exactly as it came off the
+    socket. Reopening an existing file appends a new gzip member, so several
+    sessions can be captured into one file.
+    """
+
+    def __init__(self, path: str, compresslevel: int = RECORDING_COMPRESS_LEVEL) -> None:
+        """Open `path` for appending."""
+        self.path = path
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = gzip.open(path, "ab", compresslevel=compresslevel)
+        self._lock = threading.Lock()
+        if is_new:
+            self._file.write(MAGIC)
+        self.record_count = 0
+        self.byte_count = 0
+        logger.info(f"Recording feed to {path}")
+
+    def write(self, symbol: str, message, recv_ts_ns: Optional[int] = None) -> None:
+        """
+        Append one message.
+
+        Args:
+            symbol: Symbol the message belongs to.
+            message: Raw message as str or bytes.
+            recv_ts_ns: Receive timestamp in ns since epoch; now if omitted.
+        """
+        payload = message.encode() if isinstance(message, str) else message
+        symbol_bytes = symbol.encode()
+        ts = time.time_ns() if recv_ts_ns is None else recv_ts_ns
+        with self._lock:
+            self._file.write(RECORD_HEADER.pack(ts, len(symbol_bytes), len(payload)))
+            self._file.write(symbol_bytes)
+            self._file.write(payload)
+            self.record_count += 1
+            self.byte_count += len(payload)
+
+    def flush(self) -> None:
+        """Flush buffered records to disk."""
+        with self._lock:
+            self._file.flush()
+
+    def close(self) -> None:
+        """Flush and close the file."""
+        with self._lock:
+            self._file.close()
+        logger.info(f"Recorded {self.record_count} messages ({self.byte_count} bytes) to {self.path}")
+
+    def __enter__(self) -> "FeedRecorder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def read_recording(path: str, symbol: Optional[str] = None) -> Iterator[Tuple[int, str, str]]:
+    """
+    Iterate over the records of a recording.
+
+    Args:
+        path: Recording written by FeedRecorder.
+        symbol: Only yield messages for this symbol.
+
+    Yields:
+        Tuple of (receive timestamp ns, symbol, raw message).
+    """
+    with gzip.open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a feed recording")
+        header_size = RECORD_HEADER.size
+        try:
+            while True:
+                header = f.read(header_size)
+                if len(header) < header_size:
+                    break
+                ts, symbol_len, payload_len = RECORD_HEADER.unpack(header)
+                record_symbol = f.read(symbol_len).decode()
+                payload = f.read(payload_len)
+                if len(payload) < payload_len:
+                    break
+                if symbol is None or record_symbol == symbol:
+                    yield ts, record_symbol, payload.decode()
+        except EOFError:
+            # A recorder that did not shut down cleanly leaves a truncated last member
+            logger.warning(f"Recording {path} is truncated; stopping at the last complete record")
+
+
+def replay_books(path: str, symbol: str) -> Iterator[Tuple[int, OrderBook]]:
+    """
+    Rebuild a symbol's book from a recording, synchronously and as fast as possible.
+
+    The same book object is updated in place for every message; take a
+    snapshot() if a state needs to outlive the next iteration.
+
+    Yields:
+        Tuple of (receive timestamp ns, book) after every applied update.
+    """
+    decoder = MessageDecoder()
+    builder = BookBuilder(OrderBook(symbol=symbol))
+    for ts, _, message in read_recording(path, symbol):
+        if message == "pong":
+            continue
+        if builder.apply(decoder.decode(message)):
+            if builder.book.is_valid:
+                yield ts, builder.book
+        elif builder.needs_resnapshot:
+            # No way to request a snapshot offline; wait for the next one in the stream
+            builder.reset()
+
+
+class ReplaySource(WebSocketManager):
+    """
+    Plays a recording through the same processing path as a live feed.
+
+    It has the WebSocketManager interface (run(), close(), on_message,
+    book/on_book, stats()) so it can stand in for a live connection.
+
+    Args:
+        path: Recording to replay.
+        symbol: Symbol to replay; None replays every record.
+        speed: 1.0 replays in real time, N replays N times faster and
+            0 or None replays as fast as possible.
+    """
+
+    def __init__(self, path, symbol=None, on_message=None, book=None, on_book=None, speed=1.0, **kwargs):
+        super().__init__(path, symbol=symbol, on_message=on_message, book=book, on_book=on_book, **kwargs)
+        self.path = path
+        self.speed = speed
+
+    async def connect(self):
+        self.loop = asyncio.get_running_loop()
+        self.connected_at = time.time()
+        first_ts = None
+        start = time.perf_counter()
+        for ts, _, message in read_recording(self.path, self.symbol):
+            if self.should_close:
+                break
+            if self.speed:
+                if first_ts is None:
+                    first_ts = ts
+                delay = (ts - first_ts) / 1e9 / self.speed - (time.perf_counter() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif self.messages_received % 1000 == 0:
+                # Let other tasks on the loop run between bursts
+                await asyncio.sleep(0)
+            try:
+                await self.process(message)
+            except Exception as e:
+                self.error_count += 1
+                logger.error(f"Failed to replay message: {e}")
+        logger.info(f"Replay of {self.path} finished after {self.messages_received} messages")
+
+    async def subscribe(self):
+        pass
+
+    async def unsubscribe(self):
+        pass
+
+    async def resnapshot(self):
+        # A recording cannot be asked for a snapshot; wait for the next one in the stream
+        self.book_builder.reset()
+
+    async def aclose(self):
+        self.should_close = True
+
+    def close(self):
+        self.should_close = True
+
+
+if __name__ == "__main__":
+    import argparse
+    from src.config import EXCHANGES, DEFAULT_EXCHANGE
+    from src.data.feed_manager import FeedManager
+
+    parser = argparse.ArgumentParser(description="Record live order book feeds to a file")
+    parser.add_argument("output", help="Recording file to append to")
+    parser.add_argument("--exchange", default=DEFAULT_EXCHANGE)
+    parser.add_argument("--pairs", nargs="+", help="Pairs to record (default: every pair of the exchange)")
+    parser.add_argument("--seconds", type=float, default=0, help="Stop after this many seconds (default: until Ctrl+C)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    recorder = FeedRecorder(args.output)
+    manager = FeedManager(recorder=recorder)
+    for pair in args.pairs or EXCHANGES[args.exchange].available_pairs:
+        manager.add_symbol(pair, exchange=args.exchange)
+    manager.start()
+    try:
+        deadline = time.time() + args.seconds if args.seconds else None
+        while deadline is None or time.time() < deadline:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        manager.stop()
+        recorder.close()
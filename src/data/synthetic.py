@@ -0,0 +1,603 @@
+"""
+Synthetic L2 market data for the Trade Simulator
+Generates OKX-style order book snapshots and deltas and serves them from a local websocket server.
+
+Usage:
+    python -m src.data.synthetic                                  # serve EXCHANGES["SYNTHETIC"]
+    python -m src.data.synthetic --rate 20000 --burst-rate 100000 --burst-every 30 --drop-every 120
+"""
+import asyncio
+import bisect
+import json
+import logging
+import math
+import random
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+import websockets
+
+from src.config import (
+    EXCHANGES,
+    DEFAULT_PAIR,
+    DEFAULT_VOLATILITY,
+    SYNTHETIC_RATE,
+    SYNTHETIC_DEPTH,
+    SYNTHETIC_SEND_INTERVAL_SEC,
+)
+
+logger = logging.getLogger(__name__)
+
+STYLES = ("okx", "flat")
+CHECKSUM_LEVELS = 25  # Levels per side covered by the OKX checksum
+SECONDS_PER_DAY = 86400.0
+
+
+def _decimals(step: float) -> int:
+    """Decimal places needed to print multiples of `step`."""
+    text = f"{step:.12f}".rstrip("0")
+    return len(text.split(".")[1])
+
+
+def _format(value: float, decimals: int) -> str:
+    """
+    Print a price or size without padding zeros.
+
+    This is the shortest form of the rounded value, i.e. what
+    OrderBook.checksum renders back from the parsed float.
+    """
+    text = f"{value:.{decimals}f}"
+    return text.rstrip("0").rstrip(".") if decimals else text
+
+
+def _timestamp_text(now_ns: int, style: str) -> str:
+    """A message timestamp as the style prints it: epoch ms for okx, ISO 8601 for flat."""
+    if style == "okx":
+        return str(now_ns // 1_000_000)
+    text = datetime.fromtimestamp(now_ns / 1e9, timezone.utc).isoformat(timespec="milliseconds")
+    return text.replace("+00:00", "Z")
+
+
+def _split_timestamps(book: "SyntheticBook", count: int, rate: float) -> List[Tuple[str, str]]:
+    """Generate `count` messages, each split into the text before and after its timestamp value."""
+    key = '"ts":"' if book.style == "okx" else '"timestamp":"'
+    parts = []
+    for message in book.messages(count, rate):
+        prefix, _, rest = message.partition(key)
+        parts.append((prefix + key, rest[rest.index('"'):]))
+    return parts
+
+
+class SyntheticBook:
+    """
+    One instrument's order book, evolved message by message.
+
+    The fair price follows a geometric random walk with the given daily
+    volatility, scaled to the time between messages. Quotes never rest
+    through it: levels it moves past are pulled, and the ticks it left
+    behind are usually requoted, so the spread stays near spread_ticks
+    with occasional gaps. Every update also resizes a few levels, mostly near
+    the touch, now and then quotes or pulls a level inside the book, and
+    trims or extends each side back to `depth` levels. Sizes are lognormal
+    and grow with the distance from the touch.
+
+    Two message styles are produced, both understood by BookBuilder:
+      * "okx": a books snapshot followed by incremental updates, with an
+        unbroken seqId/prevSeqId chain and the CRC32 checksum of the top
+        25 levels per side;
+      * "flat": the whole book in every message, with an ISO timestamp.
+    """
+
+    def __init__(
+        self,
+        symbol: str = DEFAULT_PAIR,
+        mid: float = 60000.0,
+        tick_size: float = 0.1,
+        lot_size: float = 0.001,
+        depth: int = SYNTHETIC_DEPTH,
+        volatility: float = DEFAULT_VOLATILITY,
+        spread_ticks: int = 1,
+        mean_size: float = 1.0,
+        changes: int = 4,
+        style: str = "okx",
+        checksum: bool = True,
+        seed: Optional[Any] = None,
+    ) -> None:
+        """
+        Args:
+            symbol: Instrument id put in every message.
+            mid: Starting fair price.
+            tick_size: Price increment.
+            lot_size: Size increment.
+            depth: Levels per side.
+            volatility: Daily volatility of the fair price, e.g. 0.02 for 2%.
+            spread_ticks: Spread in ticks when both touches are quoted.
+            mean_size: Mean size at the touch.
+            changes: Level changes per update besides those the price move causes.
+            style: "okx" or "flat".
+            checksum: Add the OKX checksum; computing it costs a few us per update.
+            seed: Random seed; the same seed and timestamps give the same messages.
+        """
+        if style not in STYLES:
+            raise ValueError(f"Unknown style {style!r}, expected one of {STYLES}")
+        self.symbol = symbol
+        self.tick_size = tick_size
+        self.lot_size = lot_size
+        self.depth = depth
+        self.volatility = volatility
+        self.spread_ticks = max(1, int(spread_ticks))
+        self.mean_size = mean_size
+        self.changes = changes
+        self.style = style
+        self.checksum = checksum
+        self.fair = mid
+
+        self._rng = random.Random(seed)
+        self._sigma = volatility / math.sqrt(SECONDS_PER_DAY)  # Per sqrt(second)
+        self._price_decimals = _decimals(tick_size)
+        self._size_decimals = _decimals(lot_size)
+
+        # Bids are keyed by -tick and asks by tick, so both sides sort best first
+        self._bids: List[int] = []
+        self._asks: List[int] = []
+        self._levels: Dict[int, List[str]] = {}  # Key -> [price, size, "0", orders] row
+        self._texts: Dict[int, str] = {}  # Key -> "price:size", the level's part of the checksum
+
+        self.seq_id = 0
+        self.message_count = 0
+        self._last_ns: Optional[int] = None
+        self._arg = {"channel": "books", "instId": symbol}
+
+        touch = math.floor(mid / tick_size)
+        self._extend(self._bids, -touch, {})
+        self._extend(self._asks, touch + self.spread_ticks, {})
+
+    def snapshot(self, now_ns: Optional[int] = None) -> str:
+        """A full book message; in okx style it restarts the client's seqId chain."""
+        now_ns = time.time_ns() if now_ns is None else now_ns
+        self._last_ns = self._last_ns or now_ns
+        if self.style == "flat":
+            return self._flat(now_ns)
+
+        self.seq_id += 1
+        entry = {
+            "asks": [self._levels[key] for key in self._asks],
+            "bids": [self._levels[key] for key in self._bids],
+            "ts": str(now_ns // 1_000_000),
+            "seqId": self.seq_id,
+            "prevSeqId": -1,
+        }
+        if self.checksum:
+            entry["checksum"] = self._checksum()
+        self.message_count += 1
+        return json.dumps({"arg": self._arg, "action": "snapshot", "data": [entry]}, separators=(",", ":"))
+
+    def update(self, now_ns: Optional[int] = None) -> str:
+        """Evolve the book to `now_ns` (ns since the epoch) and describe the change."""
+        now_ns = time.time_ns() if now_ns is None else now_ns
+        changed = self._step(now_ns)
+        if self.style == "flat":
+            return self._flat(now_ns)
+
+        prev_seq_id = self.seq_id
+        self.seq_id += 1
+        entry = {
+            "asks": [changed[key] for key in sorted(key for key in changed if key > 0)],
+            "bids": [changed[key] for key in sorted(key for key in changed if key < 0)],
+            "ts": str(now_ns // 1_000_000),
+            "seqId": self.seq_id,
+            "prevSeqId": prev_seq_id,
+        }
+        if self.checksum:
+            entry["checksum"] = self._checksum()
+        self.message_count += 1
+        return json.dumps({"arg": self._arg, "action": "update", "data": [entry]}, separators=(",", ":"))
+
+    def messages(self, count: int, rate: float = SYNTHETIC_RATE, start_ns: Optional[int] = None) -> List[str]:
+        """
+        A snapshot followed by count - 1 updates spaced 1 / rate seconds apart.
+
+        Timestamps are synthetic, so any rate can be generated offline.
+        """
+        now_ns = time.time_ns() if start_ns is None else start_ns
+        step_ns = int(1e9 / rate)
+        messages = [self.snapshot(now_ns)]
+        for _ in range(count - 1):
+            now_ns += step_ns
+            messages.append(self.update(now_ns))
+        return messages
+
+    @property
+    def best_bid(self) -> Optional[float]:
+        """Highest bid price."""
+        return -self._bids[0] * self.tick_size if self._bids else None
+
+    @property
+    def best_ask(self) -> Optional[float]:
+        """Lowest ask price."""
+        return self._asks[0] * self.tick_size if self._asks else None
+
+    def _step(self, now_ns: int) -> Dict[int, List[str]]:
+        """Move the fair price and the quotes; returns the changed levels by key."""
+        rng = self._rng
+        if self._last_ns is not None and now_ns > self._last_ns:
+            dt = (now_ns - self._last_ns) / 1e9
+            self.fair *= math.exp(self._sigma * math.sqrt(dt) * rng.gauss(0.0, 1.0))
+        self._last_ns = now_ns
+
+        changed: Dict[int, List[str]] = {}
+        bids, asks = self._bids, self._asks
+        max_bid = math.floor(self.fair / self.tick_size)
+        min_ask = max_bid + self.spread_ticks
+        while bids and -bids[0] > max_bid:
+            self._pull(bids, 0, changed)
+        while asks and asks[0] < min_ask:
+            self._pull(asks, 0, changed)
+        if rng.random() < 0.7:
+            self._requote(bids, -max_bid, changed)
+        if rng.random() < 0.7:
+            self._requote(asks, min_ask, changed)
+
+        for _ in range(self.changes):
+            side = bids if rng.random() < 0.5 else asks
+            if not side:
+                continue
+            # Activity concentrates near the touch: about 7 levels deep on average
+            index = min(int(rng.expovariate(0.15)), len(side) - 1)
+            roll = rng.random()
+            if roll < 0.1 and index > 0:
+                self._pull(side, index, changed)
+            elif roll < 0.2:
+                key = side[index] + 1  # One tick behind the level
+                if key not in self._levels:
+                    self._quote(side, key, index + 1, changed)
+            else:
+                self._quote(side, side[index], index, changed)
+
+        self._extend(bids, -max_bid, changed)
+        self._extend(asks, min_ask, changed)
+        return changed
+
+    def _requote(self, side: List[int], touch: int, changed: Dict[int, List[str]]) -> None:
+        """Quote every empty tick from the touch up to the current best level."""
+        end = side[0] if side else touch + 1
+        for index, key in enumerate(range(touch, min(end, touch + self.depth))):
+            self._quote(side, key, index, changed)
+
+    def _extend(self, side: List[int], touch: int, changed: Dict[int, List[str]]) -> None:
+        """Trim or extend a side to `depth` levels at its far end."""
+        while len(side) > self.depth:
+            self._pull(side, len(side) - 1, changed)
+        while len(side) < self.depth:
+            if side:
+                gap = 1 if self._rng.random() < 0.7 else self._rng.randint(2, 4)
+                key = side[-1] + gap
+            else:
+                key = touch
+            if key >= 0 and side is self._bids:
+                break  # No bids at or below a zero price
+            self._quote(side, key, len(side), changed)
+
+    def _quote(self, side: List[int], key: int, index: int, changed: Dict[int, List[str]]) -> None:
+        """Set a level's size, inserting the level if it is new."""
+        row = self._levels.get(key)
+        if row is None:
+            bisect.insort(side, key)
+            price = _format(abs(key) * self.tick_size, self._price_decimals)
+        else:
+            price = row[0]
+        size = self._rng.lognormvariate(-0.5, 1.0) * self.mean_size * (1.0 + index / 25.0)
+        size = _format(max(1, round(size / self.lot_size)) * self.lot_size, self._size_decimals)
+        row = self._levels[key] = [price, size, "0", str(self._rng.randint(1, 30))]
+        self._texts[key] = f"{price}:{size}"
+        changed[key] = row
+
+    def _pull(self, side: List[int], index: int, changed: Dict[int, List[str]]) -> None:
+        """Remove the index-th level of a side."""
+        key = side.pop(index)
+        del self._texts[key]
+        changed[key] = [self._levels.pop(key)[0], "0", "0", "0"]
+
+    def _checksum(self) -> int:
+        """OKX CRC32 of the top levels, as OrderBook.checksum computes it."""
+        texts = self._texts
+        bids = [texts[key] for key in self._bids[:CHECKSUM_LEVELS]]
+        asks = [texts[key] for key in self._asks[:CHECKSUM_LEVELS]]
+        n = min(len(bids), len(asks))
+        parts = [""] * (2 * n)
+        parts[0::2] = bids[:n]
+        parts[1::2] = asks[:n]
+        crc = zlib.crc32(":".join(parts + bids[n:] + asks[n:]).encode())
+        return crc - (1 << 32) if crc >= (1 << 31) else crc
+
+    def _flat(self, now_ns: int) -> str:
+        """The whole book as one flat snapshot message."""
+        self.message_count += 1
+        return json.dumps({
+            "timestamp": _timestamp_text(now_ns, "flat"),
+            "exchange": "SYNTHETIC",
+            "symbol": self.symbol,
+            "asks": [self._levels[key][:2] for key in self._asks],
+            "bids": [self._levels[key][:2] for key in self._bids],
+        }, separators=(",", ":"))
+
+
+class SyntheticExchange:
+    """
+    Local websocket server standing in for an EXCHANGES books endpoint.
+
+    Clients connect to <url><symbol>, as FeedManager does, and subscribe
+    the usual way. Each subscription gets its own SyntheticBook: a snapshot
+    first, then updates paced at `rate` messages per second. Unsubscribing
+    stops the stream and resubscribing resumes it from a fresh snapshot,
+    so the resnapshot path works as it does against the exchange; "ping"
+    is answered with "pong".
+
+    For soak tests the rate can rise to burst_rate for burst_sec every
+    burst_every_sec, every connection can be dropped drop_every_sec after
+    it opened, and updates can be lost with probability loss_rate, which
+    breaks the client's seqId chain.
+
+    Generating a book update costs tens of us, which caps a live stream at
+    a few thousand messages per second. With cycle=N every symbol's first
+    N messages are generated once, off the event loop, and then replayed
+    in a loop with only the timestamp rewritten; the snapshot at the head
+    of the cycle resyncs the client on every pass. Sending is then the
+    limit, so rates near 100k msg/s need several subscriptions or server
+    processes. stats() reports what was actually sent.
+    """
+
+    def __init__(
+        self,
+        url: str = EXCHANGES["SYNTHETIC"].websocket_url,
+        rate: float = SYNTHETIC_RATE,
+        burst_rate: float = 0.0,
+        burst_every_sec: float = 0.0,
+        burst_sec: float = 1.0,
+        drop_every_sec: float = 0.0,
+        loss_rate: float = 0.0,
+        cycle: int = 0,
+        send_interval_sec: float = SYNTHETIC_SEND_INTERVAL_SEC,
+        seed: Optional[Any] = None,
+        **book_options: Any,
+    ) -> None:
+        """
+        Args:
+            url: Endpoint to serve; the host and port are taken from it.
+            cycle: Messages pregenerated per symbol and replayed; 0 generates every message live.
+            book_options: Passed to every SyntheticBook (depth, tick_size, volatility, style, ...).
+        """
+        parsed = urlparse(url)
+        self.url = url
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 8765
+        self.rate = rate
+        self.burst_rate = burst_rate
+        self.burst_every_sec = burst_every_sec
+        self.burst_sec = burst_sec
+        self.drop_every_sec = drop_every_sec
+        self.loss_rate = loss_rate
+        self.cycle = cycle
+        self.send_interval_sec = send_interval_sec
+        self.seed = seed
+        self.book_options = book_options
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread: Optional[threading.Thread] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._ready = threading.Event()
+        self._rng = random.Random(seed)
+        self._cycles: Dict[str, List[Tuple[str, str]]] = {}  # Symbol -> messages split around the timestamp
+
+        self.started_at: Optional[float] = None
+        self.connection_count = 0
+        self.active_connections = 0
+        self.subscription_count = 0
+        self.messages_sent = 0
+        self.bytes_sent = 0
+        self.dropped_connections = 0
+        self.lost_messages = 0
+
+    def rate_at(self, elapsed_sec: float) -> float:
+        """Message rate `elapsed_sec` after the server started."""
+        if self.burst_rate and self.burst_every_sec and elapsed_sec % self.burst_every_sec >= self.burst_every_sec - self.burst_sec:
+            return self.burst_rate
+        return self.rate
+
+    async def serve(self, stats_interval_sec: float = 0.0) -> None:
+        """Serve until stop(), logging stats every stats_interval_sec when it is set."""
+        self._stop = asyncio.Event()
+        self.loop = asyncio.get_running_loop()
+        self.started_at = time.time()
+        async with websockets.serve(self._handle, self.host, self.port):
+            logger.info(f"Serving synthetic books on {self.url}<symbol>")
+            self._ready.set()
+            while not self._stop.is_set():
+                try:
+                    await asyncio.wait_for(self._stop.wait(), stats_interval_sec or None)
+                except asyncio.TimeoutError:
+                    logger.info(f"Synthetic feed: {self.stats()}")
+        logger.info(f"Synthetic feed stopped after {self.messages_sent} messages")
+
+    def start(self) -> None:
+        """Serve on a background thread; returns once the server is listening."""
+        if self.thread is not None:
+            return
+        self._ready.clear()
+        self.thread = threading.Thread(target=asyncio.run, args=(self.serve(),), name="synthetic-exchange", daemon=True)
+        self.thread.start()
+        if not self._ready.wait(5.0):
+            raise RuntimeError(f"Synthetic exchange did not start on {self.url}")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Close every connection and stop serving."""
+        if self.loop is not None and self._stop is not None:
+            self.loop.call_soon_threadsafe(self._stop.set)
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Connection and throughput counters."""
+        elapsed = time.time() - self.started_at if self.started_at else 0.0
+        return {
+            "connections": self.connection_count,
+            "active": self.active_connections,
+            "subscriptions": self.subscription_count,
+            "messages": self.messages_sent,
+            "bytes": self.bytes_sent,
+            "rate": round(self.messages_sent / elapsed, 1) if elapsed else 0.0,
+            "dropped_connections": self.dropped_connections,
+            "lost_messages": self.lost_messages,
+        }
+
+    async def _handle(self, websocket, path: Optional[str] = None) -> None:
+        """Serve one client connection."""
+        request = getattr(websocket, "request", None)
+        path = request.path if request is not None else (path or getattr(websocket, "path", ""))
+        default_symbol = path.rstrip("/").rsplit("/", 1)[-1] or DEFAULT_PAIR
+        books: Dict[str, SyntheticBook] = {}
+        streams: Dict[str, asyncio.Task] = {}
+        replies: Set[asyncio.Task] = set()
+
+        def reply(message: str) -> None:
+            # Never wait on the socket here: a reader blocked behind a full send
+            # buffer would stop taking the client's close frame
+            task = asyncio.create_task(websocket.send(message))
+            replies.add(task)
+            task.add_done_callback(replies.discard)
+
+        self.connection_count += 1
+        self.active_connections += 1
+        dropper = asyncio.create_task(self._drop_later(websocket)) if self.drop_every_sec else None
+        try:
+            async for message in websocket:
+                if message == "ping":
+                    reply("pong")
+                    continue
+                try:
+                    request_data = json.loads(message)
+                except ValueError:
+                    reply(json.dumps({"event": "error", "msg": "Invalid request"}))
+                    continue
+                op = request_data.get("op")
+                for arg in request_data.get("args") or ():
+                    symbol = arg.get("instId") or default_symbol
+                    task = streams.pop(symbol, None)
+                    if task is not None:
+                        task.cancel()
+                    if op == "subscribe":
+                        book = books.get(symbol)
+                        if book is None:
+                            seed = None if self.seed is None else f"{self.seed}:{symbol}:{self.connection_count}"
+                            book = books[symbol] = SyntheticBook(symbol, seed=seed, **self.book_options)
+                        reply(json.dumps({"event": "subscribe", "arg": arg}))
+                        streams[symbol] = asyncio.create_task(self._stream(websocket, book))
+                        self.subscription_count += 1
+                    elif op == "unsubscribe":
+                        reply(json.dumps({"event": "unsubscribe", "arg": arg}))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.active_connections -= 1
+            for task in [*streams.values(), *replies]:
+                task.cancel()
+            if dropper is not None:
+                dropper.cancel()
+
+    async def _stream(self, websocket, book: SyntheticBook) -> None:
+        """Send a snapshot, then updates paced to rate_at() until cancelled."""
+        cycle = await self._cycle(book.symbol) if self.cycle else None
+        sent = 0
+        stamp = ""
+
+        def next_message() -> str:
+            if cycle is None:
+                return book.update() if sent else book.snapshot()
+            prefix, suffix = cycle[sent % len(cycle)]
+            return prefix + stamp + suffix
+
+        try:
+            last = time.perf_counter()
+            due = 1.0  # The snapshot
+            while True:
+                stamp = _timestamp_text(time.time_ns(), book.style)
+                for _ in range(int(due)):
+                    message = next_message()
+                    sent += 1
+                    if sent > 1 and self.loss_rate and self._rng.random() < self.loss_rate:
+                        self.lost_messages += 1
+                        continue
+                    await websocket.send(message)
+                    self.messages_sent += 1
+                    self.bytes_sent += len(message)
+                due -= int(due)
+
+                await asyncio.sleep(self.send_interval_sec)
+                now = time.perf_counter()
+                rate = self.rate_at(time.time() - self.started_at)
+                # Messages the client should have had by now; at most a second's worth when behind
+                due = min(due + rate * (now - last), max(rate, 1.0))
+                last = now
+        except websockets.ConnectionClosed:
+            pass
+
+    async def _cycle(self, symbol: str) -> List[Tuple[str, str]]:
+        """A symbol's pregenerated messages, built on first use in a worker thread."""
+        cycle = self._cycles.get(symbol)
+        if cycle is None:
+            seed = None if self.seed is None else f"{self.seed}:{symbol}"
+            book = SyntheticBook(symbol, seed=seed, **self.book_options)
+            started = time.perf_counter()
+            cycle = await asyncio.get_running_loop().run_in_executor(None, _split_timestamps, book, self.cycle, self.rate)
+            self._cycles[symbol] = cycle
+            logger.info(f"Generated {len(cycle)} {symbol} messages in {time.perf_counter() - started:.1f}s")
+        return cycle
+
+    async def _drop_later(self, websocket) -> None:
+        """Drop the connection without a closing handshake after drop_every_sec."""
+        await asyncio.sleep(self.drop_every_sec)
+        self.dropped_connections += 1
+        logger.info("Dropping synthetic feed connection")
+        websocket.transport.abort()
+
+
+if __name__ == "__main__":
+    import argparse
+    from src.config import LOG_FORMAT
+
+    parser = argparse.ArgumentParser(description="Serve synthetic order books in place of an exchange feed")
+    parser.add_argument("--url", default=EXCHANGES["SYNTHETIC"].websocket_url, help="Endpoint to serve")
+    parser.add_argument("--rate", type=float, default=SYNTHETIC_RATE, help="Messages per second per subscription")
+    parser.add_argument("--burst-rate", type=float, default=0.0, help="Messages per second during bursts")
+    parser.add_argument("--burst-every", type=float, default=0.0, help="Seconds between burst starts")
+    parser.add_argument("--burst-sec", type=float, default=1.0, help="Length of each burst in seconds")
+    parser.add_argument("--drop-every", type=float, default=0.0, help="Drop each connection after this many seconds")
+    parser.add_argument("--loss-rate", type=float, default=0.0, help="Probability of losing an update")
+    parser.add_argument("--cycle", type=int, default=0, help="Pregenerate this many messages per symbol and replay them")
+    parser.add_argument("--depth", type=int, default=SYNTHETIC_DEPTH, help="Levels per side")
+    parser.add_argument("--mid", type=float, default=60000.0, help="Starting mid price")
+    parser.add_argument("--tick-size", type=float, default=0.1)
+    parser.add_argument("--lot-size", type=float, default=0.001)
+    parser.add_argument("--volatility", type=float, default=DEFAULT_VOLATILITY, help="Daily volatility of the mid price")
+    parser.add_argument("--changes", type=int, default=4, help="Level changes per update")
+    parser.add_argument("--style", choices=STYLES, default="okx")
+    parser.add_argument("--no-checksum", action="store_true", help="Leave out the OKX checksum")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--stats-every", type=float, default=10.0, help="Log server stats every this many seconds")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    exchange = SyntheticExchange(
+        args.url, args.rate, args.burst_rate, args.burst_every, args.burst_sec, args.drop_every, args.loss_rate, args.cycle,
+        seed=args.seed, depth=args.depth, mid=args.mid, tick_size=args.tick_size, lot_size=args.lot_size,
+        volatility=args.volatility, changes=args.changes, style=args.style, checksum=not args.no_checksum,
+    )
+    try:
+        asyncio.run(exchange.serve(args.stats_every))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,237 @@
+"""
+Memory-mapped historical tick store for the Trade Simulator
+Stores L2 book states as fixed-width NumPy records with time-indexed random access.
+"""
+import glob
+import logging
+import os
+import struct
+import numpy as np
+from typing import Iterator, List, Optional, Tuple
+
+from src.config import TICKSTORE_LEVELS
+from src.data.orderbook import OrderBook
+from src.data.recorder import replay_books
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"TSTICK01"
+# File header: magic, levels per side, symbol (padded), reserved up to HEADER_SIZE
+HEADER = struct.Struct("<8sI32s")
+HEADER_SIZE = 64
+INDEX_STRIDE = 4096  # One in-memory index entry per this many records
+WRITE_BATCH = 4096  # Records buffered by the writer between disk writes
+
+
+def tick_dtype(levels: int) -> np.dtype:
+    """Record layout: ns timestamp plus `levels` price/size pairs per side."""
+    return np.dtype([
+        ("ts", "<i8"),
+        ("bid_px", "<f8", (levels,)),
+        ("bid_sz", "<f8", (levels,)),
+        ("ask_px", "<f8", (levels,)),
+        ("ask_sz", "<f8", (levels,)),
+    ])
+
+
+def _read_header(path: str) -> Tuple[int, str]:
+    """Return (levels, symbol) from a tick file header."""
+    with open(path, "rb") as f:
+        magic, levels, symbol = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a tick store file")
+    return levels, symbol.rstrip(b"\0").decode()
+
+
+class TickStoreWriter:
+    """
+    Appends book states to a tick file.
+
+    Records are staged in a preallocated structured array and written in
+    batches. Timestamps must be non-decreasing, which is what makes the
+    reader's binary-search time index valid.
+    """
+
+    def __init__(self, path: str, symbol: str = "", levels: int = TICKSTORE_LEVELS) -> None:
+        """Create `path`, or append to it if it already exists with the same layout."""
+        self.path = path
+        if os.path.exists(path) and os.path.getsize(path) >= HEADER_SIZE:
+            levels, symbol = _read_header(path)
+            self._file = open(path, "ab")
+        else:
+            self._file = open(path, "wb")
+            header = HEADER.pack(MAGIC, levels, symbol.encode()[:32])
+            self._file.write(header.ljust(HEADER_SIZE, b"\0"))
+
+        self.symbol = symbol
+        self.levels = levels
+        self.dtype = tick_dtype(levels)
+        self._buffer = np.zeros(WRITE_BATCH, dtype=self.dtype)
+        self._pending = 0
+        self.record_count = 0
+
+    def append_book(self, book: OrderBook, ts_ns: int) -> None:
+        """Append the top `levels` of a book as one record."""
+        record = self._buffer[self._pending]
+        record["ts"] = ts_ns
+        bid_prices, bid_sizes, ask_prices, ask_sizes = book.top_levels(self.levels)
+        nb, na = len(bid_prices), len(ask_prices)
+        record["bid_px"][:nb] = bid_prices
+        record["bid_sz"][:nb] = bid_sizes
+        record["bid_px"][nb:] = np.nan
+        record["bid_sz"][nb:] = 0.0
+        record["ask_px"][:na] = ask_prices
+        record["ask_sz"][:na] = ask_sizes
+        record["ask_px"][na:] = np.nan
+        record["ask_sz"][na:] = 0.0
+
+        self._pending += 1
+        self.record_count += 1
+        if self._pending == WRITE_BATCH:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write staged records to disk."""
+        if self._pending:
+            self._file.write(self._buffer[:self._pending].tobytes())
+            self._pending = 0
+        self._file.flush()
+
+    def close(self) -> None:
+        """Flush and close the file."""
+        self.flush()
+        self._file.close()
+        logger.info(f"Wrote {self.record_count} ticks to {self.path}")
+
+    def __enter__(self) -> "TickStoreWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class TickStore:
+    """
+    Read-only, memory-mapped view over one tick file or a directory of them.
+
+    Nothing is loaded up front beyond a sparse timestamp index (one entry per
+    INDEX_STRIDE records); seeks binary-search that index and then a single
+    stride of the mapped timestamps, so only the touched pages are read.
+    Window slices are views into the mapping, not copies.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Open `path`, a tick file or a directory of *.ticks segment files."""
+        files = sorted(glob.glob(os.path.join(path, "*.ticks"))) if os.path.isdir(path) else [path]
+        self.segments: List[np.memmap] = []
+        self._index: List[np.ndarray] = []
+        self.levels: Optional[int] = None
+        self.symbol = ""
+
+        for file in files:
+            levels, symbol = _read_header(file)
+            if self.levels is not None and levels != self.levels:
+                raise ValueError(f"{file} stores {levels} levels, expected {self.levels}")
+            self.levels, self.symbol = levels, symbol
+            dtype = tick_dtype(levels)
+            count = (os.path.getsize(file) - HEADER_SIZE) // dtype.itemsize
+            if count <= 0:
+                continue
+            records = np.memmap(file, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(count,))
+            self.segments.append(records)
+            self._index.append(np.array(records["ts"][::INDEX_STRIDE]))
+
+        # Segments are ordered by their first timestamp
+        order = np.argsort([index[0] for index in self._index], kind="stable")
+        self.segments = [self.segments[i] for i in order]
+        self._index = [self._index[i] for i in order]
+        logger.info(f"Opened tick store {path}: {len(self)} ticks in {len(self.segments)} segments")
+
+    def __len__(self) -> int:
+        return sum(len(segment) for segment in self.segments)
+
+    @property
+    def start_ts(self) -> Optional[int]:
+        """First timestamp in the store."""
+        return int(self.segments[0]["ts"][0]) if self.segments else None
+
+    @property
+    def end_ts(self) -> Optional[int]:
+        """Last timestamp in the store."""
+        return int(self.segments[-1]["ts"][-1]) if self.segments else None
+
+    def seek(self, ts_ns: int) -> Tuple[int, int]:
+        """
+        Locate the first record at or after `ts_ns`.
+
+        Returns:
+            Tuple of (segment number, row within segment); the segment number
+            equals the segment count when `ts_ns` is past the end.
+        """
+        for number, (segment, index) in enumerate(zip(self.segments, self._index)):
+            if segment["ts"][-1] < ts_ns:
+                continue
+            block = max(int(np.searchsorted(index, ts_ns, side="left")) - 1, 0)
+            lo = block * INDEX_STRIDE
+            hi = min(lo + 2 * INDEX_STRIDE, len(segment))
+            return number, lo + int(np.searchsorted(segment["ts"][lo:hi], ts_ns, side="left"))
+        return len(self.segments), 0
+
+    def window(self, start_ns: Optional[int] = None, end_ns: Optional[int] = None) -> List[np.ndarray]:
+        """
+        Records with start_ns <= ts < end_ns, as views into each segment.
+
+        Returns:
+            List[np.ndarray]: One structured-array view per overlapping segment.
+        """
+        first_segment, first_row = self.seek(start_ns) if start_ns is not None else (0, 0)
+        last_segment, last_row = self.seek(end_ns) if end_ns is not None else (len(self.segments), 0)
+
+        views = []
+        for number in range(first_segment, min(last_segment + 1, len(self.segments))):
+            segment = self.segments[number]
+            lo = first_row if number == first_segment else 0
+            hi = last_row if number == last_segment else len(segment)
+            if hi > lo:
+                views.append(segment[lo:hi])
+        return views
+
+    def iter_books(self, start_ns: Optional[int] = None, end_ns: Optional[int] = None) -> Iterator[OrderBook]:
+        """
+        Replay a window as OrderBook updates.
+
+        The same book object is reloaded for every record; take a
+        snapshot() if a state needs to outlive the next iteration.
+        """
+        book = OrderBook(symbol=self.symbol, max_levels=self.levels or TICKSTORE_LEVELS)
+        for view in self.window(start_ns, end_ns):
+            for record in view:
+                book.load_arrays(record["bid_px"], record["bid_sz"], record["ask_px"], record["ask_sz"], int(record["ts"]))
+                yield book
+
+
+def build_from_recording(recording_path: str, store_path: str, symbol: str, levels: int = TICKSTORE_LEVELS) -> int:
+    """
+    Convert a feed recording into a tick file, one record per applied update.
+
+    Returns:
+        int: Number of records written.
+    """
+    with TickStoreWriter(store_path, symbol=symbol, levels=levels) as writer:
+        for ts, book in replay_books(recording_path, symbol):
+            writer.append_book(book, ts)
+        return writer.record_count
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build a tick store file from a feed recording")
+    parser.add_argument("recording", help="Recording written by src.data.recorder")
+    parser.add_argument("output", help="Tick file to create or append to")
+    parser.add_argument("--symbol", required=True)
+    parser.add_argument("--levels", type=int, default=TICKSTORE_LEVELS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    build_from_recording(args.recording, args.output, args.symbol, args.levels)
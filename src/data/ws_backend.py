@@ -5,25 +5,222 @@ import inspect
 import websockets
 import json
 import logging
+import random
+import time
+import numpy as np
+from itertools import chain
 from datetime import datetime
+from src.data.book_builder import BookBuilder
+from src.data.clock import ClockOffsetEstimator, parse_exchange_timestamp
+from src.metrics import latency
+from src.config import (
+    ORDERBOOK_INCREMENTAL,
+    ORDERBOOK_VALIDATE_CHECKSUM,
+    WS_RECONNECT_BASE_DELAY_SEC,
+    WS_RECONNECT_MAX_DELAY_SEC,
+    WS_PING_INTERVAL_SEC,
+    WS_PING_TIMEOUT_SEC,
+    WS_IDLE_TIMEOUT_SEC,
+    WS_CLOSE_TIMEOUT_SEC,
+    LOG_MESSAGE_LATENCY,
+)
+
+# Optional faster JSON parsers, preferred in this order when installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+class LazyLevels:
+    """
+    Order book levels as decoded from the wire, converted to floats on demand.
+
+    Indexing and slicing return the raw [price, size, ...] rows, so code that
+    treats the levels as a list keeps working. to_array(n) parses only the
+    first n rows straight into a float64 (n, 2) NumPy array and caches it.
+    """
+
+    __slots__ = ("rows", "_array")
+
+    def __init__(self, rows):
+        self.rows = rows
+        self._array = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        return self.rows[index]
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def to_array(self, n=None):
+        n = len(self.rows) if n is None else min(n, len(self.rows))
+        if self._array is None or len(self._array) < n:
+            rows = self.rows[:n]
+            width = len(rows[0]) if n else 2
+            values = map(float, chain.from_iterable(rows))
+            try:
+                # Uniform rows are parsed in a single pass over the flattened values
+                array = np.fromiter(values, np.float64, n * width).reshape(n, width)
+                if next(values, None) is not None:
+                    raise ValueError("ragged levels")
+            except ValueError:
+                array = np.array([row[:2] for row in rows], dtype=np.float64).reshape(n, 2)
+            self._array = array[:, :2]
+        return self._array[:n]
+
+
+class MessageDecoder:
+    """
+    Decodes raw feed frames.
+
+    Uses orjson or ujson when one is installed and falls back to the stdlib
+    json module otherwise. Level arrays are wrapped in LazyLevels so only the
+    levels a consumer reads are converted to numbers. Decode time is
+    accumulated so its share of per-message CPU can be measured.
+    """
+
+    def __init__(self, loads=None):
+        if loads is not None:
+            self.loads, self.backend = loads, getattr(loads, "__module__", "custom")
+        elif orjson is not None:
+            self.loads, self.backend = orjson.loads, "orjson"
+        elif ujson is not None:
+            self.loads, self.backend = ujson.loads, "ujson"
+        else:
+            self.loads, self.backend = json.loads, "json"
+        self.decoded_count = 0
+        self.decode_ns = 0
+
+    def decode(self, raw):
+        start = time.perf_counter_ns()
+        data = self.loads(raw)
+        if isinstance(data, dict):
+            self._wrap_levels(data)
+            for entry in data.get("data") or ():
+                if isinstance(entry, dict):
+                    self._wrap_levels(entry)
+        elapsed = time.perf_counter_ns() - start
+        self.decode_ns += elapsed
+        self.decoded_count += 1
+        latency.record("feed.decode", elapsed)
+        return data
+
+    def stats(self):
+        mean_us = self.decode_ns / self.decoded_count / 1000 if self.decoded_count else 0.0
+        return {"backend": self.backend, "messages": self.decoded_count, "mean_decode_us": round(mean_us, 2)}
+
+    @staticmethod
+    def _wrap_levels(data):
+        for side in ("bids", "asks"):
+            levels = data.get(side)
+            if isinstance(levels, list):
+                data[side] = LazyLevels(levels)
+
 
 class WebSocketManager:
-    def __init__(self, url, symbol="BTC-USDT", on_message=None):
+    def __init__(self, url, symbol="BTC-USDT", on_message=None, book=None, on_book=None, incremental=ORDERBOOK_INCREMENTAL, decoder=None, recorder=None):
         self.url = url
         self.symbol = symbol
         self.ws = None
         self.on_message = on_message  # Callback to process messages
+        self.on_book = on_book  # Callback invoked with the book after each applied update
         self.should_close = False
+        self.book = book
+        self.book_builder = BookBuilder(book, incremental, ORDERBOOK_VALIDATE_CHECKSUM) if book is not None else None
+        self.decoder = decoder or MessageDecoder()  # Pluggable frame decoder
+        self.recorder = recorder  # Optional FeedRecorder capturing raw messages
+        self.loop = None  # Event loop the connection runs on, set in connect()
+        self.clock = ClockOffsetEstimator()  # Exchange clock offset, for wire latencies
+
+        # Per-connection stats
+        self.messages_received = 0
+        self.bytes_received = 0
+        self.error_count = 0
+        self.connected_at = None
+        self.last_message_at = None
+
+        # Reconnect stats
+        self.reconnect_count = 0
+        self.disconnected_at = None
+        self.downtime_sec = 0.0
+        self.last_error = None
 
     async def connect(self):
-        try:
-            async with websockets.connect(self.url) as websocket:
-                self.ws = websocket
-                logging.info("Connected to WebSocket")
-                await self.subscribe()
-                await self.receive()
-        except Exception as e:
-            logging.error(f"WebSocket connection error: {e}")
+        # Reconnects with jittered exponential backoff until close() is called
+        self.loop = asyncio.get_running_loop()
+        attempt = 0
+        while not self.should_close:
+            try:
+                async with websockets.connect(
+                    self.url,
+                    ping_interval=WS_PING_INTERVAL_SEC,
+                    ping_timeout=WS_PING_TIMEOUT_SEC,
+                    close_timeout=WS_CLOSE_TIMEOUT_SEC,
+                ) as websocket:
+                    self.ws = websocket
+                    self._on_connected()
+                    attempt = 0
+                    watchdog = asyncio.create_task(self._watchdog(websocket))
+                    try:
+                        await self.subscribe()
+                        await self.receive()
+                    finally:
+                        watchdog.cancel()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                logging.error(f"WebSocket connection error for {self.symbol}: {e}")
+            finally:
+                self.ws = None
+
+            if self.should_close:
+                break
+            self._on_disconnected()
+
+            delay = min(WS_RECONNECT_MAX_DELAY_SEC, WS_RECONNECT_BASE_DELAY_SEC * 2 ** attempt)
+            delay = delay / 2 + random.uniform(0, delay / 2)
+            attempt += 1
+            self.reconnect_count += 1
+            logging.warning(f"Reconnecting {self.symbol} in {delay:.2f}s (attempt {attempt})")
+            await asyncio.sleep(delay)
+
+    def _on_connected(self):
+        self.connected_at = time.time()
+        self.last_message_at = self.connected_at
+        if self.disconnected_at is not None:
+            self.downtime_sec += self.connected_at - self.disconnected_at
+            self.disconnected_at = None
+        # Whatever the book held before the drop may have missed updates
+        if self.book_builder:
+            self.book_builder.reset()
+        logging.info(f"Connected to WebSocket for {self.symbol}")
+
+    def _on_disconnected(self):
+        if self.disconnected_at is None:
+            self.disconnected_at = time.time()
+        if self.book_builder:
+            self.book_builder.reset()
+
+    async def _watchdog(self, websocket):
+        # Pings catch dead TCP connections; this catches a live socket that stopped sending data
+        while True:
+            await asyncio.sleep(WS_IDLE_TIMEOUT_SEC / 4)
+            # Ping round trip, measured by the websockets keepalive
+            self.clock.set_rtt(getattr(websocket, "latency", 0.0) * 1e9)
+            idle = time.time() - self.last_message_at
+            if idle > WS_IDLE_TIMEOUT_SEC:
+                logging.warning(f"No {self.symbol} data for {idle:.1f}s, dropping connection")
+                await websocket.close()
+                return
 
     async def subscribe(self):
         payload = {
@@ -38,24 +235,115 @@ class WebSocketManager:
         await self.ws.send(json.dumps(payload))
         logging.info(f"Subscribed to {self.symbol} orderbook")
 
+    async def unsubscribe(self):
+        payload = {
+            "op": "unsubscribe",
+            "args": [
+                {
+                    "channel": "books",
+                    "instId": self.symbol
+                }
+            ]
+        }
+        await self.ws.send(json.dumps(payload))
+        logging.info(f"Unsubscribed from {self.symbol} orderbook")
+
+    async def resnapshot(self):
+        # Resubscribing makes the exchange send a fresh full snapshot
+        logging.warning(f"Requesting fresh {self.symbol} snapshot")
+        self.book_builder.reset()
+        await self.unsubscribe()
+        await self.subscribe()
+
     async def receive(self):
         async for message in self.ws:
             if self.should_close:
                 break
             try:
-                data = json.loads(message)
-                if self.on_message:
-                    if inspect.iscoroutinefunction(self.on_message):
-                        await self.on_message(data)
-                    else:
-                        self.on_message(data)
+                await self.process(message)
             except Exception as e:
+                self.error_count += 1
                 logging.error(f"Failed to process message: {e}")
 
+    async def process(self, message):
+        # Everything the feed loop does with one frame once the socket has handed it over
+        start = time.perf_counter_ns()
+        received_wall_ns = time.time_ns()
+        self.messages_received += 1
+        self.bytes_received += len(message)
+        self.last_message_at = received_wall_ns / 1e9
+        if message == "pong":
+            return
+        if self.recorder:
+            self.recorder.write(self.symbol, message)
+
+        data = self.decoder.decode(message)
+        if self.on_message:
+            await self._dispatch(self.on_message, data)
+        if self.book_builder:
+            applied_at = time.perf_counter_ns()
+            applied = self.book_builder.apply(data)
+            published_at = time.perf_counter_ns()
+            latency.record("book.update", published_at - applied_at)
+            if applied:
+                self.book.received_ns = start
+                self._record_wire_latency(received_wall_ns)
+                if self.on_book:
+                    await self._dispatch(self.on_book, self.book)
+                    latency.record("feed.publish", time.perf_counter_ns() - published_at)
+            elif self.book_builder.needs_resnapshot:
+                await self.resnapshot()
+        latency.record("feed.receive", time.perf_counter_ns() - start)
+
+    def _record_wire_latency(self, received_wall_ns):
+        # Exchange send to local receive, with our clock's offset from the exchange's removed
+        exchange_ns = parse_exchange_timestamp(self.book.timestamp)
+        if exchange_ns is None:
+            return
+        wire_ns = self.clock.observe(exchange_ns, received_wall_ns)
+        latency.record("e2e.wire", wire_ns)
+        if LOG_MESSAGE_LATENCY:
+            logging.debug(f"{self.symbol} wire latency {wire_ns / 1e6:.3f}ms (clock offset {self.clock.offset_ns / 1e6:.3f}ms)")
+
+    async def _dispatch(self, callback, arg):
+        if inspect.iscoroutinefunction(callback):
+            await callback(arg)
+        else:
+            callback(arg)
+
     async def run(self):
+        self.should_close = False
         await self.connect()
 
-    def close(self):
+    async def aclose(self):
         self.should_close = True
         if self.ws:
-            asyncio.run_coroutine_threadsafe(self.ws.close(), asyncio.get_event_loop())
+            await self.ws.close()
+
+    def close(self):
+        # May be called from any thread: schedule the close on the connection's own loop
+        self.should_close = True
+        if self.ws and self.loop and self.loop.is_running():
+            asyncio.run_coroutine_threadsafe(self.ws.close(), self.loop)
+
+    def stats(self):
+        stats = {
+            "symbol": self.symbol,
+            "messages": self.messages_received,
+            "bytes": self.bytes_received,
+            "errors": self.error_count,
+            "connected_at": self.connected_at,
+            "last_message_at": self.last_message_at,
+            "connected": self.ws is not None,
+            "reconnects": self.reconnect_count,
+            "downtime_sec": round(self.downtime_sec + (time.time() - self.disconnected_at if self.disconnected_at else 0.0), 3),
+            "last_error": self.last_error,
+            "decoder": self.decoder.stats(),
+            "clock": self.clock.stats(),
+        }
+        if self.book_builder:
+            stats["snapshots"] = self.book_builder.snapshot_count
+            stats["updates"] = self.book_builder.update_count
+            stats["gaps"] = self.book_builder.gap_count
+            stats["checksum_failures"] = self.book_builder.checksum_failures
+        return stats
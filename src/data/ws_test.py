@@ -1,17 +1,22 @@
 # test_ws.py (run this for testing)
 
-from src.data.ws_backend import WebSocketManager
-import asyncio
+from src.config import EXCHANGES
+from src.data.feed_manager import FeedManager
+import time
 
-async def handle_message(data):
-    if "asks" in data and "bids" in data:
-        print("Top Ask:", data["asks"][0])
-        print("Top Bid:", data["bids"][0])
-        print("Timestamp:", data.get("timestamp"))
+def handle_book(book):
+    print(f"{book.symbol} Top Ask: {book.best_ask} Top Bid: {book.best_bid}")
+    print("Timestamp:", book.timestamp)
 
 if __name__ == "__main__":
-    ws_url = "wss://ws.gomarket-cpp.goquant.io/ws/l2-orderbook/okx/BTC-USDT-SWAP"
-    manager = WebSocketManager(url=ws_url, on_message=handle_message)
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    loop.run_until_complete(manager.run())
+    manager = FeedManager()
+    for pair in EXCHANGES["OKX"].available_pairs:
+        manager.add_symbol(pair, exchange="OKX", on_book=handle_book)
+    manager.start()
+    try:
+        while True:
+            time.sleep(10)
+            for stats in manager.stats():
+                print(stats)
+    except KeyboardInterrupt:
+        manager.stop()
@@ -1,9 +1,13 @@
 # src/main.py
 
+import logging
 import tkinter as tk
 from src.app.app import TradeSimulatorApp
+from src.config import LOG_LEVEL, LOG_FORMAT, LOG_FILE
 
 if __name__ == "__main__":
+    # Stage latency reports and model training logs go to LOG_FILE
+    logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT, filename=LOG_FILE)
     root = tk.Tk()
     app = TradeSimulatorApp(root)
     root.mainloop()
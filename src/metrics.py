@@ -0,0 +1,176 @@
+"""
+Latency instrumentation for the Trade Simulator
+Per-stage hot-path timings kept in fixed-size log-linear histograms.
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from src.config import ENABLE_BENCHMARKING, BENCHMARK_INTERVAL_SEC
+
+logger = logging.getLogger(__name__)
+
+REPORT_PERCENTILES = (50.0, 99.0, 99.9)
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of durations in nanoseconds.
+
+    Values below 2**sub_bucket_bits are counted exactly; above that each
+    power of two is split into 2**(sub_bucket_bits - 1) equal buckets, so
+    every recorded value is resolved to within 1 / 2**(sub_bucket_bits - 1)
+    of itself (under 2% with the default 7 bits). Recording is an integer
+    bit_length, a shift and a list increment; memory is fixed by the
+    largest trackable value, not by the number of samples.
+    """
+
+    def __init__(self, sub_bucket_bits: int = 7, max_value_ns: int = 2 ** 40) -> None:
+        """Allocate buckets for values up to max_value_ns (about 18 minutes by default)."""
+        self.sub_bucket_bits = sub_bucket_bits
+        self._exact = 1 << sub_bucket_bits
+        self._half = self._exact >> 1
+        self.max_value_ns = max_value_ns
+        self.counts: List[int] = [0] * (self._index(max_value_ns) + 1)
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns: Optional[int] = None
+        self.max_ns = 0
+
+    def record(self, ns: int) -> None:
+        """Count one duration; values beyond max_value_ns land in the top bucket."""
+        if ns < 0:
+            ns = 0
+        elif ns > self.max_value_ns:
+            ns = self.max_value_ns
+        self.counts[self._index(ns)] += 1
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+        if self.min_ns is None or ns < self.min_ns:
+            self.min_ns = ns
+
+    def percentile(self, q: float) -> int:
+        """
+        Duration below or at which q percent of the samples fall.
+
+        Returns:
+            int: Upper edge of the bucket holding the q-th percentile, capped
+            at the largest recorded value; 0 when empty.
+        """
+        if self.count == 0:
+            return 0
+        rank = max(1, int(q / 100.0 * self.count + 0.5))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self._upper_edge(index), self.max_ns)
+        return self.max_ns
+
+    def summary(self, percentiles=REPORT_PERCENTILES) -> Dict[str, Any]:
+        """Count, mean, min, max and percentiles, in microseconds."""
+        stats = {
+            "count": self.count,
+            "mean_us": round(self.total_ns / self.count / 1000, 2) if self.count else 0.0,
+            "min_us": round((self.min_ns or 0) / 1000, 2),
+            "max_us": round(self.max_ns / 1000, 2),
+        }
+        for q in percentiles:
+            stats[f"p{q:g}_us".replace(".", "")] = round(self.percentile(q) / 1000, 2)
+        return stats
+
+    def _index(self, ns: int) -> int:
+        """Bucket index of a value."""
+        if ns < self._exact:
+            return ns
+        shift = ns.bit_length() - self.sub_bucket_bits
+        return self._exact + (shift - 1) * self._half + (ns >> shift) - self._half
+
+    def _upper_edge(self, index: int) -> int:
+        """Largest value counted in a bucket."""
+        if index < self._exact:
+            return index
+        shift, offset = divmod(index - self._exact, self._half)
+        shift += 1
+        return ((offset + self._half + 1) << shift) - 1
+
+
+class LatencyRecorder:
+    """
+    Named per-stage latency histograms with periodic reporting.
+
+    Each stage is timed by its caller with time.perf_counter_ns() and the
+    elapsed nanoseconds passed to record(). Reporting swaps in empty
+    histograms, so every report covers one interval; a stage written by
+    one thread while another reports may lose at most the sample in flight.
+    When disabled, record() returns immediately.
+    """
+
+    def __init__(self, enabled: bool = ENABLE_BENCHMARKING, interval_sec: float = BENCHMARK_INTERVAL_SEC) -> None:
+        """Initialize with no stages; call start() to report periodically."""
+        self.enabled = enabled
+        self.interval_sec = interval_sec
+        self._stages: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.last_report: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, stage: str, ns: int) -> None:
+        """Add one duration in nanoseconds to a stage."""
+        if not self.enabled:
+            return
+        histogram = self._stages.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._stages.setdefault(stage, LatencyHistogram())
+        histogram.record(ns)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Summaries of the current interval so far, by stage."""
+        with self._lock:
+            stages = list(self._stages.items())
+        return {stage: histogram.summary() for stage, histogram in sorted(stages)}
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Summarize and log the interval's stages, then start a new interval."""
+        with self._lock:
+            stages, self._stages = self._stages, {}
+        summary = {stage: histogram.summary() for stage, histogram in sorted(stages.items()) if histogram.count}
+        for stage, stats in summary.items():
+            logger.info(
+                f"{stage}: n={stats['count']} p50={stats['p50_us']}us p99={stats['p99_us']}us "
+                f"p999={stats['p999_us']}us max={stats['max_us']}us"
+            )
+        self.last_report = summary
+        return summary
+
+    def start(self) -> None:
+        """Report every interval_sec on a daemon thread until stop()."""
+        if not self.enabled or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="latency-reporter", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop periodic reporting."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+
+    def _run(self) -> None:
+        """Thread body: report until stopped."""
+        while not self._stop.wait(self.interval_sec):
+            try:
+                self.report()
+            except Exception as e:
+                logger.error(f"Latency report failed: {e}")
+
+
+# Process-wide recorder shared by the feed, the compute worker and the UI
+latency = LatencyRecorder()
@@ -0,0 +1,80 @@
+"""
+Inference evaluators for the Trade Simulator
+Lightweight linear and logistic predictors built from fitted model coefficients.
+"""
+import math
+import numpy as np
+from typing import Callable, Optional, Sequence
+
+
+def compile_linear(coef: Sequence[float], intercept: float) -> Callable[[Sequence[float]], float]:
+    """
+    Build a pure-arithmetic function computing intercept + coef . x.
+
+    The coefficients are bound as constants of a generated expression, so a
+    call is a handful of float multiply-adds with no array construction.
+    """
+    names = {f"w{i}": float(w) for i, w in enumerate(coef)}
+    names["b"] = float(intercept)
+    names["__builtins__"] = {}
+    terms = "".join(f" + w{i} * x[{i}]" for i in range(len(coef)))
+    return eval(f"lambda x: b{terms}", names)
+
+
+def sigmoid(z: float) -> float:
+    """Logistic function, stable for large |z|."""
+    if z >= 0:
+        return 1.0 / (1.0 + math.exp(-z))
+    e = math.exp(z)
+    return e / (1.0 + e)
+
+
+class LinearEvaluator:
+    """
+    Evaluates a fitted linear model, optionally on standardized inputs.
+
+    Standardization ((x - mean) / scale) is folded into the coefficients up
+    front, so inference works on raw feature values.
+    """
+
+    def __init__(
+        self,
+        coef: Sequence[float],
+        intercept: float,
+        mean: Optional[Sequence[float]] = None,
+        scale: Optional[Sequence[float]] = None,
+    ) -> None:
+        """Export coefficients, folding in a scaler's mean and scale when given."""
+        coef = np.asarray(coef, dtype=np.float64).ravel()
+        intercept = float(np.ravel(intercept)[0]) if np.ndim(intercept) else float(intercept)
+        if scale is not None:
+            coef = coef / np.asarray(scale, dtype=np.float64)
+        if mean is not None:
+            intercept -= float(np.dot(coef, mean))
+
+        self.coef = coef
+        self.intercept = intercept
+        self._linear = compile_linear(coef, intercept)
+
+    def __call__(self, features: Sequence[float]) -> float:
+        """Evaluate one feature vector."""
+        return self._linear(features)
+
+    def batch(self, X: np.ndarray) -> np.ndarray:
+        """Evaluate every row of a 2-D feature matrix."""
+        return X @ self.coef + self.intercept
+
+
+class LogisticEvaluator(LinearEvaluator):
+    """Evaluates a fitted binary logistic model as sigmoid(coef . x + intercept)."""
+
+    def __call__(self, features: Sequence[float]) -> float:
+        """Positive-class probability for one feature vector."""
+        return sigmoid(self._linear(features))
+
+    def batch(self, X: np.ndarray) -> np.ndarray:
+        """Positive-class probabilities for every row of a 2-D feature matrix."""
+        z = X @ self.coef + self.intercept
+        # exp of a non-positive argument never overflows
+        e = np.exp(-np.abs(z))
+        return np.where(z >= 0, 1.0 / (1.0 + e), e / (1.0 + e))
@@ -0,0 +1,120 @@
+"""
+Model feature layout for the Trade Simulator
+Defines the per-tick feature vector and the structured array the batch model APIs consume.
+"""
+import numpy as np
+from typing import Any, Dict, List
+
+from src.data.orderbook import OrderBook
+
+# One row per (tick, scenario) evaluation; field names match the model input dict keys
+FEATURE_DTYPE = np.dtype([
+    ("quantity", "<f8"),
+    ("mid_price", "<f8"),
+    ("spread_pct", "<f8"),
+    ("imbalance", "<f8"),
+    ("depth_ratio", "<f8"),
+    ("volatility", "<f8"),
+    ("bid_depth", "<f8"),
+    ("ask_depth", "<f8"),
+    ("is_limit", "<f8"),  # 0.0 for market orders, 1.0 for limit orders
+    ("daily_volume", "<f8"),  # Live USD volume per day; 0.0 when no estimate is available
+])
+
+
+# Positions of each field in a feature vector (one FEATURE_DTYPE row viewed as float64)
+(
+    QUANTITY, MID_PRICE, SPREAD_PCT, IMBALANCE, DEPTH_RATIO,
+    VOLATILITY, BID_DEPTH, ASK_DEPTH, IS_LIMIT, DAILY_VOLUME,
+) = range(len(FEATURE_DTYPE.names))
+
+
+def empty_features(n: int) -> np.ndarray:
+    """Allocate a zeroed feature batch of `n` rows."""
+    return np.zeros(n, dtype=FEATURE_DTYPE)
+
+
+def feature_matrix(features: np.ndarray, columns: List[int]) -> np.ndarray:
+    """
+    Select model columns from a feature batch as a 2-D float matrix.
+
+    Args:
+        features: Structured array with FEATURE_DTYPE.
+        columns: Field positions, e.g. [QUANTITY, SPREAD_PCT].
+
+    Returns:
+        np.ndarray: One row per feature row, one column per selected field.
+    """
+    values = np.ascontiguousarray(features).view(np.float64).reshape(len(features), len(FEATURE_DTYPE.names))
+    return values[:, columns]
+
+
+def features_from_inputs(inputs: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Pack model input dicts (as built by OrderBook.model_input) into a feature batch.
+
+    Returns:
+        np.ndarray: Structured array with FEATURE_DTYPE.
+    """
+    features = empty_features(len(inputs))
+    for row, data in zip(features, inputs):
+        for name in FEATURE_DTYPE.names:
+            if name == "is_limit":
+                row[name] = 0.0 if data["order_type"] == "market" else 1.0
+            elif name == "daily_volume":
+                row[name] = data.get(name, 0.0)
+            else:
+                row[name] = data[name]
+    return features
+
+
+class FeatureStage:
+    """
+    Computes one tick's features once, into a preallocated buffer shared by every model.
+
+    The same memory is exposed two ways: `batch`, a one-row FEATURE_DTYPE
+    array for the batch model APIs, and `vector`, a read-only float64 view
+    indexed by the field constants above for the per-tick model APIs.
+    Models only read it, so they can run side by side on the same tick.
+    """
+
+    def __init__(self) -> None:
+        """Allocate the buffer."""
+        self.batch = empty_features(1)
+        self._values = self.batch.view(np.float64)
+        self.vector = self._values.view()
+        self.vector.flags.writeable = False
+
+    def update(
+        self,
+        book: OrderBook,
+        quantity: float,
+        volatility: float,
+        order_type: str,
+        daily_volume: float = 0.0,
+        side: str = "buy",
+    ) -> np.ndarray:
+        """
+        Recompute every feature for a book state and order.
+
+        Imbalance is the bid share of depth for buys and the ask share for
+        sells, so the models see the book from the order's side.
+
+        Returns:
+            np.ndarray: The read-only feature vector, valid until the next update.
+        """
+        bid_depth = book.bid_depth()
+        ask_depth = book.ask_depth()
+        self._values[:] = (
+            quantity,
+            book.mid_price,
+            book.spread_pct,
+            (ask_depth if side == "sell" else bid_depth) / (bid_depth + ask_depth),
+            min(bid_depth, ask_depth) / max(bid_depth, ask_depth),
+            volatility,
+            bid_depth,
+            ask_depth,
+            0.0 if order_type == "market" else 1.0,
+            daily_volume,
+        )
+        return self.vector
@@ -2,7 +2,8 @@
 Fee model for the Trade Simulator
 """
 import logging
-from typing import Dict, Any
+import numpy as np
+from typing import Dict, Any, Optional, Union
 
 logger = logging.getLogger(__name__)
 
@@ -43,4 +44,32 @@ class FeeModel:
         
         except Exception as e:
             logger.error(f"Error calculating fees: {e}")
-            return 0.0  # Default to zero fees on error
\ No newline at end of file
+            return 0.0  # Default to zero fees on error
+
+    def calculate_batch(
+        self,
+        quantity: np.ndarray,
+        price: np.ndarray,
+        maker_proportion: np.ndarray,
+        maker_rate: Optional[Union[float, np.ndarray]] = None,
+        taker_rate: Optional[Union[float, np.ndarray]] = None,
+    ) -> np.ndarray:
+        """
+        Calculate expected fees in USD for a batch of orders.
+
+        Rates default to the model's current rates; per-row rate arrays allow
+        several fee tiers to be priced in one call.
+        """
+        try:
+            maker_rate = self.maker_rate if maker_rate is None else maker_rate
+            taker_rate = self.taker_rate if taker_rate is None else taker_rate
+
+            trade_value = np.asarray(quantity, dtype=np.float64)
+            maker_value = trade_value * maker_proportion
+            taker_value = trade_value * (1 - maker_proportion)
+
+            return maker_value * maker_rate + taker_value * taker_rate
+
+        except Exception as e:
+            logger.error(f"Error calculating batch fees: {e}")
+            return np.zeros(np.shape(quantity))
@@ -3,134 +3,276 @@ Maker/Taker Proportion Model for the Trade Simulator
 Predicts likelihood of an order being a maker using logistic regression.
 """
 
+import copy
 import logging
 import numpy as np
-from typing import Dict, Any, List
-from sklearn.linear_model import LogisticRegression
+from typing import Dict, List, Optional, Tuple
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import StandardScaler
+
+from src.config import MODEL_BUFFER_CAPACITY, MODEL_MIN_SAMPLES, MODEL_SGD_LEARNING_RATE, MODEL_TRAIN_INTERVAL
+from src.models.evaluators import LogisticEvaluator
+from src.models.features import (
+    DEPTH_RATIO, IMBALANCE, IS_LIMIT, QUANTITY, SPREAD_PCT, VOLATILITY, feature_matrix,
+)
+from src.models.online import BackgroundTrainer, RingBuffer
 
 # Configure logger
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
+
+# Feature vector positions the classifier is fitted on
+MAKER_TAKER_COLUMNS = [IS_LIMIT, QUANTITY, SPREAD_PCT, IMBALANCE, DEPTH_RATIO, VOLATILITY]
 
 class MakerTakerModel:
     """
     Predicts the probability that a given order is a maker.
-    Trains a logistic regression model using real-time order data.
+    Trains a logistic regression model incrementally (SGD on standardized
+    features) using real-time order data held in a fixed-size buffer.
     """
 
-    def __init__(self) -> None:
-        """Initialize model and training data."""
-        self.model = LogisticRegression()
+    def __init__(
+        self,
+        capacity: int = MODEL_BUFFER_CAPACITY,
+        train_interval: int = MODEL_TRAIN_INTERVAL,
+        learning_rate: float = MODEL_SGD_LEARNING_RATE,
+        background: bool = True,
+    ) -> None:
+        """
+        Initialize model and training data.
+
+        Fits run on the background trainer unless `background` is False;
+        predictions keep using the previous evaluator until a fit is published.
+        """
+        # (scaler, classifier) pair used only for fitting, replaced as a whole when a fit completes
+        self.estimator: Tuple[StandardScaler, SGDClassifier] = (
+            StandardScaler(), SGDClassifier(loss="log_loss", learning_rate="constant", eta0=learning_rate)
+        )
+        self.evaluator: Optional[LogisticEvaluator] = None  # Exported coefficients used for inference
         self.is_trained = False
-        self.training_data_x: List[List[float]] = []
-        self.training_data_y: List[int] = []
+        self.training_data = RingBuffer(capacity, n_features=len(MAKER_TAKER_COLUMNS))
+        self.train_interval = train_interval
+        self.trainer = BackgroundTrainer("maker/taker", background=background)
+        self._fitted_total = 0  # training_data.total covered by submitted fits
+        self.learning = True  # False serves the current (e.g. loaded) evaluator unchanged
         logger.info("Initialized Maker/Taker Model.")
 
-    def predict(self, data: Dict[str, Any]) -> float:
+    def predict(self, x: np.ndarray) -> float:
         """
         Predict the probability that the given order is a maker.
 
         Args:
-            data (Dict[str, Any]): Order-level input features.
+            x (np.ndarray): Feature vector from FeatureStage; read, never modified.
 
         Returns:
             float: Maker probability (0.0 = taker, 1.0 = maker)
         """
         try:
-            logger.debug(f"Prediction input: {data}")
-            features = self._extract_features(data)
+            logger.debug("Prediction input: %s", x)
+            features = self._extract_features(x)
 
-            if data["order_type"] == "market":
+            if x[IS_LIMIT] == 0:
                 logger.debug("Detected market order. Maker proportion = 0.0")
                 maker_prob = 0.0
             elif self.is_trained:
-                maker_prob = self.model.predict_proba([features])[0][1]
-                logger.debug(f"Predicted maker proportion (trained): {maker_prob:.4f}")
+                maker_prob = self.evaluator(features)
+                logger.debug("Predicted maker proportion (trained): %.4f", maker_prob)
             else:
-                maker_prob = self._heuristic_prediction(data)
-                logger.debug(f"Heuristic prediction (untrained): {maker_prob:.4f}")
+                maker_prob = self._heuristic_prediction(x)
+                logger.debug("Heuristic prediction (untrained): %.4f", maker_prob)
 
-            self._collect_training_data(features, data)
+            if self.learning:
+                self._collect_training_data(features)
             return maker_prob
 
         except Exception as e:
             logger.error(f"Prediction error: {e}")
             return 0.0
 
-    def _extract_features(self, data: Dict[str, Any]) -> List[float]:
+    def predict_batch(self, features: np.ndarray) -> np.ndarray:
         """
-        Extract numerical features from input data.
+        Predict maker probabilities for a batch of orders.
+
+        Matches predict() row by row with the current model state, but does
+        not collect training data. The classifier is called once for all
+        limit-order rows.
+
+        Args:
+            features (np.ndarray): Structured array with FEATURE_DTYPE fields.
 
         Returns:
-            List[float]: Feature vector.
+            np.ndarray: Maker probabilities (0.0 = taker, 1.0 = maker).
         """
         try:
-            order_type_num = 0 if data["order_type"] == "market" else 1
-            features = [
-                order_type_num,
-                data.get("quantity", 1.0),
-                data.get("spread_pct", 0.0),
-                data.get("imbalance", 0.5),
-                data.get("depth_ratio", 1.0),
-                data.get("volatility", 0.01),
-            ]
-            logger.debug(f"Extracted features: {features}")
-            return features
-        except KeyError as ke:
-            logger.error(f"Missing key in input data: {ke}")
-            raise
-
-    def _heuristic_prediction(self, data: Dict[str, Any]) -> float:
+            maker_prob = np.zeros(len(features))
+            limit = features["is_limit"] != 0
+            if not limit.any():
+                return maker_prob
+
+            rows = features[limit]
+            if self.is_trained:
+                maker_prob[limit] = self.evaluator.batch(self._extract_feature_matrix(rows))
+            else:
+                spread_factor = np.minimum(0.3, rows["spread_pct"] / 10)
+                quantity_factor = np.minimum(0.2, 10 / np.maximum(rows["quantity"], 1))
+                maker_prob[limit] = np.minimum(1.0, 0.5 + spread_factor + quantity_factor)
+            return maker_prob
+
+        except Exception as e:
+            logger.error(f"Batch prediction error: {e}")
+            return np.zeros(len(features))
+
+    def _extract_feature_matrix(self, features: np.ndarray) -> np.ndarray:
+        """
+        Extract the classifier feature matrix from a feature batch.
+
+        Returns:
+            np.ndarray: One feature row per order.
+        """
+        return feature_matrix(features, MAKER_TAKER_COLUMNS)
+
+    def _extract_features(self, x: np.ndarray) -> List[float]:
+        """
+        Extract the classifier features from a feature vector.
+
+        Returns:
+            List[float]: Classifier inputs.
+        """
+        features = x[MAKER_TAKER_COLUMNS].tolist()
+        logger.debug("Extracted features: %s", features)
+        return features
+
+    def _heuristic_prediction(self, x: np.ndarray) -> float:
         """
         Compute a fallback maker probability using heuristics.
 
         Returns:
             float: Estimated maker probability.
         """
-        spread_pct = data.get("spread_pct", 0)
-        quantity = data.get("quantity", 1)
+        spread_pct = x[SPREAD_PCT]
+        quantity = x[QUANTITY]
 
         base = 0.5
         spread_factor = min(0.3, spread_pct / 10)
         quantity_factor = min(0.2, 10 / max(quantity, 1))
 
-        return min(1.0, base + spread_factor + quantity_factor)
+        return float(min(1.0, base + spread_factor + quantity_factor))
+
+    def get_state(self) -> Dict[str, np.ndarray]:
+        """
+        Serving coefficients, fitting state and training window, oldest sample first.
+
+        Coefficients are saved as exported by the evaluator, with the
+        scaler already folded in. Once fitted, the scaler statistics and
+        the raw classifier weights are saved too, so online learning can
+        carry on from them after a restore.
+        """
+        x, y = self.training_data.arrays()
+        scaler, model = self.estimator
+        evaluator = self.evaluator
+        state = {
+            "coef": evaluator.coef if evaluator else np.zeros(self.training_data.x.shape[1]),
+            "intercept": np.array(evaluator.intercept if evaluator else 0.0),
+            "is_trained": np.array(self.is_trained and evaluator is not None),
+            "x": x,
+            "y": y,
+        }
+        if getattr(model, "coef_", None) is not None:
+            state.update({
+                "scaler_mean": scaler.mean_,
+                "scaler_var": scaler.var_,
+                "scaler_scale": scaler.scale_,
+                "scaler_samples": np.array(scaler.n_samples_seen_),
+                "sgd_coef": model.coef_,
+                "sgd_intercept": model.intercept_,
+                "sgd_updates": np.array(model.t_),
+            })
+        return state
+
+    def set_state(self, state: Dict[str, np.ndarray]) -> None:
+        """
+        Restore a state from get_state().
+
+        Predictions use the saved coefficients immediately. With the saved
+        fitting state, the next training step continues from the restored
+        classifier on new samples only; without it (older files), the
+        classifier is refitted from the restored window.
+        """
+        scaler, model = StandardScaler(), SGDClassifier(**self.estimator[1].get_params())
+        if "sgd_coef" in state:
+            scaler.mean_ = np.array(state["scaler_mean"], dtype=np.float64)
+            scaler.var_ = np.array(state["scaler_var"], dtype=np.float64)
+            scaler.scale_ = np.array(state["scaler_scale"], dtype=np.float64)
+            scaler.n_samples_seen_ = np.asarray(state["scaler_samples"])[()]  # NumPy scalar, or per-feature counts
+            scaler.n_features_in_ = len(scaler.mean_)
+            model.coef_ = np.array(state["sgd_coef"], dtype=np.float64)
+            model.intercept_ = np.array(state["sgd_intercept"], dtype=np.float64)
+            model.t_ = float(state["sgd_updates"])
+            model.classes_ = np.array([0, 1])
+            model.n_features_in_ = model.coef_.shape[1]
+        self.estimator = (scaler, model)
+
+        self.training_data = RingBuffer(self.training_data.capacity, n_features=self.training_data.x.shape[1])
+        for features, label in zip(state["x"], state["y"]):
+            self.training_data.append(features, label)
+        self._fitted_total = self.training_data.total
 
-    def _collect_training_data(self, features: List[float], data: Dict[str, Any]) -> None:
+        self.is_trained = bool(state["is_trained"])
+        self.evaluator = LogisticEvaluator(state["coef"], float(state["intercept"])) if self.is_trained else None
+
+    def _collect_training_data(self, features: List[float]) -> None:
         """
         Collect labeled data and trigger model training.
 
         Args:
-            features (List[float]): Extracted features.
-            data (Dict[str, Any]): Original order data.
+            features (List[float]): Extracted features; the order type comes first.
         """
-        label = 0 if data["order_type"] == "market" else 1
-        self.training_data_x.append(features)
-        self.training_data_y.append(label)
+        label = int(features[0])
+        self.training_data.append(features, label)
 
-        logger.debug(f"Added training sample - Label: {label}, Features: {features}")
-        logger.debug(f"Training dataset size: {len(self.training_data_y)}")
+        logger.debug("Added training sample - Label: %d, Features: %s", label, features)
+        logger.debug("Training dataset size: %d", len(self.training_data))
 
-        if not self.is_trained and len(self.training_data_y) >= 100:
-            self._train_model()
-        elif self.is_trained and len(self.training_data_y) % 100 == 0:
+        if self.training_data.total >= MODEL_MIN_SAMPLES and self.training_data.total % self.train_interval == 0:
             self._train_model()
 
     def _train_model(self) -> None:
         """
-        Train logistic regression model on collected samples.
-        """
-        try:
-            X = np.array(self.training_data_x)
-            y = np.array(self.training_data_y)
+        Update the logistic regression model with the newest samples.
 
+        The first fit of a classifier uses the whole buffer; later fits take one
+        partial_fit step over the samples added since the previous one.
+        The fit runs on a copy of the serving estimator, which is swapped
+        in when done.
+        """
+        if getattr(self.estimator[1], "coef_", None) is not None:
+            X, y = self.training_data.arrays(last=self.training_data.total - self._fitted_total)
+        else:
+            X, y = self.training_data.arrays()
             if len(np.unique(y)) < 2:
                 logger.warning("Only one class in data. Skipping model training.")
                 return
 
-            self.model.fit(X, y)
-            self.is_trained = True
-            logger.info(f"Trained Maker/Taker model on {len(y)} samples.")
+        estimator = self.estimator
+        if self.trainer.submit(lambda: self._fit(estimator, X, y), self._publish):
+            self._fitted_total = self.training_data.total
 
-        except Exception as e:
-            logger.error(f"Model training failed: {e}")
+    def _fit(
+        self, estimator: Tuple[StandardScaler, SGDClassifier], X: np.ndarray, y: np.ndarray
+    ) -> Tuple[Tuple[StandardScaler, SGDClassifier], LogisticEvaluator]:
+        """
+        Fit a copy of `estimator` on one batch.
+
+        Returns:
+            The updated (scaler, classifier) pair and its exported evaluator.
+        """
+        scaler, model = copy.deepcopy(estimator)
+        scaler.partial_fit(X)
+        model.partial_fit(scaler.transform(X), y, classes=[0, 1])
+        evaluator = LogisticEvaluator(model.coef_[0], model.intercept_[0], mean=scaler.mean_, scale=scaler.scale_)
+        logger.info(f"Trained Maker/Taker model on {len(y)} samples.")
+        return (scaler, model), evaluator
+
+    def _publish(self, fitted: Tuple[Tuple[StandardScaler, SGDClassifier], LogisticEvaluator]) -> None:
+        """Swap in a newly fitted estimator and its evaluator."""
+        self.estimator, self.evaluator = fitted
+        self.is_trained = True
@@ -2,49 +2,61 @@
 Market impact model for the Trade Simulator
 """
 import logging
+import math
 import numpy as np
-from typing import Dict, Any
+from typing import Sequence, Tuple, Union
+
+from src.models.features import ASK_DEPTH, BID_DEPTH, DAILY_VOLUME, QUANTITY, SPREAD_PCT, VOLATILITY
+from src.models.optimal_execution import ExecutionFrontier, ExecutionSchedule, efficient_frontier
 
 logger = logging.getLogger(__name__)
 
 class MarketImpactModel:
-    """Model for estimating market impact using Almgren-Chriss model"""
+    """
+    Model for estimating market impact using Almgren-Chriss model
+
+    Parameters are estimated from each feature vector and never stored, so
+    one model can price any number of books and scenarios side by side.
+    """
     
     def __init__(self):
         """Initialize the market impact model"""
         # Almgren-Chriss model parameters
-        self.sigma = 0.0  # Market volatility (set dynamically)
-        self.gamma = 0.1  # Market resilience parameter
-        self.eta = 1.0    # Market depth parameter
+        self.gamma = 0.1  # Base market resilience parameter
+        self.eta = 1.0    # Market depth parameter used when the book has no depth
         
         logger.info("Market impact model initialized")
     
-    def calculate(self, quantity: float, price: float, volatility: float, orderbook_data: Dict[str, Any]) -> float:
-        """Calculate expected market impact percentage using Almgren-Chriss model"""
+    def calculate(self, x: np.ndarray) -> float:
+        """
+        Calculate expected market impact percentage using Almgren-Chriss model
+
+        Args:
+            x: Feature vector from FeatureStage; read, never modified.
+        """
         try:
-            # Set volatility parameter
-            self.sigma = volatility
+            sigma = x[VOLATILITY]
             
-            # Estimate market depth from orderbook
-            self._estimate_market_parameters(orderbook_data)
+            # Estimate market depth and resilience from the orderbook features
+            eta, gamma = self._impact_coefficients(x)
             
             # Calculate temporary impact (immediate price movement)
             # I_temp = eta * sigma * sqrt(quantity / V)
-            daily_volume = self._estimate_daily_volume(orderbook_data)
-            quantity_ratio = quantity / daily_volume
+            daily_volume = self._estimate_daily_volume(x)
+            quantity_ratio = x[QUANTITY] / daily_volume
             
             # Temporary impact as percentage
-            temporary_impact = self.eta * self.sigma * np.sqrt(quantity_ratio)
+            temporary_impact = eta * sigma * math.sqrt(quantity_ratio)
             
             # Calculate permanent impact (lasting price change)
             # I_perm = gamma * sigma * quantity / V
-            permanent_impact = self.gamma * self.sigma * quantity_ratio
+            permanent_impact = gamma * sigma * quantity_ratio
             
             # Total impact as percentage
             total_impact = temporary_impact + permanent_impact
             
             # Convert to percentage
-            impact_percentage = total_impact * 100
+            impact_percentage = float(total_impact * 100)
             
             return impact_percentage
         
@@ -52,35 +64,121 @@ class MarketImpactModel:
             logger.error(f"Error calculating market impact: {e}")
             return 0.01  # Default to 0.01% impact on error
     
-    def _estimate_market_parameters(self, data: Dict[str, Any]) -> None:
-        """Estimate market parameters from orderbook data"""
+    def calculate_batch(self, quantity: np.ndarray, volatility: np.ndarray, features: np.ndarray) -> np.ndarray:
+        """
+        Calculate expected market impact percentage for a batch of orders.
+
+        Same formulas as calculate(), evaluated per row.
+
+        Args:
+            quantity: Order sizes.
+            volatility: Volatilities as decimals.
+            features: Structured array with FEATURE_DTYPE fields.
+
+        Returns:
+            np.ndarray: Impact percentages.
+        """
+        try:
+            total_depth = features["bid_depth"] + features["ask_depth"]
+            with np.errstate(divide="ignore"):
+                normalized_depth = np.minimum(1.0, 100 / total_depth)
+            eta = np.where(total_depth > 0, 0.5 + normalized_depth, self.eta)
+            gamma = self.gamma + (features["spread_pct"] / 100)
+
+            daily_volume = np.where(features["daily_volume"] > 0, features["daily_volume"], np.maximum(total_depth * 20, 1000))
+            quantity_ratio = quantity / daily_volume
+
+            temporary_impact = eta * volatility * np.sqrt(quantity_ratio)
+            permanent_impact = gamma * volatility * quantity_ratio
+
+            return (temporary_impact + permanent_impact) * 100
+
+        except Exception as e:
+            logger.error(f"Error calculating batch market impact: {e}")
+            return np.full(len(features), 0.01)
+
+    def execution_frontier(
+        self,
+        x: np.ndarray,
+        horizon: float,
+        n_slices: int,
+        risk_aversion: Union[float, Sequence[float], np.ndarray],
+    ) -> ExecutionFrontier:
+        """
+        Optimal Almgren-Chriss schedules for a parent order on the current book.
+
+        Impact coefficients come from the same book estimates as calculate(),
+        expressed as linear impact in USD: trading at a rate of v USD/day
+        moves the price by eta * sigma * v / V (temporary) and
+        gamma * sigma * v / V (permanent), with V the estimated daily volume.
+        Half the spread is charged as a fixed cost per USD traded.
+
+        Args:
+            x: Feature vector from FeatureStage; its quantity (USD) is the
+                parent order and its volatility the daily volatility.
+            horizon: Time to complete the order, in days.
+            n_slices: Number of child orders.
+            risk_aversion: Lambda value(s) in 1/USD.
+
+        Returns:
+            ExecutionFrontier: Trajectories, expected cost (USD) and variance (USD^2).
+        """
+        sigma, eta, gamma, epsilon = self.schedule_parameters(x)
+        return efficient_frontier(float(x[QUANTITY]), horizon, n_slices, risk_aversion, sigma, eta, gamma, epsilon)
+
+    def optimal_schedule(
+        self,
+        x: np.ndarray,
+        horizon: float,
+        n_slices: int,
+        risk_aversion: float,
+    ) -> ExecutionSchedule:
+        """Optimal trajectory for one risk aversion; see execution_frontier()."""
+        return self.execution_frontier(x, horizon, n_slices, risk_aversion).schedule(0)
+
+    def schedule_parameters(self, x: np.ndarray) -> Tuple[float, float, float, float]:
+        """
+        Almgren-Chriss coefficients in USD and days for the current book.
+
+        Returns:
+            Tuple of (sigma, eta, gamma, epsilon).
+        """
+        volatility = float(x[VOLATILITY])
+        eta, gamma = self._impact_coefficients(x)
+        daily_volume = self._estimate_daily_volume(x)
+        return (
+            volatility,
+            eta * volatility / daily_volume,
+            gamma * volatility / daily_volume,
+            float(x[SPREAD_PCT]) / 200,
+        )
+
+    def _impact_coefficients(self, x: np.ndarray) -> Tuple[float, float]:
+        """Estimate (eta, gamma) from the orderbook features"""
         # Estimate market depth parameter (eta)
         # Lower depth means higher eta (more impact)
-        bid_depth = data["bid_depth"]
-        ask_depth = data["ask_depth"]
-        total_depth = bid_depth + ask_depth
+        total_depth = float(x[BID_DEPTH] + x[ASK_DEPTH])
+        eta = self.eta
         
         # Normalize depth to a reasonable range for eta
         if total_depth > 0:
             normalized_depth = min(1.0, 100 / total_depth)
-            self.eta = 0.5 + normalized_depth  # Range: 0.5 to 1.5
+            eta = 0.5 + normalized_depth  # Range: 0.5 to 1.5
         
         # Estimate market resilience (gamma)
         # Higher spread means lower resilience (higher gamma)
-        spread_pct = data["spread_pct"]
-        self.gamma = 0.1 + (spread_pct / 100)  # Base 0.1 plus spread contribution
+        gamma = self.gamma + (float(x[SPREAD_PCT]) / 100)  # Base 0.1 plus spread contribution
+        return eta, gamma
     
-    def _estimate_daily_volume(self, data: Dict[str, Any]) -> float:
-        """Estimate daily trading volume from orderbook data"""
-        # This is a simplified estimation
-        # In a real system, you would use historical volume data
-        
-        # Use orderbook depth as a proxy for volume
-        bid_depth = data["bid_depth"]
-        ask_depth = data["ask_depth"]
+    def _estimate_daily_volume(self, x: np.ndarray) -> float:
+        """Estimate daily trading volume from the orderbook features"""
+        # Prefer the live rolling volume estimate when the pipeline provides one
+        if x[DAILY_VOLUME] > 0:
+            return float(x[DAILY_VOLUME])
         
+        # Otherwise use orderbook depth as a proxy for volume
         # Assume depth represents ~5% of daily volume
-        estimated_volume = (bid_depth + ask_depth) * 20
+        estimated_volume = float(x[BID_DEPTH] + x[ASK_DEPTH]) * 20
         
         # Ensure minimum volume to avoid division by zero
-        return max(estimated_volume, 1000)
\ No newline at end of file
+        return max(estimated_volume, 1000)
@@ -0,0 +1,214 @@
+"""
+Streaming market estimators for the Trade Simulator
+Realized volatility and traded volume updated in O(1) per book update.
+"""
+import math
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from src.config import (
+    VOLATILITY_EWMA_HALFLIFE_SEC,
+    VOLATILITY_WINDOW_SEC,
+    VOLUME_WINDOW_SEC,
+    MARKET_STATE_MIN_SEC,
+)
+from src.data.orderbook import OrderBook
+
+SECONDS_PER_DAY = 86400.0
+
+
+def select_volatility(market: Dict[str, Any], source: str, fallback: float) -> float:
+    """
+    Volatility to feed the models.
+
+    Args:
+        market: MarketStateEstimator.state() output.
+        source: "ewma", "realized" or "input".
+        fallback: Typed volatility, used for "input" and until the estimate is warm.
+    """
+    if source != "input" and market["warm"]:
+        live = market["volatility_realized"] if source == "realized" else market["volatility_ewma"]
+        if live > 0:
+            return live
+    return fallback
+
+
+class EwmaVolatility:
+    """
+    Exponentially weighted realized volatility of log mid-price returns.
+
+    Tracks the variance rate (squared return per second) with a time-based
+    half-life, so irregular tick spacing is weighted correctly.
+    """
+
+    def __init__(self, halflife_sec: float = VOLATILITY_EWMA_HALFLIFE_SEC) -> None:
+        """Start with no observations."""
+        self.halflife_sec = halflife_sec
+        self.variance_rate = 0.0
+        self.elapsed = 0.0  # Seconds of returns observed
+
+    def update(self, log_return: float, dt: float) -> None:
+        """Fold in one return observed over dt seconds."""
+        if dt <= 0:
+            return
+        weight = 1.0 - math.exp(-math.log(2) * dt / self.halflife_sec)
+        if self.elapsed == 0.0:
+            weight = 1.0
+        self.variance_rate += weight * (log_return * log_return / dt - self.variance_rate)
+        self.elapsed += dt
+
+    @property
+    def daily(self) -> float:
+        """Volatility scaled to one day, as a decimal."""
+        return math.sqrt(self.variance_rate * SECONDS_PER_DAY)
+
+
+class RealizedVolatility:
+    """
+    Realized volatility over a sliding time window.
+
+    Keeps the window's squared returns in a deque with a running sum, so
+    each update adds one entry and evicts the expired ones.
+    """
+
+    def __init__(self, window_sec: float = VOLATILITY_WINDOW_SEC) -> None:
+        """Start with an empty window."""
+        self.window_sec = window_sec
+        self._returns: Deque[Tuple[float, float, float]] = deque()  # (time, squared return, dt)
+        self._sum_sq = 0.0
+        self._sum_dt = 0.0
+
+    def update(self, log_return: float, dt: float, now: float) -> None:
+        """Add a return observed over dt seconds ending at `now`."""
+        if dt <= 0:
+            return
+        self._returns.append((now, log_return * log_return, dt))
+        self._sum_sq += log_return * log_return
+        self._sum_dt += dt
+        while self._returns and self._returns[0][0] <= now - self.window_sec:
+            _, square, old_dt = self._returns.popleft()
+            self._sum_sq -= square
+            self._sum_dt -= old_dt
+        if not self._returns:
+            self._sum_sq = self._sum_dt = 0.0
+
+    @property
+    def daily(self) -> float:
+        """Volatility scaled to one day, as a decimal."""
+        if self._sum_dt <= 0:
+            return 0.0
+        return math.sqrt(max(self._sum_sq, 0.0) / self._sum_dt * SECONDS_PER_DAY)
+
+
+class RollingVolume:
+    """
+    Traded USD notional over a sliding time window.
+
+    Without a trade feed, fills are inferred from the touch: size that
+    disappears from an unchanged best level, or a whole best level that
+    is taken out when the price moves through it, counts as traded.
+    """
+
+    def __init__(self, window_sec: float = VOLUME_WINDOW_SEC) -> None:
+        """Start with an empty window."""
+        self.window_sec = window_sec
+        self._fills: Deque[Tuple[float, float]] = deque()  # (time, USD notional)
+        self._sum = 0.0
+        self._start: Optional[float] = None
+
+    def add(self, notional: float, now: float) -> None:
+        """Record traded notional at `now` and evict expired fills."""
+        if self._start is None:
+            self._start = now
+        if notional > 0:
+            self._fills.append((now, notional))
+            self._sum += notional
+        while self._fills and self._fills[0][0] <= now - self.window_sec:
+            self._sum -= self._fills.popleft()[1]
+        if not self._fills:
+            self._sum = 0.0
+
+    def daily(self, now: float) -> float:
+        """Windowed volume extrapolated to USD per day."""
+        if self._start is None:
+            return 0.0
+        span = min(max(now - self._start, 1e-9), self.window_sec)
+        return self._sum / span * SECONDS_PER_DAY
+
+
+class MarketStateEstimator:
+    """
+    Live volatility and volume inputs derived from the book stream.
+
+    Feed it every book update in order; each update costs O(1) amortized.
+    Estimates are reported once MARKET_STATE_MIN_SEC of data has been seen.
+    """
+
+    def __init__(
+        self,
+        halflife_sec: float = VOLATILITY_EWMA_HALFLIFE_SEC,
+        volatility_window_sec: float = VOLATILITY_WINDOW_SEC,
+        volume_window_sec: float = VOLUME_WINDOW_SEC,
+    ) -> None:
+        """Initialize the estimators."""
+        self.ewma = EwmaVolatility(halflife_sec)
+        self.realized = RealizedVolatility(volatility_window_sec)
+        self.volume = RollingVolume(volume_window_sec)
+
+        self._last_time: Optional[float] = None
+        self._last_mid: Optional[float] = None
+        self._first_time: Optional[float] = None
+        self._touch: Optional[Tuple[float, float, float, float]] = None  # bid px, bid sz, ask px, ask sz
+
+    def update(self, book: OrderBook, now: float) -> None:
+        """Fold in one book state observed at `now` (seconds)."""
+        if not book.is_valid:
+            return
+        mid = book.mid_price
+        if self._first_time is None:
+            self._first_time = now
+        if self._last_mid is not None and now > self._last_time and mid > 0 and self._last_mid > 0:
+            log_return = math.log(mid / self._last_mid)
+            dt = now - self._last_time
+            self.ewma.update(log_return, dt)
+            self.realized.update(log_return, dt, now)
+        if self._last_time is None or now > self._last_time:
+            self._last_time = now
+            self._last_mid = mid
+
+        touch = (float(book.bid_prices[0]), float(book.bid_sizes[0]), float(book.ask_prices[0]), float(book.ask_sizes[0]))
+        self.volume.add(self._traded_notional(self._touch, touch) if self._touch else 0.0, now)
+        self._touch = touch
+
+    @property
+    def is_warm(self) -> bool:
+        """True once enough history has been seen for the estimates to be used."""
+        return self._first_time is not None and self._last_time - self._first_time >= MARKET_STATE_MIN_SEC
+
+    def state(self) -> Dict[str, Any]:
+        """Current estimates; daily volatilities as decimals, volume in USD per day."""
+        now = self._last_time or 0.0
+        return {
+            "volatility_ewma": self.ewma.daily,
+            "volatility_realized": self.realized.daily,
+            "daily_volume": self.volume.daily(now),
+            "warm": self.is_warm,
+        }
+
+    @staticmethod
+    def _traded_notional(before: Tuple[float, float, float, float], after: Tuple[float, float, float, float]) -> float:
+        """USD notional inferred as traded at the touch between two book states."""
+        bid_px, bid_sz, ask_px, ask_sz = before
+        new_bid_px, new_bid_sz, new_ask_px, new_ask_sz = after
+        traded = 0.0
+        # Sells hit the bid: the best bid shrank in place or was taken out
+        if new_bid_px == bid_px:
+            traded += max(bid_sz - new_bid_sz, 0.0) * bid_px
+        elif new_bid_px < bid_px:
+            traded += bid_sz * bid_px
+        # Buys lift the ask
+        if new_ask_px == ask_px:
+            traded += max(ask_sz - new_ask_sz, 0.0) * ask_px
+        elif new_ask_px > ask_px:
+            traded += ask_sz * ask_px
+        return traded
@@ -0,0 +1,237 @@
+"""
+Online learning helpers for the Trade Simulator
+Fixed-capacity training buffers, an incremental least-squares regressor and
+a background trainer that publishes refitted models without blocking ticks.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+import numpy as np
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Shared single-thread executor for every model's fits."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-trainer")
+        return _executor
+
+
+class RingBuffer:
+    """
+    Fixed-capacity store of (features, target) training samples.
+
+    Backed by preallocated NumPy arrays; once full, each append overwrites
+    the oldest sample, so memory stays constant however long the process runs.
+    """
+
+    def __init__(self, capacity: int, n_features: int) -> None:
+        """Allocate room for `capacity` samples of `n_features` features."""
+        self.capacity = capacity
+        self.x = np.zeros((capacity, n_features))
+        self.y = np.zeros(capacity)
+        self.total = 0  # Samples ever appended
+
+    def __len__(self) -> int:
+        return min(self.total, self.capacity)
+
+    def append(self, features, target: float) -> Tuple[np.ndarray, float]:
+        """
+        Store one sample.
+
+        Returns:
+            Tuple of the (features, target) it displaced; only meaningful
+            when the buffer was already full.
+        """
+        slot = self.total % self.capacity
+        evicted = (self.x[slot].copy(), float(self.y[slot]))
+        self.x[slot] = features
+        self.y[slot] = target
+        self.total += 1
+        return evicted
+
+    def arrays(self, last: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Samples in insertion order, oldest first.
+
+        Args:
+            last: Only return the newest `last` samples.
+        """
+        count = len(self)
+        if last is not None:
+            count = min(count, last)
+        slots = np.arange(self.total - count, self.total) % self.capacity
+        return self.x[slots], self.y[slots]
+
+
+class OnlineLinearRegression:
+    """
+    Linear least squares updated one sample at a time.
+
+    Keeps decayed normal-equation sums (X'WX and X'Wy, intercept included)
+    and solves the small system from them, so the cost of an update does
+    not depend on how many samples have been seen. Older samples
+    are down-weighted by `decay` per update and can be removed exactly with
+    remove(), which together give exponential or sliding-window fits.
+    A tiny ridge term keeps the system solvable while features are constant.
+
+    update() only touches the sums; solving can be deferred and done from a
+    snapshot() on another thread, with set_solution() publishing the result
+    as one reference swap.
+    """
+
+    def __init__(self, n_features: int, decay: float = 1.0, ridge: float = 1e-8) -> None:
+        """Start with no samples and zero coefficients."""
+        self.decay = decay
+        self.ridge = ridge
+        self.n_samples = 0
+        self._solution = np.zeros(n_features + 1)  # Coefficients followed by the intercept
+        self._xtx = np.zeros((n_features + 1, n_features + 1))
+        self._xty = np.zeros(n_features + 1)
+        self._row = np.ones(n_features + 1)  # Reused sample row; the last entry is the intercept term
+
+    @property
+    def coef_(self) -> np.ndarray:
+        return self._solution[:-1]
+
+    @property
+    def intercept_(self) -> float:
+        return float(self._solution[-1])
+
+    def update(self, x, y: float) -> None:
+        """Add one sample to the sums, decaying every earlier one."""
+        row = self._row
+        row[:-1] = x
+        if self.decay != 1.0:
+            self._xtx *= self.decay
+            self._xty *= self.decay
+        self._xtx += row[:, None] * row
+        self._xty += row * y
+        self.n_samples += 1
+
+    def partial_fit(self, x, y: float) -> None:
+        """Add one sample and refresh the coefficients."""
+        self.update(x, y)
+        self.set_solution(self.solve(self.snapshot(), self.ridge))
+
+    def remove(self, x, y: float, age: int) -> None:
+        """
+        Take back a sample added `age` updates ago.
+
+        Its weight has decayed by decay**age since it was added.
+        """
+        row = self._row
+        row[:-1] = x
+        weight = self.decay ** age
+        self._xtx -= (weight * row)[:, None] * row
+        self._xty -= (weight * y) * row
+        self.n_samples -= 1
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Predict targets for a 2-D feature matrix."""
+        solution = self._solution
+        return np.asarray(X) @ solution[:-1] + solution[-1]
+
+    def snapshot(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Copies of the current normal-equation sums."""
+        return self._xtx.copy(), self._xty.copy()
+
+    def set_solution(self, solution: np.ndarray) -> None:
+        """Publish solved coefficients (intercept last) for predict()."""
+        self._solution = solution
+
+    @staticmethod
+    def solve(sums: Tuple[np.ndarray, np.ndarray], ridge: float) -> np.ndarray:
+        """Solve regularized normal equations taken from snapshot()."""
+        xtx, xty = sums
+        # Scale the ridge with the diagonal so it stays negligible for large-valued features
+        return np.linalg.solve(xtx + np.diag(ridge * (np.abs(np.diag(xtx)) + 1.0)), xty)
+
+
+class BackgroundTrainer:
+    """
+    Runs model fits off the pricing path and publishes the results.
+
+    submit() hands a fit function (working on data the caller already
+    snapshotted) to a shared single-thread executor; when it finishes its
+    result goes to the publish callback, which should install it with a
+    single attribute assignment so readers see either the old or the new
+    model, never a mix. Until then the caller keeps serving the previous
+    model. At most one fit per trainer is in flight; submit() returns False
+    while one is running. With background=False fits run inline, which keeps
+    backtests deterministic.
+    """
+
+    def __init__(self, name: str, background: bool = True) -> None:
+        """Initialize fit metrics for the model called `name`."""
+        self.name = name
+        self.background = background
+        self._future: Optional[Future] = None
+
+        self.fit_count = 0
+        self.last_fit_ms = 0.0
+        self.max_fit_ms = 0.0
+        self.published_at: Optional[float] = None
+
+    @property
+    def busy(self) -> bool:
+        """True while a fit is in flight."""
+        return self._future is not None and not self._future.done()
+
+    @property
+    def model_age_sec(self) -> Optional[float]:
+        """Seconds since the serving model was published, or None before the first fit."""
+        return None if self.published_at is None else time.time() - self.published_at
+
+    def submit(self, fit: Callable[[], Any], publish: Callable[[Any], None]) -> bool:
+        """
+        Run `fit` and pass its result to `publish`.
+
+        Returns:
+            bool: False if a previous fit is still running and nothing was submitted.
+        """
+        if self.busy:
+            return False
+        if self.background:
+            self._future = _get_executor().submit(self._run, fit, publish)
+        else:
+            self._run(fit, publish)
+        return True
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Block until the in-flight fit, if any, has been published."""
+        if self._future is not None:
+            self._future.result(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """Fit duration and model age metrics."""
+        return {
+            "fits": self.fit_count,
+            "last_fit_ms": round(self.last_fit_ms, 3),
+            "max_fit_ms": round(self.max_fit_ms, 3),
+            "model_age_sec": None if self.model_age_sec is None else round(self.model_age_sec, 1),
+        }
+
+    def _run(self, fit: Callable[[], Any], publish: Callable[[Any], None]) -> None:
+        """Time one fit and publish its result; errors keep the previous model."""
+        started = time.perf_counter()
+        try:
+            result = fit()
+        except Exception as e:
+            logger.error(f"Error training {self.name} model: {e}")
+            return
+        if result is None:
+            return
+        publish(result)
+        self.last_fit_ms = (time.perf_counter() - started) * 1000
+        self.max_fit_ms = max(self.max_fit_ms, self.last_fit_ms)
+        self.fit_count += 1
+        self.published_at = time.time()
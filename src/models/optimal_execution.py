@@ -0,0 +1,139 @@
+"""
+Optimal execution for the Trade Simulator
+Closed-form Almgren-Chriss trading trajectories and efficient frontiers.
+"""
+from dataclasses import dataclass
+import numpy as np
+from typing import Sequence, Union
+
+
+@dataclass
+class ExecutionFrontier:
+    """
+    Optimal schedules for a range of risk aversions, one row per risk aversion.
+
+    Quantities are in the units of the parent order (USD notional in this
+    app), times in the units of the horizon.
+    """
+    risk_aversion: np.ndarray  # (L,)
+    times: np.ndarray  # (N + 1,) slice boundaries from 0 to the horizon
+    holdings: np.ndarray  # (L, N + 1) quantity still to trade at each boundary
+    trades: np.ndarray  # (L, N) quantity traded in each slice
+    expected_cost: np.ndarray  # (L,) expected implementation shortfall
+    variance: np.ndarray  # (L,) variance of the shortfall
+    kappa: np.ndarray  # (L,) urgency; 0 is the linear (risk-neutral) schedule
+
+    def schedule(self, i: int = 0) -> "ExecutionSchedule":
+        """The i-th schedule of the frontier."""
+        return ExecutionSchedule(
+            risk_aversion=float(self.risk_aversion[i]),
+            times=self.times,
+            holdings=self.holdings[i],
+            trades=self.trades[i],
+            expected_cost=float(self.expected_cost[i]),
+            variance=float(self.variance[i]),
+            kappa=float(self.kappa[i]),
+        )
+
+
+@dataclass
+class ExecutionSchedule:
+    """One optimal trading trajectory"""
+    risk_aversion: float
+    times: np.ndarray
+    holdings: np.ndarray
+    trades: np.ndarray
+    expected_cost: float
+    variance: float
+    kappa: float
+
+
+def efficient_frontier(
+    quantity: float,
+    horizon: float,
+    n_slices: int,
+    risk_aversion: Union[float, Sequence[float], np.ndarray],
+    sigma: float,
+    eta: float,
+    gamma: float,
+    epsilon: float = 0.0,
+) -> ExecutionFrontier:
+    """
+    Almgren-Chriss optimal trajectories for every risk aversion at once.
+
+    Uses the discrete-time closed form: holdings follow
+    x_j = X sinh(kappa (T - t_j)) / sinh(kappa T) with
+    cosh(kappa tau) = 1 + lambda sigma^2 tau^2 / (2 eta~), where
+    eta~ = eta - gamma tau / 2. Everything is evaluated as (L, N + 1) arrays.
+
+    Args:
+        quantity: Parent order size X.
+        horizon: Time T to complete the order.
+        n_slices: Number of equal trading intervals N.
+        risk_aversion: Lambda value(s); 0 gives the linear schedule.
+        sigma: Price volatility per unit quantity per sqrt(unit time).
+        eta: Linear temporary impact coefficient.
+        gamma: Linear permanent impact coefficient.
+        epsilon: Fixed cost per unit traded (e.g. half the spread).
+
+    Returns:
+        ExecutionFrontier: One row per risk aversion.
+
+    Raises:
+        ValueError: If the inputs make the problem ill-posed.
+    """
+    if n_slices < 1 or horizon <= 0:
+        raise ValueError("n_slices must be >= 1 and horizon > 0")
+    tau = horizon / n_slices
+    eta_tilde = eta - 0.5 * gamma * tau
+    if eta_tilde <= 0:
+        raise ValueError("Temporary impact too small for this slice length (eta - gamma * tau / 2 <= 0)")
+
+    lam = np.atleast_1d(np.asarray(risk_aversion, dtype=np.float64))
+    if (lam < 0).any():
+        raise ValueError("risk_aversion must be non-negative")
+
+    kappa = np.arccosh(1.0 + lam * sigma ** 2 * tau ** 2 / (2.0 * eta_tilde)) / tau
+    times = np.linspace(0.0, horizon, n_slices + 1)
+
+    # sinh(k (T - t)) / sinh(k T) written with decaying exponentials so large k*T cannot overflow
+    k = kappa[:, None]
+    remaining = horizon - times[None, :]
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        ratio = np.exp(-k * times) * -np.expm1(-2.0 * k * remaining) / -np.expm1(-2.0 * k * horizon)
+    linear = 1.0 - times / horizon
+    fraction = np.where(k * horizon < 1e-9, linear[None, :], ratio)
+    holdings = quantity * fraction
+    holdings[:, -1] = 0.0
+
+    trades = -np.diff(holdings, axis=1)
+    expected_cost = (
+        0.5 * gamma * quantity ** 2
+        + epsilon * np.abs(trades).sum(axis=1)
+        + (eta_tilde / tau) * np.square(trades).sum(axis=1)
+    )
+    variance = sigma ** 2 * tau * np.square(holdings[:, 1:]).sum(axis=1)
+
+    return ExecutionFrontier(
+        risk_aversion=lam,
+        times=times,
+        holdings=holdings,
+        trades=trades,
+        expected_cost=expected_cost,
+        variance=variance,
+        kappa=kappa,
+    )
+
+
+def optimal_schedule(
+    quantity: float,
+    horizon: float,
+    n_slices: int,
+    risk_aversion: float,
+    sigma: float,
+    eta: float,
+    gamma: float,
+    epsilon: float = 0.0,
+) -> ExecutionSchedule:
+    """Almgren-Chriss optimal trajectory for one risk aversion; see efficient_frontier()."""
+    return efficient_frontier(quantity, horizon, n_slices, risk_aversion, sigma, eta, gamma, epsilon).schedule(0)
@@ -0,0 +1,106 @@
+"""
+Model persistence for the Trade Simulator
+Saves and restores the learning models' coefficients and training windows.
+"""
+import logging
+import os
+import numpy as np
+from typing import Dict
+
+from src.models.pipeline import CostPipeline
+
+logger = logging.getLogger(__name__)
+
+MODEL_FORMAT = "trade-simulator-models"
+MODEL_FORMAT_VERSION = 1
+
+
+def save_models(pipeline: CostPipeline, path: str) -> None:
+    """
+    Write the pipeline's learning model state to an .npz file.
+
+    Waits for in-flight fits so the file holds their results. The file is
+    written beside `path` and renamed over it, so readers never see a
+    partial file.
+    """
+    pipeline.slippage_model.trainer.wait()
+    pipeline.maker_taker_model.trainer.wait()
+
+    arrays: Dict[str, np.ndarray] = {
+        "format": np.array(MODEL_FORMAT),
+        "version": np.array(MODEL_FORMAT_VERSION),
+    }
+    for prefix, state in (
+        ("slippage", pipeline.slippage_model.get_state()),
+        ("maker_taker", pipeline.maker_taker_model.get_state()),
+    ):
+        for key, value in state.items():
+            arrays[f"{prefix}/{key}"] = value
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+    logger.info(f"Saved models to {path}")
+
+
+def load_models(pipeline: CostPipeline, path: str, freeze: bool = False) -> None:
+    """
+    Warm-start the pipeline's learning models from a file written by save_models().
+
+    Args:
+        pipeline: Pipeline whose models are replaced in place.
+        path: Model file.
+        freeze: Serve the loaded coefficients without further online
+            learning, e.g. for models fitted offline on recorded data.
+
+    Raises:
+        ValueError: If the file is not a model file of a supported version.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        if "format" not in data or str(data["format"]) != MODEL_FORMAT:
+            raise ValueError(f"{path} is not a model file")
+        version = int(data["version"])
+        if version != MODEL_FORMAT_VERSION:
+            raise ValueError(f"{path} has model format version {version}, expected {MODEL_FORMAT_VERSION}")
+
+        for prefix, model in (("slippage", pipeline.slippage_model), ("maker_taker", pipeline.maker_taker_model)):
+            model.set_state({key.split("/", 1)[1]: data[key] for key in data.files if key.startswith(f"{prefix}/")})
+            model.learning = not freeze
+
+    logger.info(f"Loaded models from {path}{' (frozen)' if freeze else ''}")
+
+
+if __name__ == "__main__":
+    import argparse
+    from src.backtest import load_books
+    from src.models.scenarios import build_scenarios
+    from src.config import DEFAULT_PAIR, DEFAULT_QUANTITY, DEFAULT_VOLATILITY, LOG_FORMAT, MODEL_STATE_PATH
+
+    parser = argparse.ArgumentParser(description="Fit the learning models offline on recorded order book data")
+    parser.add_argument("feed", help="Feed recording (src.data.recorder) or tick store file/directory")
+    parser.add_argument("--symbol", default=DEFAULT_PAIR, help="Symbol to replay from a recording")
+    parser.add_argument("--quantities", type=float, nargs="+", default=[DEFAULT_QUANTITY], help="Order sizes in USD")
+    parser.add_argument("--volatilities", type=float, nargs="+", default=[DEFAULT_VOLATILITY], help="Volatilities as decimals")
+    parser.add_argument("--order-types", nargs="+", default=["market", "limit"])
+    parser.add_argument("--output", default=MODEL_STATE_PATH, help="Model file to write")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    logging.getLogger("src.models.spillage").setLevel(logging.WARNING)
+    logging.getLogger("src.models.maker_taker_model").setLevel(logging.WARNING)
+
+    # One pipeline sees every scenario on every tick, so it learns across the whole grid
+    scenarios = build_scenarios(args.quantities, args.volatilities, [""], args.order_types)
+    pipeline = CostPipeline(background_training=False)
+    ticks = 0
+    for ts, book in load_books(args.feed, args.symbol):
+        ticks += 1
+        # The feed's own clock drives the volatility and volume estimates, not the replay speed
+        for scenario in scenarios:
+            pipeline.compute(book, {
+                "quantity": scenario.quantity, "volatility": scenario.volatility,
+                "order_type": scenario.order_type, "side": scenario.side,
+            }, now=ts / 1e9)
+    logger.info(f"Fitted on {ticks} ticks x {len(scenarios)} scenarios")
+    save_models(pipeline, args.output)
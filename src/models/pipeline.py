@@ -0,0 +1,272 @@
+"""
+Cost model pipeline for the Trade Simulator
+Runs slippage, maker/taker, fee and market impact models over one book update.
+"""
+import logging
+import time
+from dataclasses import dataclass, field
+import numpy as np
+from typing import Any, Dict, List, Optional
+
+from src.config import EXCHANGES, DEFAULT_EXCHANGE, VOLATILITY_SOURCE
+from src.data.orderbook import OrderBook
+from src.metrics import latency
+from src.models.features import SPREAD_PCT, FeatureStage
+from src.models.fee_model import FeeModel
+from src.models.maker_taker_model import MakerTakerModel
+from src.models.market_impact import MarketImpactModel
+from src.models.market_state import MarketStateEstimator, select_volatility
+from src.models.scenarios import CostSurface, Scenario, ScenarioMatrix
+from src.models.spillage import SlippageModel
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PipelineResult:
+    """Model outputs for one book update"""
+    book: OrderBook
+    outputs: Dict[str, Any] = field(default_factory=dict)
+    sequence: int = 0
+    surface: Optional[CostSurface] = None  # Registered scenarios repriced on the same update
+    computed_ns: Optional[int] = None  # perf_counter_ns() when the outputs were ready
+
+
+class CostPipeline:
+    """Computes the full trade cost breakdown for a book and order parameters"""
+
+    def __init__(self, background_training: bool = True):
+        """
+        Initialize the cost models
+
+        With background_training the learning models refit on a background
+        thread; pass False for reproducible runs such as backtests.
+        """
+        self.slippage_model = SlippageModel(background=background_training)
+        self.maker_taker_model = MakerTakerModel(background=background_training)
+        self.fee_model = FeeModel()
+        self.impact_model = MarketImpactModel()
+        self.market_state = MarketStateEstimator()  # Live volatility and volume from the book stream
+        self._market_update: Optional[tuple] = None  # (book update count, time) last folded into market_state
+        self.features = FeatureStage()  # Filled once per update and read by every model
+        self.last_received_time = time.time()
+
+        logger.info("Cost pipeline initialized")
+
+    def compute(self, book: OrderBook, params: Dict[str, Any], now: Optional[float] = None) -> Dict[str, float]:
+        """
+        Run every cost model over one book update.
+
+        Args:
+            book (OrderBook): Book state to price against.
+            params (Dict[str, Any]): Order parameters with "quantity",
+                "volatility" (decimal), "order_type" and optionally
+                "exchange", "fee_tier", "side" and "volatility_source".
+            now (Optional[float]): Time of the update in seconds; the
+                current time when omitted. Pricing several orders against
+                one update with the same time feeds the market state once.
+
+        Returns:
+            Dict[str, float]: Unrounded model outputs.
+        """
+        self._apply_fee_tier(params)
+        market = self._update_market_state(book, now)
+
+        quantity = params["quantity"]
+        volatility = select_volatility(market, params.get("volatility_source", VOLATILITY_SOURCE), params["volatility"])
+        daily_volume = market["daily_volume"] if market["warm"] else 0.0
+        mid_price = book.mid_price
+        # Book features are computed once here; the models only read the vector
+        side = params.get("side", "buy")
+        t0 = time.perf_counter_ns()
+        x = self.features.update(book, quantity, volatility, params["order_type"], daily_volume, side)
+        t1 = time.perf_counter_ns()
+
+        # --- Use slippage model ---
+        slippage = self.slippage_model.calculate(x)
+        t2 = time.perf_counter_ns()
+        # --- Use maker/taker model ---
+        maker_proportion = self.maker_taker_model.predict(x)
+        t3 = time.perf_counter_ns()
+        # --- Use fee model ---
+        fees = self.fee_model.calculate(quantity, mid_price, maker_proportion)
+        t4 = time.perf_counter_ns()
+        # --- Use market impact model ---
+        impact = self.impact_model.calculate(x)
+        t5 = time.perf_counter_ns()
+
+        latency.record("pipeline.features", t1 - t0)
+        latency.record("model.slippage", t2 - t1)
+        latency.record("model.maker_taker", t3 - t2)
+        latency.record("model.fees", t4 - t3)
+        latency.record("model.impact", t5 - t4)
+
+        return {
+            "mid_price": mid_price,
+            "spread_pct": float(x[SPREAD_PCT]),
+            "volatility": volatility,
+            "daily_volume": daily_volume,
+            "slippage_pct": slippage,
+            "maker_proportion": maker_proportion,
+            "fees_usd": fees,
+            "impact_pct": impact,
+        }
+
+    def compute_batch(
+        self,
+        features: np.ndarray,
+        maker_rates: Optional[np.ndarray] = None,
+        taker_rates: Optional[np.ndarray] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Run every cost model over a batch of feature rows in one pass.
+
+        Uses the models' current state without collecting training data, so
+        it can price N ticks x M scenarios with one call per model.
+
+        Args:
+            features (np.ndarray): Structured array with FEATURE_DTYPE fields.
+            maker_rates, taker_rates: Optional per-row fee rates; the fee
+                model's current rates are used when omitted.
+
+        Returns:
+            Dict[str, np.ndarray]: Unrounded outputs, one array per output.
+        """
+        quantity = features["quantity"]
+        mid_price = features["mid_price"]
+
+        slippage = self.slippage_model.calculate_batch(features)
+        maker_proportion = self.maker_taker_model.predict_batch(features)
+        fees = self.fee_model.calculate_batch(quantity, mid_price, maker_proportion, maker_rates, taker_rates)
+        impact = self.impact_model.calculate_batch(quantity, features["volatility"], features)
+
+        return {
+            "mid_price": mid_price,
+            "spread_pct": features["spread_pct"],
+            "slippage_pct": slippage,
+            "maker_proportion": maker_proportion,
+            "fees_usd": fees,
+            "impact_pct": impact,
+            "net_cost": slippage + fees + impact,
+        }
+
+    def compute_scenarios(
+        self,
+        book: OrderBook,
+        matrix: ScenarioMatrix,
+        now: Optional[float] = None,
+        volatility_source: str = VOLATILITY_SOURCE,
+    ) -> CostSurface:
+        """
+        Reprice every scenario of a matrix against one book update.
+
+        Book features are computed once and broadcast across the scenarios,
+        then each model is called once for the whole matrix. Like
+        compute_batch() this uses the models' current state without
+        collecting training data.
+
+        Args:
+            book (OrderBook): Book state to price against.
+            matrix (ScenarioMatrix): Scenarios to price.
+            now (Optional[float]): Time of the update in seconds; the
+                current time when omitted. Pass the same time as compute()
+                on the same update.
+            volatility_source (str): "ewma" or "realized" replace the
+                scenario volatilities once the live estimate is warm;
+                "input" always uses them.
+
+        Returns:
+            CostSurface: One cost entry per scenario.
+        """
+        start = time.perf_counter_ns()
+        market = self._update_market_state(book, now)
+        daily_volume = market["daily_volume"] if market["warm"] else 0.0
+        # A zero volatility tells the matrix to use each scenario's own value
+        self.features.update(book, 0.0, select_volatility(market, volatility_source, 0.0), "market", daily_volume)
+
+        features = matrix.expand(self.features.batch)
+        maker_rates, taker_rates = matrix.tile_rates(1)
+        result = self.compute_batch(features, maker_rates, taker_rates)
+        surface = CostSurface(
+            scenarios=matrix.scenarios,
+            mid_price=book.mid_price,
+            spread_pct=book.spread_pct,
+            daily_volume=daily_volume,
+            volatility=features["volatility"],
+            slippage_pct=result["slippage_pct"],
+            book_slippage_pct=matrix.book_slippage(book),
+            maker_proportion=result["maker_proportion"],
+            fees_usd=result["fees_usd"],
+            impact_pct=result["impact_pct"],
+            net_cost=result["net_cost"],
+        )
+        latency.record("pipeline.scenarios", time.perf_counter_ns() - start)
+        return surface
+
+    def scenario_matrix(self, scenarios: List[Scenario]) -> ScenarioMatrix:
+        """Lay out scenarios with this pipeline's fee rates as the fallback for unknown tiers."""
+        return ScenarioMatrix(scenarios, (self.fee_model.maker_rate, self.fee_model.taker_rate))
+
+    def run(self, book: OrderBook, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run every cost model and format the outputs for display.
+
+        Returns:
+            Dict[str, Any]: Output values keyed by their display label.
+        """
+        now = time.time()
+        self.last_received_time = now
+
+        # Processing time of this update, not the gap since the previous one
+        start = time.perf_counter_ns()
+        result = self.compute(book, params, now)
+        elapsed_ns = time.perf_counter_ns() - start
+        latency.record("pipeline.compute", elapsed_ns)
+        latency_ms = round(elapsed_ns / 1e6, 3)
+        slippage = round(result["slippage_pct"], 4)
+        fees = round(result["fees_usd"], 4)
+        impact = round(result["impact_pct"], 4)
+        maker_proportion = result["maker_proportion"]
+        # --- Final net cost ---
+        net_cost = round(slippage + fees + impact, 4)
+
+        return {
+            "Expected Slippage(%)": slippage,
+            "Expected Fees(USD)": fees,
+            "Market Impact(%)": impact,
+            "Net Cost(USD)": net_cost,
+            "Maker/Taker Proportion(out of 100%)": f"{int(maker_proportion * 100)}/{int((1 - maker_proportion) * 100)}",
+            "Volatility(%)": round(result["volatility"] * 100, 4),
+            "Daily Volume(USD)": round(result["daily_volume"]),
+            "Internal Latency(ms)": latency_ms
+        }
+
+    def model_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Training status, sample counts, fit duration and model age for the learning models."""
+        return {
+            name: {
+                "trained": model.is_trained,
+                "learning": model.learning,
+                "samples": len(model.training_data),
+                "samples_seen": model.training_data.total,
+                **model.trainer.stats(),
+            }
+            for name, model in (("slippage", self.slippage_model), ("maker_taker", self.maker_taker_model))
+        }
+
+    def _update_market_state(self, book: OrderBook, now: Optional[float]) -> Dict[str, Any]:
+        """Fold a book update into the market state, once per update, and return the estimates."""
+        now = time.time() if now is None else now
+        key = (book.update_count, now)
+        if key != self._market_update:
+            self.market_state.update(book, now)
+            self._market_update = key
+        return self.market_state.state()
+
+    def _apply_fee_tier(self, params: Dict[str, Any]) -> None:
+        """Switch fee rates when the requested tier exists for the exchange."""
+        exchange = EXCHANGES.get(params.get("exchange", DEFAULT_EXCHANGE))
+        tier = params.get("fee_tier")
+        rates = exchange.fee_tiers.get(tier) if exchange else None
+        if rates and (rates["maker"], rates["taker"]) != (self.fee_model.maker_rate, self.fee_model.taker_rate):
+            self.fee_model.set_fee_rates(rates["maker"], rates["taker"])
@@ -0,0 +1,173 @@
+"""
+Scenario matrices for the Trade Simulator
+Order configurations repriced together on every book update.
+"""
+import itertools
+from dataclasses import dataclass
+import numpy as np
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.config import EXCHANGES, DEFAULT_EXCHANGE
+from src.data.orderbook import OrderBook
+
+SIDES = ("buy", "sell")
+
+
+@dataclass
+class Scenario:
+    """One order configuration evaluated on every tick"""
+    quantity: float
+    volatility: float
+    fee_tier: str
+    order_type: str
+    exchange: str = DEFAULT_EXCHANGE
+    side: str = "buy"
+
+
+def build_scenarios(
+    quantities: Sequence[float],
+    volatilities: Sequence[float],
+    fee_tiers: Sequence[str],
+    order_types: Sequence[str],
+    exchange: str = DEFAULT_EXCHANGE,
+    sides: Sequence[str] = ("buy",),
+) -> List[Scenario]:
+    """Cartesian product of the parameter grid."""
+    return [
+        Scenario(quantity, volatility, fee_tier, order_type.lower(), exchange, side.lower())
+        for quantity, volatility, fee_tier, order_type, side in itertools.product(
+            quantities, volatilities, fee_tiers, order_types, sides
+        )
+    ]
+
+
+@dataclass
+class CostSurface:
+    """Costs of every scenario of a ScenarioMatrix on one book update, one array entry per scenario"""
+    scenarios: List[Scenario]
+    mid_price: float
+    spread_pct: float
+    daily_volume: float
+    volatility: np.ndarray
+    slippage_pct: np.ndarray
+    book_slippage_pct: np.ndarray
+    maker_proportion: np.ndarray
+    fees_usd: np.ndarray
+    impact_pct: np.ndarray
+    net_cost: np.ndarray
+
+    def row(self, i: int) -> Dict[str, Any]:
+        """Scenario i's parameters and costs as one flat dict."""
+        scenario = self.scenarios[i]
+        return {
+            "quantity": scenario.quantity,
+            "side": scenario.side,
+            "order_type": scenario.order_type,
+            "fee_tier": scenario.fee_tier,
+            "volatility": float(self.volatility[i]),
+            "slippage_pct": float(self.slippage_pct[i]),
+            "book_slippage_pct": float(self.book_slippage_pct[i]),
+            "maker_proportion": float(self.maker_proportion[i]),
+            "fees_usd": float(self.fees_usd[i]),
+            "impact_pct": float(self.impact_pct[i]),
+            "net_cost": float(self.net_cost[i]),
+        }
+
+
+class ScenarioMatrix:
+    """
+    A fixed set of scenarios laid out as per-scenario columns.
+
+    Scenario parameters are converted to arrays once, so repricing the whole
+    set on a book update is a handful of vectorized operations: tick
+    features are broadcast across the scenarios and the models are called
+    once for all of them.
+    """
+
+    def __init__(self, scenarios: List[Scenario], default_rates: Tuple[float, float] = (0.0008, 0.0010)) -> None:
+        """
+        Lay out the scenario columns.
+
+        Args:
+            scenarios: Order configurations, in output order.
+            default_rates: (maker, taker) rates for scenarios whose fee tier
+                is not defined for their exchange.
+
+        Raises:
+            ValueError: If a scenario has an unknown side.
+        """
+        for scenario in scenarios:
+            if scenario.side not in SIDES:
+                raise ValueError(f"Unknown side {scenario.side!r}; expected one of {SIDES}")
+
+        self.scenarios = scenarios
+        rates = [self._fee_rates(scenario, default_rates) for scenario in scenarios]
+        self.maker_rates = np.array([maker for maker, _ in rates], dtype=np.float64)
+        self.taker_rates = np.array([taker for _, taker in rates], dtype=np.float64)
+        self.quantity = np.array([scenario.quantity for scenario in scenarios], dtype=np.float64)
+        self.volatility = np.array([scenario.volatility for scenario in scenarios], dtype=np.float64)
+        self.is_limit = np.array([scenario.order_type != "market" for scenario in scenarios], dtype=np.float64)
+        self.is_sell = np.array([scenario.side == "sell" for scenario in scenarios])
+
+    @classmethod
+    def grid(
+        cls,
+        quantities: Sequence[float],
+        volatilities: Sequence[float],
+        fee_tiers: Optional[Sequence[str]] = None,
+        order_types: Sequence[str] = ("market",),
+        exchange: str = DEFAULT_EXCHANGE,
+        sides: Sequence[str] = ("buy",),
+    ) -> "ScenarioMatrix":
+        """Matrix over a parameter grid; every fee tier of the exchange when fee_tiers is None."""
+        if fee_tiers is None:
+            fee_tiers = list(EXCHANGES[exchange].fee_tiers)
+        return cls(build_scenarios(quantities, volatilities, fee_tiers, order_types, exchange, sides))
+
+    def __len__(self) -> int:
+        return len(self.scenarios)
+
+    def expand(self, book_features: np.ndarray) -> np.ndarray:
+        """
+        Broadcast per-tick book features across every scenario.
+
+        Args:
+            book_features: FEATURE_DTYPE rows, one per tick. A positive
+                volatility is a live estimate used for every scenario;
+                0.0 means each scenario's own volatility is used.
+
+        Returns:
+            np.ndarray: len(book_features) * len(self) rows, tick-major.
+        """
+        n_ticks = len(book_features)
+        features = np.repeat(book_features, len(self))
+        features["quantity"] = np.tile(self.quantity, n_ticks)
+        features["volatility"] = np.where(
+            features["volatility"] > 0, features["volatility"], np.tile(self.volatility, n_ticks)
+        )
+        features["is_limit"] = np.tile(self.is_limit, n_ticks)
+        # Imbalance is measured from the buyer's side; sells see it mirrored
+        is_sell = np.tile(self.is_sell, n_ticks)
+        features["imbalance"] = np.where(is_sell, 1.0 - features["imbalance"], features["imbalance"])
+        return features
+
+    def book_slippage(self, book: OrderBook) -> np.ndarray:
+        """Walk-the-book slippage percentage of every scenario, one sweep per side."""
+        slippage = np.empty(len(self))
+        for side, mask in (("buy", ~self.is_sell), ("sell", self.is_sell)):
+            if mask.any():
+                slippage[mask] = book.sweep(self.quantity[mask], side).slippage_pct
+        return slippage
+
+    def tile_rates(self, n_ticks: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Maker and taker rate columns for n_ticks expanded ticks."""
+        return np.tile(self.maker_rates, n_ticks), np.tile(self.taker_rates, n_ticks)
+
+    @staticmethod
+    def _fee_rates(scenario: Scenario, default_rates: Tuple[float, float]) -> Tuple[float, float]:
+        """Maker and taker rates for a scenario, falling back to the defaults."""
+        exchange = EXCHANGES.get(scenario.exchange)
+        rates = exchange.fee_tiers.get(scenario.fee_tier) if exchange else None
+        if rates:
+            return rates["maker"], rates["taker"]
+        return default_rates
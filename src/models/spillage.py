@@ -3,31 +3,58 @@ Slippage model for the Trade Simulator
 """
 import logging
 import numpy as np
-from typing import Dict, Any
-from sklearn.linear_model import LinearRegression
+from typing import Dict, List
+
+from src.config import MODEL_BUFFER_CAPACITY, MODEL_DECAY, MODEL_MIN_SAMPLES, MODEL_TRAIN_INTERVAL
+from src.models.evaluators import LinearEvaluator
+from src.models.features import DEPTH_RATIO, IMBALANCE, QUANTITY, SPREAD_PCT, VOLATILITY, feature_matrix
+from src.models.online import BackgroundTrainer, OnlineLinearRegression, RingBuffer
 
 logger = logging.getLogger(__name__)
 
+# Feature vector positions the regression is fitted on
+SLIPPAGE_COLUMNS = [QUANTITY, SPREAD_PCT, IMBALANCE, DEPTH_RATIO, VOLATILITY]
+
 class SlippageModel:
     """Model for estimating slippage based on orderbook data"""
     
-    def __init__(self):
-        """Initialize the slippage model"""
-        self.model = LinearRegression()
+    def __init__(
+        self,
+        capacity: int = MODEL_BUFFER_CAPACITY,
+        decay: float = MODEL_DECAY,
+        train_interval: int = MODEL_TRAIN_INTERVAL,
+        background: bool = True,
+    ):
+        """
+        Initialize the slippage model
+
+        The regression is fitted incrementally over the newest `capacity`
+        samples, each weighted by `decay` per newer sample. Every
+        `train_interval` samples the coefficients are re-solved, on the
+        background trainer unless `background` is False.
+        """
+        self.model = OnlineLinearRegression(n_features=len(SLIPPAGE_COLUMNS), decay=decay)
+        self.evaluator = LinearEvaluator(self.model.coef_, self.model.intercept_)  # Serves predictions
         self.is_trained = False
-        self.training_data_x = []
-        self.training_data_y = []
+        self.training_data = RingBuffer(capacity, n_features=len(SLIPPAGE_COLUMNS))
+        self.train_interval = train_interval
+        self.trainer = BackgroundTrainer("slippage", background=background)
+        self.learning = True  # False serves the current (e.g. loaded) coefficients unchanged
         
         logger.info("Slippage model initialized")
     
-    def calculate(self, data: Dict[str, Any]) -> float:
-        """Calculate expected slippage percentage"""
+    def calculate(self, x: np.ndarray) -> float:
+        """
+        Calculate expected slippage percentage
+
+        Args:
+            x: Feature vector from FeatureStage; read, never modified.
+        """
         try:
             # Extract features for slippage calculation
-            quantity = data["quantity"]
-            mid_price = data["mid_price"]
-            spread_pct = data["spread_pct"]
-            imbalance = data["imbalance"]
+            quantity = x[QUANTITY]
+            spread_pct = x[SPREAD_PCT]
+            imbalance = x[IMBALANCE]
             
             # Simple model: base slippage on spread and quantity
             base_slippage = spread_pct / 2  # Half the spread as base slippage
@@ -41,15 +68,16 @@ class SlippageModel:
             imbalance_factor = (imbalance - 0.5) * 0.5
             
             # Calculate final slippage
-            slippage = base_slippage + (quantity_factor * (1 + imbalance_factor))
+            slippage = float(base_slippage + (quantity_factor * (1 + imbalance_factor)))
+            features = self._extract_features(x)
             
             # Collect training data for regression model
-            self._collect_training_data(data, slippage)
+            if self.learning:
+                self._collect_training_data(features, slippage)
             
             # Use regression model if trained
             if self.is_trained:
-                features = self._extract_features(data)
-                predicted_slippage = self.model.predict([features])[0]
+                predicted_slippage = self.evaluator(features)
                 
                 # Blend model prediction with heuristic calculation
                 slippage = 0.7 * predicted_slippage + 0.3 * slippage
@@ -60,40 +88,106 @@ class SlippageModel:
             logger.error(f"Error calculating slippage: {e}")
             return 0.01  # Default to 0.01% slippage on error
     
-    def _collect_training_data(self, data: Dict[str, Any], observed_slippage: float) -> None:
-        """Collect training data for regression model"""
-        features = self._extract_features(data)
+    def calculate_batch(self, features: np.ndarray) -> np.ndarray:
+        """
+        Calculate expected slippage percentage for a batch of feature rows.
+
+        Matches calculate() row by row with the current model state, but does
+        not collect training data. The regression model is called once for
+        the whole batch.
+
+        Args:
+            features: Structured array with FEATURE_DTYPE fields.
+
+        Returns:
+            np.ndarray: Slippage percentages.
+        """
+        try:
+            quantity = features["quantity"]
+            spread_pct = features["spread_pct"]
+            imbalance = features["imbalance"]
+
+            base_slippage = spread_pct / 2
+            quantity_factor = 0.01 * np.log1p(quantity / 100)
+            imbalance_factor = (imbalance - 0.5) * 0.5
+            slippage = base_slippage + (quantity_factor * (1 + imbalance_factor))
+
+            if self.is_trained:
+                predicted_slippage = self.evaluator.batch(self._extract_feature_matrix(features))
+                slippage = 0.7 * predicted_slippage + 0.3 * slippage
+
+            return np.maximum(0.0, slippage)
+
+        except Exception as e:
+            logger.error(f"Error calculating batch slippage: {e}")
+            return np.full(len(features), 0.01)
+
+    def get_state(self) -> Dict[str, np.ndarray]:
+        """Fitted coefficients and training window, oldest sample first"""
+        x, y = self.training_data.arrays()
+        return {
+            "solution": np.append(self.evaluator.coef, self.evaluator.intercept),
+            "is_trained": np.array(self.is_trained),
+            "x": x,
+            "y": y,
+        }
+    
+    def set_state(self, state: Dict[str, np.ndarray]) -> None:
+        """
+        Restore a state from get_state()
         
-        self.training_data_x.append(features)
-        self.training_data_y.append(observed_slippage)
+        The regression sums are rebuilt from the saved window, so training
+        continues exactly where it stopped; a window longer than this
+        model's capacity keeps its newest samples.
+        """
+        self.model = OnlineLinearRegression(n_features=self.model.coef_.shape[0], decay=self.model.decay)
+        self.training_data = RingBuffer(self.training_data.capacity, n_features=self.model.coef_.shape[0])
+        for features, target in zip(state["x"], state["y"]):
+            evicted_x, evicted_y = self.training_data.append(features, target)
+            if self.training_data.total > self.training_data.capacity:
+                self.model.remove(evicted_x, evicted_y, age=self.training_data.capacity - 1)
+            self.model.update(features, target)
         
-        # Train model when we have enough data
-        if len(self.training_data_y) >= 100 and not self.is_trained:
-            self._train_model()
-        elif len(self.training_data_y) >= 500 and len(self.training_data_y) % 100 == 0:
-            # Retrain periodically with more data
+        solution = np.asarray(state["solution"], dtype=np.float64)
+        self.model.set_solution(solution)
+        self.evaluator = LinearEvaluator(solution[:-1], solution[-1])
+        self.is_trained = bool(state["is_trained"])
+    
+    def _collect_training_data(self, features: List[float], observed_slippage: float) -> None:
+        """Collect training data for regression model"""
+        evicted_x, evicted_y = self.training_data.append(features, observed_slippage)
+        if self.training_data.total > self.training_data.capacity:
+            # Slide the window: the overwritten sample leaves the fit too
+            self.model.remove(evicted_x, evicted_y, age=self.training_data.capacity - 1)
+        self.model.update(features, observed_slippage)
+        
+        # Re-solve periodically once there is enough data; a fit still running defers to the next interval
+        if self.model.n_samples >= MODEL_MIN_SAMPLES and self.training_data.total % self.train_interval == 0:
             self._train_model()
     
-    def _extract_features(self, data: Dict[str, Any]) -> list:
+    def _extract_features(self, x: np.ndarray) -> List[float]:
         """Extract features for regression model"""
-        features = [
-            data["quantity"],
-            data["spread_pct"],
-            data["imbalance"],
-            data["depth_ratio"],
-            data["volatility"]
-        ]
-        return features
+        return x[SLIPPAGE_COLUMNS].tolist()
     
+    def _extract_feature_matrix(self, features: np.ndarray) -> np.ndarray:
+        """Extract the regression feature matrix from a feature batch"""
+        return feature_matrix(features, SLIPPAGE_COLUMNS)
+
     def _train_model(self) -> None:
-        """Train the regression model"""
-        try:
-            X = np.array(self.training_data_x)
-            y = np.array(self.training_data_y)
-            
-            self.model.fit(X, y)
+        """Solve the regression from a snapshot of its sums without blocking calculate()"""
+        sums = self.model.snapshot()
+        n_samples = self.model.n_samples
+        self.trainer.submit(lambda: self._fit(sums), lambda fitted: self._publish(*fitted, n_samples))
+    
+    def _fit(self, sums: tuple) -> tuple:
+        """Solve the regression and export its coefficients for inference"""
+        solution = self.model.solve(sums, self.model.ridge)
+        return solution, LinearEvaluator(solution[:-1], solution[-1])
+    
+    def _publish(self, solution: np.ndarray, evaluator: LinearEvaluator, n_samples: int) -> None:
+        """Swap in newly solved coefficients"""
+        self.model.set_solution(solution)
+        self.evaluator = evaluator
+        if not self.is_trained:
             self.is_trained = True
-            
-            logger.info(f"Trained slippage model with {len(y)} samples")
-        except Exception as e:
-            logger.error(f"Error training slippage model: {e}")
\ No newline at end of file
+            logger.info(f"Trained slippage model with {n_samples} samples")